@@ -0,0 +1,204 @@
+# Vise agenata koji dijele istu mapu.
+#
+# Stanje agenata je u ravnim nizovima (pozicija, cilj, brojac vremena, kursor
+# u putu), pa tisuce agenata ne znace tisuce objekata. Put se ne skracuje sa
+# pop(0), nego se pomice kursor. Agenti kojima treba novi put cekaju u redu, a
+# update() racuna puteve samo dok ne potrosi zadano vrijeme po ciklusu;
+# ostali agenti dolaze na red u sljedecim ciklusima.
+import time
+from array import array
+from collections import deque
+
+from pathfinding import astar, manhattan_distance, update_heuristic
+
+# Vrijeme za racunanje puteva u jednom ciklusu (sekunde)
+REPLAN_BUDGET = 0.004
+
+
+class AgentPool:
+    def __init__(
+        self,
+        grid,
+        search=astar,
+        heuristic=manhattan_distance,
+        speed=50,
+        budget=REPLAN_BUDGET,
+        rng=None,
+    ):
+        self.grid = grid
+        self.search = search
+        self.heuristic = heuristic
+        # broj ciklusa koje agent provede na celiji tezine 1 (kao Player.speed)
+        self.speed = speed
+        self.budget = budget
+        # ako je zadan rng, agent koji stigne na cilj dobiva novi nasumicni cilj
+        self.rng = rng
+
+        self.position = array("i")
+        self.goal = array("i")
+        self.time = array("I")
+        # indeks trenutne celije u putu agenta
+        self.cursor = array("i")
+        # put svakog agenta kao array("i") ili None ako ga nema
+        self.paths = []
+        # agenti koji cekaju novi put, queued sprjecava dvostruko dodavanje
+        self.queue = deque()
+        self.queued = array("B")
+        self.version = grid.version
+
+        # brojaci za mjerenje
+        self.replans = 0
+        self.replan_time = 0.0
+        self.failed = 0
+        self.arrivals = 0
+
+    def __len__(self):
+        return len(self.position)
+
+    # Dodaje agenta i vraca njegov broj. Put mu se racuna u sljedecem update().
+    def add(self, start, goal):
+        agent = len(self.position)
+        self.position.append(start)
+        self.goal.append(goal)
+        self.time.append(0)
+        self.cursor.append(0)
+        self.paths.append(None)
+        self.queued.append(0)
+        self.schedule(agent)
+        return agent
+
+    def set_goal(self, agent, goal):
+        self.goal[agent] = goal
+        self.schedule(agent)
+
+    def schedule(self, agent):
+        if not self.queued[agent]:
+            self.queued[agent] = 1
+            self.queue.append(agent)
+
+    # Jedan ciklus: provjera promjena mape, racunanje puteva u okviru budzeta
+    # i pomicanje agenata
+    def update(self):
+        if self.grid.version != self.version:
+            self.check_changes()
+        self.replan(self.budget)
+        self.advance()
+
+    # Novi put dobivaju agenti ciji preostali put prolazi kroz promijenjenu
+    # celiju i agenti koji do sada nisu imali put
+    def check_changes(self):
+        grid = self.grid
+        changes = grid.changes_since(self.version)
+        self.version = grid.version
+        changed = set(changes) if changes is not None else None
+
+        paths = self.paths
+        cursor = self.cursor
+        position = self.position
+        goal = self.goal
+        for agent in range(len(position)):
+            if self.queued[agent]:
+                continue
+            path = paths[agent]
+            if path is None:
+                if position[agent] != goal[agent]:
+                    self.schedule(agent)
+            elif changed is None or not changed.isdisjoint(path[cursor[agent] + 1 :]):
+                self.schedule(agent)
+
+    # Racuna puteve agenata iz reda dok ne istekne budzet (barem jedan put)
+    def replan(self, budget):
+        queue = self.queue
+        if not queue:
+            return 0
+        grid = self.grid
+        search = self.search
+        heuristic = self.heuristic
+        begin = time.perf_counter()
+        deadline = begin + budget
+        # anytime algoritmi (anytime.AnytimeAStar) dobivaju rok najvise do
+        # kraja budzeta, inace bi jedan put mogao potrositi puno vise od njega
+        timed = hasattr(search, "deadline")
+        update_heuristic(heuristic, grid)
+        done = 0
+        failed = []
+        while queue:
+            agent = queue.popleft()
+            self.queued[agent] = 0
+            options = {}
+            if timed:
+                remaining = max(0.0, (deadline - time.perf_counter()) * 1000)
+                if search.deadline is not None:
+                    remaining = min(remaining, search.deadline)
+                options["deadline"] = remaining
+            path = search(
+                grid, self.position[agent], self.goal[agent], heuristic, **options
+            )
+            if path:
+                self.paths[agent] = array("i", path)
+            else:
+                self.paths[agent] = None
+                self.failed += 1
+                failed.append(agent)
+            self.cursor[agent] = 0
+            self.time[agent] = 0
+            done += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        # agent sa nedostupnim ciljem bi cekao promjenu mape, pa dobiva novi
+        # cilj. Ceka na red tek u sljedecem pozivu, da agent zatvoren u maloj
+        # komponenti ne potrosi cijeli budzet.
+        if self.rng is not None:
+            for agent in failed:
+                self.set_goal(agent, self.random_free_cell())
+
+        self.replans += done
+        self.replan_time += time.perf_counter() - begin
+        return done
+
+    # Pomice agente prema istom pravilu kao Player: na celiji tezine c agent
+    # ostaje speed * c ciklusa
+    def advance(self):
+        cost = self.grid.cost
+        obstacle = self.grid.obstacle
+        speed = self.speed
+        position = self.position
+        cursor = self.cursor
+        times = self.time
+        paths = self.paths
+        for agent in range(len(position)):
+            path = paths[agent]
+            if path is None:
+                continue
+            step = cursor[agent]
+            if step + 1 >= len(path):
+                self.arrive(agent)
+                continue
+
+            current = path[step]
+            times[agent] += 1
+            if times[agent] < speed * cost[current]:
+                continue
+            # sljedeca celija je u medjuvremenu postala prepreka
+            if obstacle[path[step + 1]]:
+                self.schedule(agent)
+                continue
+            times[agent] = 0
+            cursor[agent] = step + 1
+            position[agent] = path[step + 1]
+
+    def arrive(self, agent):
+        self.paths[agent] = None
+        self.arrivals += 1
+        if self.rng is not None:
+            self.set_goal(agent, self.random_free_cell())
+
+    # Nasumicna celija bez prepreke (ili bilo koja ako ih je malo)
+    def random_free_cell(self):
+        grid = self.grid
+        for _ in range(100):
+            index = self.rng.randrange(grid.size)
+            if not grid.obstacle[index]:
+                return index
+        return index
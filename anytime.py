@@ -0,0 +1,296 @@
+# Pretrazivanje sa ogranicenom suboptimalnoscu: tezinski A* i ARA*.
+#
+# Tezinski A* siri cvorove po f = g + epsilon * h. Put je najvise epsilon puta
+# skuplji od najkraceg, a pretrazivanje prosiri puno manje cvorova. Zatvoreni
+# cvorovi se ne otvaraju ponovno, granica i dalje vrijedi.
+#
+# ARA* (Anytime Repairing A*) prvo brzo nadje put sa velikim epsilon, a zatim
+# smanjuje epsilon i popravlja put koristeci vrijednosti g prethodnog koraka,
+# sve dok ne dodje do epsilon 1 (najkraci put) ili ne istekne rok (deadline u
+# milisekundama). Nakon svakog koraka se zapisuje granica suboptimalnosti
+#   min(epsilon, g(cilj) / najmanji g + h medju otvorenim i nekonzistentnim)
+# pa granica moze biti i manja od epsilon. Prvi put se trazi i nakon isteka
+# roka, jer je kasni put bolji od nikakvog.
+#
+# Granica se zapisuje u stats.bound, a koraci ARA* u stats.improvements kao
+# (milisekunde, epsilon, trosak puta, granica).
+import heapq
+import time
+
+from pathfinding import CLOSED, DIRECTIONS, OPEN, UNVISITED
+
+# Tezina heuristike za tezinski A*
+WEIGHT = 2.0
+
+# Pocetni epsilon i smanjenje epsilon po koraku ARA*
+ANYTIME_EPSILON = 3.0
+ANYTIME_STEP = 0.5
+
+# Koliko cvorova ARA* prosiri izmedju dvije provjere roka
+DEADLINE_CHECK = 64
+
+
+# Tezinski A* sa zadanim epsilon. Poziva se kao astar.
+class WeightedAStar:
+    def __init__(self, epsilon=WEIGHT):
+        self.epsilon = epsilon
+
+    def __call__(self, grid, start, end, heuristic, stats=None):
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        if stats is not None:
+            stats.begin()
+            heuristic = stats.timed_heuristic(heuristic)
+            heappush = stats.heappush
+            heappop = stats.heappop
+
+        search = grid.new_search()
+
+        cols = grid.cols
+        rows = grid.rows
+        cost = grid.cost
+        obstacle = grid.obstacle
+        g = grid.g
+        parent = grid.parent
+        state = grid.state
+        stamp = grid.stamp
+        epsilon = self.epsilon
+        endPosition = grid.position(end)
+
+        stamp[start] = search
+        g[start] = 0
+        parent[start] = -1
+        h = heuristic(grid.position(start), endPosition)
+
+        openList = []
+        counter = 0
+        expanded = 0
+
+        heappush(openList, (epsilon * h, h, counter, 0, start))
+        state[start] = OPEN
+
+        while openList:
+            _, _, _, currentG, current = heappop(openList)
+
+            if state[current] == CLOSED or currentG > g[current]:
+                continue
+
+            state[current] = CLOSED
+            expanded += 1
+
+            if current == end:
+                if stats is None:
+                    return grid.reconstruct_path(current)
+                path = stats.reconstruct(grid.reconstruct_path, current)
+                stats.bound = epsilon
+                return stats.end(path, expanded, counter + 1, 0)
+
+            tentative_g = currentG + cost[current]
+            row, col = divmod(current, cols)
+
+            for dx, dy in DIRECTIONS:
+                x = col + dx
+                y = row + dy
+
+                if x < 0 or x >= cols or y < 0 or y >= rows:
+                    continue
+
+                neighbour = y * cols + x
+
+                if obstacle[neighbour]:
+                    continue
+
+                # zatvoreni cvor se ne otvara ponovno
+                if stamp[neighbour] == search and (
+                    state[neighbour] == CLOSED or tentative_g >= g[neighbour]
+                ):
+                    continue
+
+                stamp[neighbour] = search
+                parent[neighbour] = current
+                g[neighbour] = tentative_g
+                h = heuristic((x, y), endPosition)
+
+                state[neighbour] = OPEN
+                counter += 1
+                heappush(
+                    openList,
+                    (tentative_g + epsilon * h, h, counter, tentative_g, neighbour),
+                )
+
+        if stats is not None:
+            stats.end(None, expanded, counter + 1, 0)
+        return None
+
+
+# ARA*. Poziva se kao astar uz opcionalni rok u milisekundama (inace se
+# koristi rok iz konstruktora, a None znaci do najkraceg puta). Vraca zadnji
+# (najbolji) pronadjeni put.
+class AnytimeAStar:
+    def __init__(self, epsilon=ANYTIME_EPSILON, step=ANYTIME_STEP, deadline=None):
+        self.epsilon = epsilon
+        self.step = step
+        self.deadline = deadline
+        # koraci zadnjeg pretrazivanja (milisekunde, epsilon, trosak, granica)
+        self.improvements = []
+
+    def __call__(self, grid, start, end, heuristic, stats=None, deadline=None):
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        if stats is not None:
+            stats.begin()
+            heuristic = stats.timed_heuristic(heuristic)
+            heappush = stats.heappush
+            heappop = stats.heappop
+
+        if deadline is None:
+            deadline = self.deadline
+        begin = time.perf_counter()
+        stopAt = None if deadline is None else begin + deadline / 1000
+
+        search = grid.new_search()
+
+        cols = grid.cols
+        rows = grid.rows
+        cost = grid.cost
+        obstacle = grid.obstacle
+        g = grid.g
+        parent = grid.parent
+        state = grid.state
+        stamp = grid.stamp
+        endPosition = grid.position(end)
+        inf = float("inf")
+
+        # h se racuna jednom po celiji jer se kljucevi racunaju u svakom koraku
+        hValues = {}
+        # cvorovi zatvoreni u ovom koraku koji su dobili bolji g
+        incons = set()
+        # cvorovi u otvorenoj listi (zapisi u gomili mogu biti zastarjeli)
+        opened = {start}
+
+        stamp[start] = search
+        g[start] = 0
+        parent[start] = -1
+        hValues[start] = heuristic(grid.position(start), endPosition)
+
+        epsilon = self.epsilon
+        improvements = []
+        path = None
+        bound = None
+        counter = 0
+        expanded = 0
+        reopened = 0
+        openList = []
+
+        while True:
+            # otvorena lista se slaze ispocetka sa novim epsilon, a cvorovi
+            # koji su se poboljsali nakon zatvaranja se vracaju u nju
+            reopened += len(incons)
+            opened |= incons
+            incons = set()
+            openList = []
+            for index in opened:
+                state[index] = OPEN
+                h = hValues[index]
+                counter += 1
+                openList.append((g[index] + epsilon * h, h, counter, g[index], index))
+            heapq.heapify(openList)
+            closed = []
+
+            timedOut = False
+            while openList:
+                f, _, _, currentG, current = openList[0]
+                if state[current] == CLOSED or currentG > g[current]:
+                    heappop(openList)
+                    continue
+                # put do cilja nije skuplji od najmanjeg kljuca, korak je gotov
+                if stamp[end] == search and g[end] <= f:
+                    break
+                if (
+                    stopAt is not None
+                    and path is not None
+                    and expanded % DEADLINE_CHECK == 0
+                    and time.perf_counter() >= stopAt
+                ):
+                    timedOut = True
+                    break
+                heappop(openList)
+                opened.discard(current)
+                state[current] = CLOSED
+                closed.append(current)
+                expanded += 1
+
+                tentative_g = currentG + cost[current]
+                row, col = divmod(current, cols)
+
+                for dx, dy in DIRECTIONS:
+                    x = col + dx
+                    y = row + dy
+
+                    if x < 0 or x >= cols or y < 0 or y >= rows:
+                        continue
+
+                    neighbour = y * cols + x
+
+                    if obstacle[neighbour]:
+                        continue
+
+                    if stamp[neighbour] == search:
+                        if tentative_g >= g[neighbour]:
+                            continue
+                        parent[neighbour] = current
+                        g[neighbour] = tentative_g
+                        # zatvoreni cvor ceka sljedeci korak
+                        if state[neighbour] == CLOSED:
+                            incons.add(neighbour)
+                            continue
+                        h = hValues[neighbour]
+                    else:
+                        stamp[neighbour] = search
+                        parent[neighbour] = current
+                        g[neighbour] = tentative_g
+                        h = heuristic((x, y), endPosition)
+                        hValues[neighbour] = h
+
+                    state[neighbour] = OPEN
+                    opened.add(neighbour)
+                    counter += 1
+                    heappush(
+                        openList,
+                        (tentative_g + epsilon * h, h, counter, tentative_g, neighbour),
+                    )
+
+            if timedOut or stamp[end] != search:
+                break
+
+            # donja granica za najkraci put su cvorovi koji jos nisu rijeseni
+            lowest = min(
+                (g[index] + hValues[index] for index in opened | incons),
+                default=inf,
+            )
+            if g[end] == 0:
+                bound = 1.0
+            else:
+                bound = max(1.0, min(epsilon, g[end] / lowest))
+            if stats is None:
+                path = grid.reconstruct_path(end)
+            else:
+                path = stats.reconstruct(grid.reconstruct_path, end)
+            improvements.append(
+                ((time.perf_counter() - begin) * 1000, epsilon, g[end], bound)
+            )
+
+            if bound <= 1 or (stopAt is not None and time.perf_counter() >= stopAt):
+                break
+            epsilon = max(1.0, min(epsilon - self.step, bound))
+            # zatvoreni cvorovi iz ovog koraka se smiju opet prosiriti
+            for index in closed:
+                if state[index] == CLOSED:
+                    state[index] = UNVISITED
+
+        self.improvements = improvements
+        if stats is not None:
+            stats.bound = bound
+            stats.improvements = improvements
+            stats.end(path, expanded, counter + 1, reopened)
+        return path
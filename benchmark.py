@@ -0,0 +1,971 @@
+# Benchmark jezgre pretrazivanja bez pygame prozora.
+#
+# Za svaku velicinu mape i gustocu prepreka generira mape sa istom raspodjelom
+# tezina kao u igri (random_cost i place_random_obstacles), pokrece sve
+# algoritme sa svim heuristikama i ispisuje JSON sa percentilima vremena,
+# broja prosirenih cvorova i vrsne potrosnje memorije.
+#
+# Sa --distance-buckets N upiti se grupiraju po Manhattan udaljenosti izmedju
+# starta i cilja u N jednakih razreda, pa se vidi kako broj prosirenih cvorova
+# raste sa udaljenoscu (npr. astar prema bidirectional).
+#
+# Sa --batch SxT mjeri se propusnost (upita u sekundi) za S izvora i T ciljeva:
+# many_to_many sa zajednickim stablima prema petlji od S * T poziva astar.
+#
+# Sa --agents N1,N2 simulira se --frames ciklusa sa N agenata (AgentPool) koji
+# nakon dolaska dobivaju novi cilj, uz povremene promjene mape. Ispisuje se
+# trajanje ciklusa i broj novih puteva u sekundi za svaki broj agenata.
+#
+# Algoritmi sa predobradom (hpa) grade svoju strukturu jednom po mapi. Vrijeme
+# i memorija izgradnje ispisuju se posebno (build_ms, build_memory_bytes), a
+# latencija upita ih ne ukljucuje. Algoritmi sa poljem heuristike (astar_field,
+# astar_exact) racunaju polje za svaki novi cilj; to vrijeme je precompute_ms,
+# a latency_ms je samo upit. Sa --targets K svi upiti dijele K ciljeva.
+# Heuristika alt (orijentiri) gradi tablice jednom po mapi, heuristic_build_ms.
+#
+# Sa --generate mjeri se generiranje --maps mapa na kojima sigurno postoji put
+# (map_generator): vrijeme po mapi i po celiji te broj uklonjenih prepreka.
+#
+# Sa --map-file mapa se otvara iz binarne datoteke (map_file.py) preko mmap.
+# Ispisuje se trajanje otvaranja i zauzeta memorija (RSS) nakon otvaranja i
+# nakon upita. Upiti su unutar --query-radius celija jer bi na golemoj mapi
+# nasumicni parovi pretrazili vecinu mape.
+#
+# Sa --parallel N1,N2 svi upiti svih --maps mapa rjesavaju se sa ParallelSolver
+# (N radnih procesa, mapa u dijeljenoj memoriji). Ispisuje se propusnost i
+# ubrzanje prema jednom procesu i prema petlji u glavnom procesu.
+#
+# Sa --modes se na istim mapama i upitima usporedjuju nacini kretanja, svaki
+# sa svojom heuristikom (MODES): 4 smjera, 8 smjerova, Theta* i Lazy Theta*.
+# Ispisuje se ukupni trosak puteva, prosireni cvorovi i latencija po nacinu.
+#
+# Tezinski A* (weighted_astar) i ARA* (arastar) daju put ogranicene
+# suboptimalnosti; --epsilon mijenja njihov (pocetni) epsilon, a --deadline
+# rok ARA* u milisekundama. Ispisuje se granica (bound) i za ARA* vrijeme do
+# prvog puta (first_path_ms).
+#
+# Primjer:
+#   python benchmark.py --sizes 40x30,200x150 --densities 0.1,0.2 -o rezultat.json
+#   python benchmark.py --sizes 40x30 --baseline rezultat.json
+#   python benchmark.py --sizes 400x300 --algorithms astar,bidirectional \
+#       --heuristics manhattan --distance-buckets 5
+#   python benchmark.py --sizes 200x150 --batch 10x50
+#   python benchmark.py --sizes 200x150 --agents 100,500,1000 --frames 300
+#   python benchmark.py --sizes 40x30,400x300 --generate --maps 1000
+#   python benchmark.py --map-file velika.apm --algorithms astar,jps
+#   python benchmark.py --sizes 200x150 --parallel 1,2,4,8 --maps 10 --queries 200
+#   python benchmark.py --sizes 40x30,200x150 --modes
+#   python benchmark.py --sizes 400x300 --algorithms astar,arastar --deadline 10
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+
+from agents import AgentPool
+from anytime import AnytimeAStar, WeightedAStar
+from distance_fields import FieldPlanner, LandmarkHeuristic
+from hierarchical import HierarchicalPlanner
+from map_file import open_map
+from map_generator import generate_maps
+from movement import ThetaStar, astar8, path_cost
+from parallel import ParallelSolver
+from pathfinding import (
+    DStarLite,
+    Grid,
+    SearchStats,
+    astar,
+    bidirectional_astar,
+    chebyshev_distance,
+    euclidian_distance,
+    jps,
+    manhattan_distance,
+    many_to_many,
+    octile_distance,
+    place_random_obstacles,
+    random_cost,
+    update_heuristic,
+    weighted_jps,
+)
+
+HEURISTICS = {
+    "manhattan": manhattan_distance,
+    "euclidean": euclidian_distance,
+    "chebyshev": chebyshev_distance,
+    "octile": octile_distance,
+    # tablice orijentira se grade jednom po mapi (heuristic_build_ms)
+    "alt": LandmarkHeuristic(),
+}
+
+ALGORITHMS = {
+    "astar": lambda: astar,
+    "bidirectional": lambda: bidirectional_astar,
+    "dstar_lite": DStarLite,
+    "jps": lambda: jps,
+    "weighted_jps": lambda: weighted_jps,
+    "hpa": HierarchicalPlanner,
+    "astar_field": FieldPlanner,
+    "astar_exact": lambda: FieldPlanner(exact=True),
+    "astar8": lambda: astar8,
+    "theta": ThetaStar,
+    "lazy_theta": lambda: ThetaStar(lazy=True),
+    "weighted_astar": WeightedAStar,
+    "arastar": AnytimeAStar,
+}
+
+# Algoritmi koji se grade jednom po mapi i zatim odgovaraju na sve upite
+PREPROCESSED = {"hpa"}
+
+# Algoritmi koji pamte polje heuristike za cilj izmedju upita
+CACHED = {"astar_field", "astar_exact"}
+
+# Algoritmi sa bitmapom za liniju vidljivosti, koja se gradi jednom po mapi
+LINE_OF_SIGHT = {"theta", "lazy_theta"}
+
+# Nacini kretanja za --modes: algoritam i heuristika koja mu odgovara
+MODES = {
+    "4 smjera": ("astar", "manhattan"),
+    "8 smjerova": ("astar8", "octile"),
+    "theta": ("theta", "euclidean"),
+    "lazy_theta": ("lazy_theta", "euclidean"),
+}
+
+# Gustoca prepreka u igri: 250 nasumicnih prepreka na mapi 40x30
+GAME_DENSITY = 250 / 1200
+
+
+# Generira mapu i parove (start, cilj) za jedan slucaj benchmarka. Ako su
+# parovi zadani, koriste se oni umjesto nasumicnih.
+def make_map(cols, rows, density, queries, rng, pairs=None):
+    grid = Grid(cols, rows)
+    for index in range(grid.size):
+        grid.cost[index] = random_cost(rng)
+
+    if pairs is None:
+        pairs = [
+            (rng.randrange(grid.size), rng.randrange(grid.size))
+            for _ in range(queries)
+        ]
+    # kao u igri, prepreke se postavljaju nasumicno (moguca su ponavljanja)
+    obstacles = int(grid.size * density)
+    place_random_obstacles(grid, obstacles, None, None, rng)
+    for start, end in pairs:
+        grid.obstacle[start] = 0
+        grid.obstacle[end] = 0
+    grid.mark_all_changed()
+    return grid, pairs
+
+
+# Bira po queries parova za svaki od buckets razreda Manhattan udaljenosti.
+# Vraca listu (najmanja udaljenost, najveca udaljenost, parovi).
+def make_distance_pairs(cols, rows, buckets, queries, rng):
+    longest = cols + rows - 2
+    ranges = []
+    for bucket in range(buckets):
+        low = 1 + bucket * longest // buckets
+        high = (bucket + 1) * longest // buckets
+        ranges.append((low, high, []))
+
+    for low, high, pairs in ranges:
+        for _ in range(queries * 1000):
+            if len(pairs) == queries:
+                break
+            # biramo udaljenost pa pomak unutar mape, ostalo odbacujemo
+            distance = rng.randint(low, max(low, high))
+            dx = rng.randint(0, distance)
+            dy = distance - dx
+            if dx >= cols or dy >= rows:
+                continue
+            x = rng.randrange(cols - dx)
+            y = rng.randrange(rows - dy)
+            start = (x, y)
+            end = (x + dx, y + dy)
+            # smjer po svakoj osi je nasumican
+            if rng.random() < 0.5:
+                start, end = (end[0], start[1]), (start[0], end[1])
+            if rng.random() < 0.5:
+                start, end = end, start
+            pairs.append((start[1] * cols + start[0], end[1] * cols + end[0]))
+    return [(low, high, pairs) for low, high, pairs in ranges if pairs]
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def pick(p):
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    return {
+        "min": values[0],
+        "p50": pick(50),
+        "p90": pick(90),
+        "p99": pick(99),
+        "max": values[-1],
+        "mean": sum(values) / len(values),
+    }
+
+
+# Pokrece jedan algoritam sa jednom heuristikom nad svim upitima mape
+def run_case(grid, pairs, algorithm, heuristic, measure_memory):
+    latencies = []
+    per_expansion = []
+    expanded = []
+    pushed = []
+    peak_open = []
+    memory = []
+    costs = []
+    bounds = []
+    first_path = []
+    build = {}
+    precompute = []
+    planner = None
+    if algorithm in CACHED or algorithm in LINE_OF_SIGHT:
+        planner = ALGORITHMS[algorithm]()
+    update_heuristic(heuristic, grid)
+    if hasattr(heuristic, "build_time"):
+        build["heuristic_build_ms"] = heuristic.build_time * 1000
+    if algorithm in PREPROCESSED:
+        planner = ALGORITHMS[algorithm]()
+        begin = time.perf_counter_ns()
+        planner.update(grid)
+        build["build_ms"] = (time.perf_counter_ns() - begin) / 1e6
+        build["build_size_bytes"] = planner.memory_bytes()
+        if measure_memory:
+            tracemalloc.start()
+            ALGORITHMS[algorithm]().update(grid)
+            build["build_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    for start, end in pairs:
+        # D* Lite se svaki put stvara ispocetka, mjerimo potpuno planiranje
+        search = planner or ALGORITHMS[algorithm]()
+
+        if algorithm in CACHED:
+            begin = time.perf_counter_ns()
+            planner.prepare(grid, end, heuristic)
+            precompute.append((time.perf_counter_ns() - begin) / 1e6)
+
+        begin = time.perf_counter_ns()
+        path = search(grid, start, end, heuristic)
+        latencies.append((time.perf_counter_ns() - begin) / 1e6)
+
+        costs.append(path_cost(grid, path) if path else None)
+
+        # brojace i memoriju mjerimo u drugom pokretanju da ne utjecu na vrijeme
+        search = planner or ALGORITHMS[algorithm]()
+        stats = SearchStats()
+        if measure_memory:
+            tracemalloc.start()
+        search(grid, start, end, heuristic, stats=stats)
+        if measure_memory:
+            memory.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        expanded.append(stats.nodes_expanded)
+        pushed.append(stats.nodes_pushed)
+        peak_open.append(stats.peak_open_size)
+        # vrijeme prvog pokretanja (bez stats omotaca) po prosirenom cvoru
+        if stats.nodes_expanded:
+            per_expansion.append(latencies[-1] * 1e6 / stats.nodes_expanded)
+        if stats.bound is not None:
+            bounds.append(stats.bound)
+        if stats.improvements:
+            first_path.append(stats.improvements[0][0])
+
+    result = {
+        "latency_ms": percentiles(latencies),
+        "ns_per_expansion": percentiles(per_expansion),
+        "nodes_expanded": percentiles(expanded),
+        "nodes_pushed": percentiles(pushed),
+        "peak_open_size": percentiles(peak_open),
+        "peak_memory_bytes": percentiles(memory),
+        "paths_found": sum(1 for cost in costs if cost is not None),
+        "total_path_cost": sum(cost for cost in costs if cost is not None),
+    }
+    result.update(build)
+    if algorithm in CACHED:
+        result["precompute_ms"] = percentiles(precompute)
+        result["fields_built"] = planner.fields_built
+    if algorithm in LINE_OF_SIGHT:
+        result["line_of_sight_checks"] = planner.sight.checks
+    if bounds:
+        result["bound"] = percentiles(bounds)
+    if first_path:
+        result["first_path_ms"] = percentiles(first_path)
+    return result
+
+
+# Usporedjuje many_to_many sa petljom astar poziva za sve parove izvor-cilj
+def run_batch(grid, sources, targets, heuristic):
+    queries = len(sources) * len(targets)
+
+    begin = time.perf_counter_ns()
+    costs, _ = many_to_many(grid, sources, targets)
+    batchTime = (time.perf_counter_ns() - begin) / 1e9
+
+    begin = time.perf_counter_ns()
+    loopCosts = []
+    for source in sources:
+        row = []
+        for target in targets:
+            path = astar(grid, source, target, heuristic)
+            row.append(sum(grid.cost[i] for i in path[:-1]) if path else None)
+        loopCosts.append(row)
+    loopTime = (time.perf_counter_ns() - begin) / 1e9
+
+    return {
+        "queries": queries,
+        "batch_queries_per_second": queries / max(batchTime, 1e-9),
+        "astar_queries_per_second": queries / max(loopTime, 1e-9),
+        "speedup": loopTime / max(batchTime, 1e-9),
+        "costs_match": costs == loopCosts,
+    }
+
+
+# Simulira frames ciklusa igre sa zadanim brojem agenata i mjeri svaki ciklus
+def run_agents(grid, agents, frames, search, heuristic, speed, rng):
+    pool = AgentPool(grid, search, heuristic, speed=speed, rng=rng)
+    for _ in range(agents):
+        pool.add(pool.random_free_cell(), pool.random_free_cell())
+
+    frameTimes = []
+    queueLengths = []
+    begin = time.perf_counter()
+    for frame in range(frames):
+        # svakih 10 ciklusa igrac promijeni jednu celiju
+        if frame % 10 == 9:
+            index = rng.randrange(grid.size)
+            grid.set_obstacle(index, not grid.obstacle[index])
+        frameBegin = time.perf_counter_ns()
+        pool.update()
+        frameTimes.append((time.perf_counter_ns() - frameBegin) / 1e6)
+        queueLengths.append(len(pool.queue))
+    elapsed = time.perf_counter() - begin
+
+    return {
+        "agents": agents,
+        "frames": frames,
+        "frame_ms": percentiles(frameTimes),
+        "queue_length": percentiles(queueLengths),
+        "replans": pool.replans,
+        "replans_per_second": pool.replans / elapsed,
+        "replan_ms_per_frame": pool.replan_time * 1000 / frames,
+        "failed_replans": pool.failed,
+        "arrivals": pool.arrivals,
+    }
+
+
+# Generira count mapa iz seeda i mjeri trajanje generiranja svake mape
+def run_generate(cols, rows, density, count, seed):
+    times = []
+    removed = []
+    for grid, start, end, carved, elapsed in generate_maps(
+        count, cols, rows, density, seed
+    ):
+        times.append(elapsed * 1000)
+        removed.append(carved)
+    cells = cols * rows
+    return {
+        "maps": count,
+        "generate_ms": percentiles(times),
+        "ns_per_cell": sum(times) * 1e6 / (count * cells),
+        "removed_obstacles": percentiles(removed),
+        "connected_without_removal": sum(1 for carved in removed if not carved),
+    }
+
+
+# Rjesava iste upite na istim mapama sa razlicitim brojem procesa
+def run_parallel(maps, counts, search, heuristic):
+    queries = sum(len(pairs) for _, pairs in maps)
+
+    begin = time.perf_counter()
+    serialCosts = []
+    for grid, pairs in maps:
+        for start, end in pairs:
+            path = search(grid, start, end, heuristic)
+            serialCosts.append(path_cost(grid, path) if path else None)
+    serialTime = time.perf_counter() - begin
+
+    results = []
+    for count in counts:
+        begin = time.perf_counter()
+        solver = ParallelSolver(count, search, heuristic)
+        startup = time.perf_counter() - begin
+        costs = []
+        begin = time.perf_counter()
+        for grid, pairs in maps:
+            costs.extend(cost for cost, _ in solver.solve_all(grid, pairs))
+        elapsed = time.perf_counter() - begin
+        solver.close()
+        results.append(
+            {
+                "workers": count,
+                "queries": queries,
+                "startup_ms": startup * 1000,
+                "queries_per_second": queries / max(elapsed, 1e-9),
+                "serial_queries_per_second": queries / max(serialTime, 1e-9),
+                "costs_match": costs == serialCosts,
+            }
+        )
+    single = results[0]["queries_per_second"]
+    for result in results:
+        result["speedup"] = result["queries_per_second"] / single
+    return results
+
+
+# Zauzeta fizicka memorija procesa u bajtovima (na Linuxu trenutna, inace
+# najveca do sada)
+def resident_memory():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Otvara mapu iz datoteke i pokrece upite izmedju bliskih celija
+def run_map_file(path, algorithms, heuristics, queries, radius, seed):
+    before = resident_memory()
+    begin = time.perf_counter()
+    grid = open_map(path)
+    openTime = time.perf_counter() - begin
+    opened = resident_memory()
+
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(queries):
+        col = rng.randrange(grid.cols)
+        row = rng.randrange(grid.rows)
+        endCol = min(max(col + rng.randint(-radius, radius), 0), grid.cols - 1)
+        endRow = min(max(row + rng.randint(-radius, radius), 0), grid.rows - 1)
+        pairs.append((grid.index(col, row), grid.index(endCol, endRow)))
+    # start i cilj su slobodni, promjena ostaje samo u memoriji
+    for start, end in pairs:
+        grid.set_obstacle(start, False)
+        grid.set_obstacle(end, False)
+
+    results = []
+    for algorithm in algorithms:
+        for name in heuristics:
+            result = run_case(grid, pairs, algorithm, HEURISTICS[name], False)
+            result.update(
+                {
+                    "size": f"{grid.cols}x{grid.rows}",
+                    "density": None,
+                    "map": path,
+                    "algorithm": algorithm,
+                    "heuristic": name,
+                    "rss_after_bytes": resident_memory(),
+                }
+            )
+            results.append(result)
+    return {
+        "file_bytes": os.path.getsize(path),
+        "open_ms": openTime * 1000,
+        "rss_before_bytes": before,
+        "rss_after_open_bytes": opened,
+        "results": results,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(
+    sizes,
+    densities,
+    algorithms,
+    heuristics,
+    maps,
+    queries,
+    seed,
+    measure_memory,
+    distance_buckets=0,
+    batch=None,
+    agents=None,
+    frames=300,
+    agent_speed=1,
+    targets=None,
+    generate=False,
+    parallel=None,
+    modes=False,
+):
+    results = []
+    for cols, rows in sizes:
+        for density in densities:
+            if parallel:
+                parallelMaps = []
+                for map_number in range(maps):
+                    rng = random.Random(f"{seed}-{cols}x{rows}-{density}-{map_number}")
+                    parallelMaps.append(make_map(cols, rows, density, queries, rng))
+                for result in run_parallel(
+                    parallelMaps,
+                    parallel,
+                    ALGORITHMS[algorithms[0]](),
+                    HEURISTICS[heuristics[0]],
+                ):
+                    result.update(
+                        {
+                            "size": f"{cols}x{rows}",
+                            "density": density,
+                            "algorithm": algorithms[0],
+                            "heuristic": heuristics[0],
+                        }
+                    )
+                    results.append(result)
+                continue
+            if generate:
+                result = run_generate(cols, rows, density, maps, seed)
+                result.update({"size": f"{cols}x{rows}", "density": density})
+                results.append(result)
+                continue
+            for map_number in range(maps):
+                # svaka mapa ima svoj seed pa je ista bez obzira na ostale opcije
+                rng = random.Random(f"{seed}-{cols}x{rows}-{density}-{map_number}")
+                if agents:
+                    grid, _ = make_map(cols, rows, density, 0, rng)
+                    for count in agents:
+                        # svaki broj agenata krece od iste mape i istog seeda
+                        snapshot = grid.snapshot()
+                        result = run_agents(
+                            snapshot.to_grid(),
+                            count,
+                            frames,
+                            ALGORITHMS[algorithms[0]](),
+                            HEURISTICS[heuristics[0]],
+                            agent_speed,
+                            random.Random(f"{seed}-agents-{count}-{map_number}"),
+                        )
+                        result.update(
+                            {
+                                "size": f"{cols}x{rows}",
+                                "density": density,
+                                "map": map_number,
+                                "algorithm": algorithms[0],
+                                "heuristic": heuristics[0],
+                            }
+                        )
+                        results.append(result)
+                    continue
+                if batch:
+                    sources, targets = batch
+                    pairs = [
+                        (rng.randrange(cols * rows), rng.randrange(cols * rows))
+                        for _ in range(max(sources, targets))
+                    ]
+                    grid, _ = make_map(cols, rows, density, queries, rng, pairs)
+                    result = run_batch(
+                        grid,
+                        [start for start, _ in pairs[:sources]],
+                        [end for _, end in pairs[:targets]],
+                        HEURISTICS[heuristics[0]],
+                    )
+                    result.update(
+                        {
+                            "size": f"{cols}x{rows}",
+                            "density": density,
+                            "map": map_number,
+                            "algorithm": "many_to_many",
+                            "heuristic": heuristics[0],
+                        }
+                    )
+                    results.append(result)
+                    continue
+                if distance_buckets:
+                    groups = make_distance_pairs(
+                        cols, rows, distance_buckets, queries, rng
+                    )
+                    pairs = [pair for _, _, group in groups for pair in group]
+                    grid, _ = make_map(cols, rows, density, queries, rng, pairs)
+                elif targets:
+                    ends = [rng.randrange(cols * rows) for _ in range(targets)]
+                    pairs = [
+                        (rng.randrange(cols * rows), ends[query % targets])
+                        for query in range(queries)
+                    ]
+                    grid, _ = make_map(cols, rows, density, queries, rng, pairs)
+                    groups = [(None, None, pairs)]
+                else:
+                    grid, pairs = make_map(cols, rows, density, queries, rng)
+                    groups = [(None, None, pairs)]
+                if modes:
+                    cases = list(MODES.values())
+                else:
+                    cases = [
+                        (algorithm, name)
+                        for algorithm in algorithms
+                        for name in heuristics
+                    ]
+                for low, high, group in groups:
+                    for algorithm, name in cases:
+                        result = run_case(
+                            grid, group, algorithm, HEURISTICS[name], measure_memory
+                        )
+                        result.update(
+                            {
+                                "size": f"{cols}x{rows}",
+                                "density": density,
+                                "map": map_number,
+                                "algorithm": algorithm,
+                                "heuristic": name,
+                            }
+                        )
+                        if low is not None:
+                            result["distance"] = [low, high]
+                        results.append(result)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "seed": seed,
+            "maps": maps,
+            "queries": queries,
+            "distance_buckets": distance_buckets,
+            "batch": batch,
+            "agents": agents,
+            "targets": targets,
+            "generate": generate,
+            "parallel": parallel,
+            "modes": modes,
+        },
+        "results": results,
+    }
+
+
+def case_key(result):
+    return (
+        result["size"],
+        result["density"],
+        result["map"],
+        result["algorithm"],
+        result["heuristic"],
+        tuple(result.get("distance", ())),
+    )
+
+
+# Ispisuje medijan prosirenih cvorova po razredu udaljenosti za svaki algoritam
+def print_distance_table(report):
+    rows = {}
+    algorithms = []
+    for result in report["results"]:
+        if result["algorithm"] not in algorithms:
+            algorithms.append(result["algorithm"])
+        key = (result["size"], result["density"], result["heuristic"])
+        key += tuple(result["distance"])
+        rows.setdefault(key, {}).setdefault(result["algorithm"], []).append(
+            result["nodes_expanded"]["p50"]
+        )
+    header = "{:>10} {:<6} {:<10} {:>11}"
+    print(header.format("size", "dens", "heur", "distance"), end="")
+    for algorithm in algorithms:
+        print(" {:>14}".format(algorithm), end="")
+    print()
+    for key, medians in rows.items():
+        size, density, heuristic, low, high = key
+        print(
+            "{:>10} {:<6.3g} {:<10} {:>5}-{:<5}".format(
+                size, density, heuristic, low, high
+            ),
+            end="",
+        )
+        for algorithm in algorithms:
+            values = medians.get(algorithm)
+            # srednja vrijednost medijana preko svih mapa
+            value = sum(values) / len(values) if values else float("nan")
+            print(" {:>14.1f}".format(value), end="")
+        print()
+
+
+# Ispisuje omjer medijana vremena u odnosu na ranije spremljeni rezultat
+def compare(report, baseline):
+    old = {case_key(result): result for result in baseline["results"]}
+    for result in report["results"]:
+        previous = old.get(case_key(result))
+        if previous is None:
+            continue
+        ratio = result["latency_ms"]["p50"] / max(previous["latency_ms"]["p50"], 1e-9)
+        line = "p50 {:9.3f} ms -> {:9.3f} ms ({:.2f}x)".format(
+            previous["latency_ms"]["p50"], result["latency_ms"]["p50"], ratio
+        )
+        if "ns_per_expansion" in previous and "ns_per_expansion" in result:
+            line += "  po cvoru {:7.0f} ns -> {:7.0f} ns".format(
+                previous["ns_per_expansion"]["p50"], result["ns_per_expansion"]["p50"]
+            )
+        print(
+            "{:>10} {:<6} map {:<3} {:<13} {:<10}".format(*case_key(result)[:5]), line
+        )
+
+
+def print_batch_table(report):
+    for result in report["results"]:
+        print(
+            "{:>10} {:<6.3g} map {:<3} {:>6} upita".format(
+                result["size"], result["density"], result["map"], result["queries"]
+            ),
+            "many_to_many {:10.1f} q/s  astar {:10.1f} q/s  ({:.1f}x){}".format(
+                result["batch_queries_per_second"],
+                result["astar_queries_per_second"],
+                result["speedup"],
+                "" if result["costs_match"] else "  RAZLICITI TROSKOVI",
+            ),
+        )
+
+
+def print_agents_table(report):
+    for result in report["results"]:
+        print(
+            "{:>10} {:<6.3g} map {:<3} {:>6} agenata".format(
+                result["size"], result["density"], result["map"], result["agents"]
+            ),
+            "ciklus p50 {:7.2f} ms p99 {:7.2f} ms  {:8.1f} puteva/s  red p50 {}".format(
+                result["frame_ms"]["p50"],
+                result["frame_ms"]["p99"],
+                result["replans_per_second"],
+                result["queue_length"]["p50"],
+            ),
+        )
+
+
+def print_generate_table(report):
+    for result in report["results"]:
+        print(
+            "{:>10} {:<6.3g} {:>6} mapa".format(
+                result["size"], result["density"], result["maps"]
+            ),
+            "p50 {:8.3f} ms p99 {:8.3f} ms  {:7.1f} ns/celiji  uklonjeno p50 {}".format(
+                result["generate_ms"]["p50"],
+                result["generate_ms"]["p99"],
+                result["ns_per_cell"],
+                result["removed_obstacles"]["p50"],
+            ),
+        )
+
+
+def print_parallel_table(report):
+    for result in report["results"]:
+        print(
+            "{:>10} {:<6.3g} {:>3} procesa".format(
+                result["size"], result["density"], result["workers"]
+            ),
+            "{:9.1f} upita/s  ubrzanje {:5.2f}x  (petlja {:9.1f} upita/s){}".format(
+                result["queries_per_second"],
+                result["speedup"],
+                result["serial_queries_per_second"],
+                "" if result["costs_match"] else "  RAZLICITI TROSKOVI",
+            ),
+        )
+
+
+# Zbraja rezultate svih mapa po nacinu kretanja
+def print_modes_table(report):
+    names = {case: name for name, case in MODES.items()}
+    totals = {}
+    for result in report["results"]:
+        key = (
+            result["size"],
+            result["density"],
+            names[(result["algorithm"], result["heuristic"])],
+        )
+        total = totals.setdefault(key, {"cost": 0, "expanded": [], "latency": []})
+        total["cost"] += result["total_path_cost"]
+        total["expanded"].append(result["nodes_expanded"]["p50"])
+        total["latency"].append(result["latency_ms"]["p50"])
+    for (size, density, name), total in totals.items():
+        maps = len(total["latency"])
+        print(
+            "{:>10} {:<6.3g} {:<11}".format(size, density, name),
+            "trosak {:10.1f}  prosireno p50 {:8.1f}  latencija p50 {:8.3f} ms".format(
+                total["cost"],
+                sum(total["expanded"]) / maps,
+                sum(total["latency"]) / maps,
+            ),
+        )
+
+
+def parse_sizes(text):
+    sizes = []
+    for size in text.split(","):
+        cols, rows = size.lower().split("x")
+        sizes.append((int(cols), int(rows)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark algoritama pretrazivanja")
+    parser.add_argument("--sizes", default="40x30,200x150", type=parse_sizes)
+    parser.add_argument(
+        "--densities",
+        default=f"0.1,{GAME_DENSITY:.4f},0.3",
+        type=lambda text: [float(d) for d in text.split(",")],
+    )
+    parser.add_argument(
+        "--algorithms",
+        default="astar",
+        type=lambda text: text.split(","),
+        help="popis od: " + ", ".join(ALGORITHMS),
+    )
+    parser.add_argument(
+        "--heuristics",
+        default=",".join(HEURISTICS),
+        type=lambda text: text.split(","),
+    )
+    parser.add_argument("--maps", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument(
+        "--distance-buckets",
+        type=int,
+        default=0,
+        help="grupira upite po udaljenosti starta i cilja u N razreda",
+    )
+    parser.add_argument(
+        "--batch",
+        type=lambda text: tuple(int(n) for n in text.lower().split("x")),
+        help="SxT: propusnost many_to_many za S izvora i T ciljeva prema astar",
+    )
+    parser.add_argument(
+        "--agents",
+        type=lambda text: [int(n) for n in text.split(",")],
+        help="popis brojeva agenata za simulaciju vise agenata",
+    )
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument(
+        "--targets", type=int, help="broj razlicitih ciljeva u upitima mape"
+    )
+    parser.add_argument(
+        "--agent-speed",
+        type=int,
+        default=1,
+        help="ciklusi po celiji tezine 1 (u igri 50)",
+    )
+    parser.add_argument(
+        "--generate",
+        action="store_true",
+        help="mjeri generiranje --maps povezanih mapa umjesto pretrazivanja",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=lambda text: [int(n) for n in text.split(",")],
+        help="popis brojeva procesa za ParallelSolver (npr. 1,2,4,8)",
+    )
+    parser.add_argument(
+        "--modes",
+        action="store_true",
+        help="usporedjuje 4 smjera, 8 smjerova, Theta* i Lazy Theta* (MODES)",
+    )
+    parser.add_argument(
+        "--epsilon", type=float, help="epsilon za weighted_astar i arastar"
+    )
+    parser.add_argument(
+        "--deadline", type=float, help="rok ARA* (arastar) u milisekundama"
+    )
+    parser.add_argument("--map-file", help="binarna mapa (map_file.py) za upite")
+    parser.add_argument(
+        "--query-radius",
+        type=int,
+        default=100,
+        help="najveca udaljenost cilja od starta po osi kod --map-file",
+    )
+    parser.add_argument("-o", "--output", help="datoteka za JSON (inace stdout)")
+    parser.add_argument("--baseline", help="JSON ranijeg pokretanja za usporedbu")
+    args = parser.parse_args()
+
+    for algorithm in args.algorithms:
+        if algorithm not in ALGORITHMS:
+            parser.error(f"nepoznat algoritam: {algorithm}")
+    for name in args.heuristics:
+        if name not in HEURISTICS:
+            parser.error(f"nepoznata heuristika: {name}")
+
+    # epsilon i rok vrijede za sve pozive tezinskog A* i ARA* u ovom pokretanju
+    weighted = {} if args.epsilon is None else {"epsilon": args.epsilon}
+    anytime = dict(weighted)
+    if args.deadline is not None:
+        anytime["deadline"] = args.deadline
+    ALGORITHMS["weighted_astar"] = lambda: WeightedAStar(**weighted)
+    ALGORITHMS["arastar"] = lambda: AnytimeAStar(**anytime)
+
+    if args.map_file:
+        report = run_map_file(
+            args.map_file,
+            args.algorithms,
+            args.heuristics,
+            args.queries,
+            args.query_radius,
+            args.seed,
+        )
+        report["meta"] = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "seed": args.seed,
+            "queries": args.queries,
+            "query_radius": args.query_radius,
+        }
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(report, file, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+        return
+
+    report = run(
+        args.sizes,
+        args.densities,
+        args.algorithms,
+        args.heuristics,
+        args.maps,
+        args.queries,
+        args.seed,
+        not args.no_memory,
+        args.distance_buckets,
+        args.batch,
+        args.agents,
+        args.frames,
+        args.agent_speed,
+        args.targets,
+        args.generate,
+        args.parallel,
+        args.modes,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    elif args.distance_buckets:
+        print_distance_table(report)
+    elif args.batch:
+        print_batch_table(report)
+    elif args.agents:
+        print_agents_table(report)
+    elif args.generate:
+        print_generate_table(report)
+    elif args.parallel:
+        print_parallel_table(report)
+    elif args.modes:
+        print_modes_table(report)
+    elif not args.baseline:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
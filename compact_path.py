@@ -0,0 +1,140 @@
+# Kompaktni zapis puta za vrlo duge rute.
+#
+# Put se cuva samo kao vrhovi u array("i"): prva i zadnja celija i celije gdje
+# se mijenja smjer koraka. CompactPath uzima vrhove i gdje se mijenja tezina
+# celije, pa je izmedju dva vrha ravna crta kroz celije iste tezine i dio
+# puta kosta tezinu puta duljinu (segment_cost), isto kao dio any-angle puta
+# izmedju vrhova Theta*. Zato CompactPath prima i vrhove any-angle puta bez
+# pretvaranja u celije.
+#
+# Celije se racunaju tek kad su potrebne, unaprijed i dio po dio (iter_cells,
+# line_cells za jedan dio puta), pa igrac ide po putu bez liste svih celija.
+# Trosak ostatka puta se racuna jednom i smanjuje na svakom vrhu.
+#
+# Pretrazivanje slaze put od cilja prema startu (parent niz), pa put postoji
+# cijeli prije prvog koraka. Sazima se gotov put, a salju se celije.
+from array import array
+from itertools import islice
+
+from movement import line_cells, path_cost, segment_cost
+
+
+# Vrhovi puta kojem su susjedne celije susjedi na mrezi (4 ili 8 smjerova).
+# Sa zadanim cost vrh je i celija gdje se mijenja tezina.
+def iter_waypoints(cells, cost=None):
+    iterator = iter(cells)
+    previous = next(iterator, None)
+    if previous is None:
+        return
+    yield previous
+    step = None
+    weight = None if cost is None else cost[previous]
+    for cell in iterator:
+        # smjer koraka je razlika indeksa (1, -1, cols, -cols, ...)
+        delta = cell - previous
+        if step is not None and (
+            delta != step or (cost is not None and cost[previous] != weight)
+        ):
+            yield previous
+            if cost is not None:
+                weight = cost[previous]
+        step = delta
+        previous = cell
+    if step is not None:
+        yield previous
+
+
+# Celije puta redom od prvog vrha, dio po dio
+def iter_cells(grid, waypoints):
+    iterator = iter(waypoints)
+    current = next(iterator, None)
+    if current is None:
+        return
+    yield current
+    for target in iterator:
+        yield from line_cells(grid, current, target)
+        current = target
+
+
+class CompactPath:
+    # path su celije puta, ili vrhovi any-angle puta ako je waypoints True
+    def __init__(self, grid, path, waypoints=False):
+        self.grid = grid
+        self.waypoints = array(
+            "i", path if waypoints else iter_waypoints(path, grid.cost)
+        )
+        self.current = self.waypoints[0]
+        # indeks vrha prema kojem se ide i trosak puta od tog vrha do kraja
+        self.target = 0
+        self.rest = path_cost(grid, self.waypoints)
+        # celije do vrha target, obrnutim redom
+        self.segment = []
+        # broj koraka, mijenja se sa svakim pomakom (za kljuceve crtanja)
+        self.steps = 0
+        self.done = False
+
+    # Put je prazan nakon koraka sa zadnje celije
+    def __bool__(self):
+        return not self.done
+
+    # Preostale celije od trenutne
+    def __iter__(self):
+        if self.done:
+            return
+        yield self.current
+        yield from self.ahead()
+
+    # Preostale celije bez trenutne
+    def ahead(self):
+        yield from reversed(self.segment)
+        yield from islice(
+            iter_cells(self.grid, islice(self.waypoints, self.target, None)), 1, None
+        )
+
+    # Trosak ostatka puta od trenutne celije
+    @property
+    def cost(self):
+        if self.done:
+            return 0
+        return self.rest + segment_cost(
+            self.grid, self.current, self.waypoints[self.target]
+        )
+
+    # Sljedeca celija ili None na kraju puta. Celije sljedeceg dijela puta se
+    # racunaju tek kad se dodje do vrha.
+    def following(self):
+        waypoints = self.waypoints
+        while not self.segment:
+            if self.target + 1 >= len(waypoints):
+                return None
+            source = waypoints[self.target]
+            self.target += 1
+            self.rest -= segment_cost(self.grid, source, waypoints[self.target])
+            self.segment = line_cells(self.grid, source, waypoints[self.target])
+            self.segment.reverse()
+        return self.segment[-1]
+
+    # Trosak sljedeceg koraka (na zadnjoj celiji tezina te celije)
+    def step_cost(self):
+        following = self.following()
+        if following is None:
+            return self.grid.cost[self.current]
+        return segment_cost(self.grid, self.current, following)
+
+    # Prelazi na sljedecu celiju; nakon zadnje celije put je prazan
+    def advance(self):
+        following = self.following()
+        self.steps += 1
+        if following is None:
+            self.done = True
+            return
+        self.segment.pop()
+        self.current = following
+
+    # Pomice put na zadanu celiju ako je ona na ostatku puta
+    def seek(self, cell):
+        if cell not in self:
+            return False
+        while self.current != cell:
+            self.advance()
+        return True
@@ -0,0 +1,274 @@
+# Indeks povezanih komponenti slobodnih celija.
+#
+# Svaka slobodna celija ima oznaku komponente, a prepreke -1. Oznake koje su
+# spojene nakon uklanjanja prepreke povezuje union-find, pa je upit "moze li
+# se od starta doci do cilja" samo usporedba dviju oznaka. Kad nova prepreka
+# mozda razdvoji komponentu, celije oko nje dobivaju nove oznake flood
+# fillom, ali samo unutar te komponente. Promjene tezina ne utjecu na indeks.
+from array import array
+from collections import deque
+
+from pathfinding import DIRECTIONS
+
+NO_COMPONENT = -1
+
+# Osam celija oko celije redom (sjever, sjeveroistok, istok, ...). Susjedne
+# celije u prstenu su i susjedi na mrezi. Na parnim mjestima su 4 susjeda.
+RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+
+class ComponentIndex:
+    def __init__(self):
+        self.origin = None
+        self.version = -1
+        self.cols = 0
+        self.rows = 0
+        self.labels = array("i")
+        # union-find nad oznakama
+        self.parent = []
+        # broj potpunih izgradnji i ponovno oznacenih celija (za mjerenje)
+        self.builds = 0
+        self.relabeled = 0
+
+    # Uskladjuje indeks sa mrezom preko dnevnika promjena
+    def update(self, grid):
+        if (
+            grid.origin is not self.origin
+            or grid.cols != self.cols
+            or grid.rows != self.rows
+        ):
+            self.build(grid)
+            return
+        if grid.version == self.version:
+            return
+        changes = grid.changes_since(self.version)
+        if changes is None:
+            self.build(grid)
+            return
+        self.apply(grid, changes)
+        self.version = grid.version
+
+    def build(self, grid):
+        self.origin = grid.origin
+        self.version = grid.version
+        self.cols = grid.cols
+        self.rows = grid.rows
+        self.labels = array("i", [NO_COMPONENT]) * grid.size
+        self.parent = []
+        obstacle = grid.obstacle
+        labels = self.labels
+        for index in range(grid.size):
+            if not obstacle[index] and labels[index] == NO_COMPONENT:
+                self.fill(grid, index, self.new_label())
+        self.builds += 1
+
+    def new_label(self):
+        label = len(self.parent)
+        self.parent.append(label)
+        return label
+
+    def find(self, label):
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        # skracivanje puta
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def union(self, first, second):
+        first = self.find(first)
+        second = self.find(second)
+        if first != second:
+            self.parent[max(first, second)] = min(first, second)
+
+    # Oznacava sve slobodne celije dostupne od index oznakom label
+    def fill(self, grid, index, label):
+        cols = self.cols
+        rows = self.rows
+        obstacle = grid.obstacle
+        labels = self.labels
+        labels[index] = label
+        queue = deque([index])
+        filled = 1
+        while queue:
+            current = queue.popleft()
+            row, col = divmod(current, cols)
+            for dx, dy in DIRECTIONS:
+                x = col + dx
+                y = row + dy
+                if x < 0 or x >= cols or y < 0 or y >= rows:
+                    continue
+                neighbour = y * cols + x
+                if obstacle[neighbour] or labels[neighbour] == label:
+                    continue
+                labels[neighbour] = label
+                queue.append(neighbour)
+                filled += 1
+        return filled
+
+    def apply(self, grid, changes):
+        # stare oznake ostaju u union-find listi, pa je povremeno gradimo ispocetka
+        if len(self.parent) > 2 * len(self.labels):
+            self.build(grid)
+            return
+        obstacle = grid.obstacle
+        labels = self.labels
+        # celije su mogle biti promijenjene vise puta, gleda se samo trenutno stanje
+        blocked = []
+        freed = []
+        for index in set(changes):
+            if obstacle[index]:
+                if labels[index] != NO_COMPONENT:
+                    labels[index] = NO_COMPONENT
+                    blocked.append(index)
+            elif labels[index] == NO_COMPONENT:
+                freed.append(index)
+
+        # nova prepreka moze razdvojiti komponentu: susjedi dobivaju nove
+        # oznake, a susjed koji je vec dobio novu oznaku se preskace. Ako su
+        # susjedi povezani preko celija oko prepreke, komponenta ostaje cijela.
+        # To ne vrijedi ako je i susjedna celija postala prepreka, jer je put
+        # mogao ici kroz obje.
+        firstLabel = len(self.parent)
+        blockedSet = set(blocked)
+        for index in blocked:
+            neighbours = grid.neighbours(index)
+            if blockedSet.isdisjoint(neighbours) and self.ring_connected(grid, index):
+                continue
+            # jedna nova prepreka (najcesce, crtanje misem): oznacavaju se
+            # samo odvojeni dijelovi, a ne cijela komponenta
+            if len(blocked) == 1:
+                self.separate(grid, [n for n in neighbours if not obstacle[n]])
+                continue
+            for neighbour in neighbours:
+                if obstacle[neighbour] or labels[neighbour] >= firstLabel:
+                    continue
+                self.relabeled += self.fill(grid, neighbour, self.new_label())
+
+        # uklonjena prepreka spaja komponente svojih susjeda
+        for index in freed:
+            if labels[index] == NO_COMPONENT:
+                labels[index] = self.new_label()
+            for neighbour in grid.neighbours(index):
+                if labels[neighbour] != NO_COMPONENT:
+                    self.union(labels[index], labels[neighbour])
+
+    # Istovremeno pretrazivanje od svakog susjeda nove prepreke, jedna celija
+    # po pretrazivanju naizmjence. Pretrazivanja koja se sretnu se spajaju.
+    # Pretrazivanje koje ostane bez celija prije nego se sva spoje nasao je
+    # odvojeni dio, koji dobiva novu oznaku. Zadnje pretrazivanje se ne
+    # zavrsava, pa je trosak razmjeran manjim dijelovima.
+    def separate(self, grid, seeds):
+        cols = self.cols
+        rows = self.rows
+        obstacle = grid.obstacle
+        labels = self.labels
+        # pretrazivanje kojem celija pripada i union-find nad pretrazivanjima
+        owner = {}
+        group = list(range(len(seeds)))
+        queues = []
+        cells = []
+        for search, seed in enumerate(seeds):
+            owner[seed] = search
+            queues.append(deque([seed]))
+            cells.append([seed])
+        active = list(range(len(seeds)))
+
+        def find(search):
+            while group[search] != search:
+                search = group[search]
+            return search
+
+        while len(active) > 1:
+            for search in list(active):
+                if search not in active:
+                    continue
+                queue = queues[search]
+                if not queue:
+                    label = self.new_label()
+                    for index in cells[search]:
+                        labels[index] = label
+                    self.relabeled += len(cells[search])
+                    active.remove(search)
+                    if len(active) == 1:
+                        break
+                    continue
+
+                current = queue.popleft()
+                row, col = divmod(current, cols)
+                for dx, dy in DIRECTIONS:
+                    x = col + dx
+                    y = row + dy
+                    if x < 0 or x >= cols or y < 0 or y >= rows:
+                        continue
+                    neighbour = y * cols + x
+                    if obstacle[neighbour]:
+                        continue
+                    other = owner.get(neighbour)
+                    if other is None:
+                        owner[neighbour] = search
+                        queue.append(neighbour)
+                        cells[search].append(neighbour)
+                        continue
+                    other = find(other)
+                    if other == search:
+                        continue
+                    # spajamo manje pretrazivanje u vece
+                    if len(cells[other]) > len(cells[search]):
+                        search, other = other, search
+                    group[other] = search
+                    queues[search].extend(queues[other])
+                    cells[search].extend(cells[other])
+                    active.remove(other)
+                    if len(active) == 1:
+                        return
+                    queue = queues[search]
+
+    # Jesu li slobodni susjedi celije povezani preko osam celija oko nje
+    def ring_connected(self, grid, index):
+        cols = self.cols
+        rows = self.rows
+        obstacle = grid.obstacle
+        row, col = divmod(index, cols)
+        free = []
+        for dx, dy in RING:
+            x = col + dx
+            y = row + dy
+            free.append(0 <= x < cols and 0 <= y < rows and not obstacle[y * cols + x])
+
+        # broji nizove uzastopnih slobodnih celija u prstenu koji sadrze susjeda
+        runs = 0
+        for position in range(0, 8):
+            if not free[position] or free[position - 1]:
+                continue
+            end = position
+            while free[end % 8]:
+                if end % 2 == 0:
+                    runs += 1
+                    break
+                end += 1
+        # cijeli prsten slobodan je jedan niz
+        return runs <= 1
+
+    def component(self, index):
+        label = self.labels[index]
+        if label == NO_COMPONENT:
+            return NO_COMPONENT
+        return self.find(label)
+
+    # Moze li se od starta doci do cilja. Igrac moze izaci sa prepreke na
+    # kojoj stoji, pa se tada gledaju komponente susjeda starta.
+    def reachable(self, grid, start, end):
+        if start == end:
+            return True
+        target = self.component(end)
+        if target == NO_COMPONENT:
+            return False
+        if not grid.obstacle[start]:
+            return self.component(start) == target
+        return any(
+            self.component(neighbour) == target
+            for neighbour in grid.neighbours(start)
+        )
@@ -0,0 +1,377 @@
+# Heuristika izracunata unaprijed za cijelu mrezu.
+#
+# astar poziva heuristiku za svakog susjeda. heuristic_field izracuna
+# vrijednosti za sve celije prema cilju u jednom prolazu (sa NumPy-em ako je
+# instaliran), pa pretrazivanje samo cita field[indeks]. goal_distance_field
+# umjesto procjene daje tocnu udaljenost do cilja (Dijkstra unatrag od cilja).
+# Sa njom A* siri samo celije najkraceg puta, pa se isplati kod vise upita
+# prema istom cilju dok se mapa ne promijeni.
+# LandmarkHeuristic (ALT) cuva tocne udaljenosti od i do nekoliko orijentira
+# i iz njih preko nejednakosti trokuta procjenjuje udaljenost bilo koja dva
+# polja, uzimajuci u obzir prepreke i tezine.
+import heapq
+import time
+from array import array
+from collections import OrderedDict
+
+from pathfinding import (
+    CLOSED,
+    DIRECTIONS,
+    OPEN,
+    chebyshev_distance,
+    euclidian_distance,
+    manhattan_distance,
+    shortest_path_tree,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INFINITY = float("inf")
+
+# Oznaka nedostupne celije u tablicama udaljenosti orijentira
+UNREACHABLE = 0xFFFFFFFF
+
+# NumPy verzije heuristika, primaju razlike koordinata po osima
+if numpy is not None:
+    NUMPY_HEURISTICS = {
+        manhattan_distance: lambda dx, dy: dx + dy,
+        euclidian_distance: lambda dx, dy: numpy.sqrt(dx * dx + dy * dy),
+        chebyshev_distance: numpy.maximum,
+    }
+else:
+    NUMPY_HEURISTICS = {}
+
+
+# Pretvara NumPy niz u array("d") jer je citanje pojedinacnih elemenata iz
+# njega puno brze nego iz NumPy niza
+def to_array(values):
+    field = array("d")
+    field.frombytes(values.astype(numpy.float64).tobytes())
+    return field
+
+
+# Vrijednost heuristike od svake celije do cilja kao array("d") velicine mreze
+def heuristic_field(cols, rows, end, heuristic):
+    endRow, endCol = divmod(end, cols)
+    kernel = NUMPY_HEURISTICS.get(heuristic)
+    if kernel is not None:
+        ys, xs = numpy.indices((rows, cols), dtype=numpy.int64)
+        values = kernel(numpy.abs(xs - endCol), numpy.abs(ys - endRow))
+        return to_array(values.ravel())
+
+    # bez NumPy-a (ili za nepoznatu heuristiku) racunamo celiju po celiju
+    endPosition = (endCol, endRow)
+    return array(
+        "d",
+        [
+            heuristic((col, row), endPosition)
+            for row in range(rows)
+            for col in range(cols)
+        ],
+    )
+
+
+# Tocna udaljenost od svake celije do cilja (beskonacno ako cilj nije
+# dostupan). Koristi pomocne nizove mreze.
+def goal_distance_field(grid, end):
+    shortest_path_tree(grid, end, (), reverse=True)
+    search = grid.search_id
+    if numpy is not None:
+        reached = numpy.frombuffer(grid.stamp, dtype=numpy.uint32) == search
+        g = numpy.frombuffer(grid.g, dtype=numpy.float64)
+        return to_array(numpy.where(reached, g, INFINITY))
+
+    field = array("d", [INFINITY]) * grid.size
+    g = grid.g
+    stamp = grid.stamp
+    for index in range(grid.size):
+        if stamp[index] == search:
+            field[index] = g[index]
+    return field
+
+
+# Udaljenosti od korijena do svake celije (unatrag: od celije do korijena) kao
+# array("I"), UNREACHABLE za celije do kojih se ne moze
+def distance_table(grid, root, reverse=False):
+    shortest_path_tree(grid, root, (), reverse)
+    search = grid.search_id
+    table = array("I")
+    if numpy is not None:
+        reached = numpy.frombuffer(grid.stamp, dtype=numpy.uint32) == search
+        g = numpy.frombuffer(grid.g, dtype=numpy.float64)
+        values = numpy.where(reached, g, UNREACHABLE).astype(numpy.uint32)
+        table.frombytes(values.tobytes())
+        return table
+
+    table = array("I", [UNREACHABLE]) * grid.size
+    g = grid.g
+    stamp = grid.stamp
+    for index in range(grid.size):
+        if stamp[index] == search:
+            table[index] = int(g[index])
+    return table
+
+
+# A* koji heuristiku cita iz polja umjesto da je racuna. Inace je isti kao
+# astar, osim sto preskace celije iz kojih se do cilja ne moze (beskonacno).
+def field_astar(grid, start, end, field, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    search = grid.new_search()
+
+    cols = grid.cols
+    rows = grid.rows
+    cost = grid.cost
+    obstacle = grid.obstacle
+    g = grid.g
+    parent = grid.parent
+    state = grid.state
+    stamp = grid.stamp
+
+    stamp[start] = search
+    g[start] = 0
+    parent[start] = -1
+    h = field[start]
+
+    openList = []
+    counter = 0
+    expanded = 0
+    reopened = 0
+
+    heappush(openList, (h, h, counter, 0, start))
+    state[start] = OPEN
+
+    while openList:
+        _, _, _, currentG, current = heappop(openList)
+
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+
+        state[current] = CLOSED
+        expanded += 1
+
+        if current == end:
+            if stats is None:
+                return grid.reconstruct_path(current)
+            path = stats.reconstruct(grid.reconstruct_path, current)
+            return stats.end(path, expanded, counter + 1, reopened)
+
+        tentative_g = currentG + cost[current]
+        row, col = divmod(current, cols)
+
+        for dx, dy in DIRECTIONS:
+            x = col + dx
+            y = row + dy
+
+            if x < 0 or x >= cols or y < 0 or y >= rows:
+                continue
+
+            neighbour = y * cols + x
+
+            if obstacle[neighbour]:
+                continue
+
+            h = field[neighbour]
+            if h == INFINITY:
+                continue
+
+            if stamp[neighbour] == search:
+                if tentative_g >= g[neighbour]:
+                    continue
+                if state[neighbour] == CLOSED:
+                    reopened += 1
+
+            stamp[neighbour] = search
+            parent[neighbour] = current
+            g[neighbour] = tentative_g
+
+            state[neighbour] = OPEN
+            counter += 1
+            heappush(openList, (tentative_g + h, h, counter, tentative_g, neighbour))
+
+    if stats is not None:
+        stats.end(None, expanded, counter + 1, reopened)
+    return None
+
+
+# Poziva se kao i astar. Polja za zadnjih max_fields ciljeva se cuvaju i
+# koriste ponovno (LRU). Obicno polje ovisi samo o velicini mreze, cilju i
+# heuristici, a tocno polje (exact True) vrijedi samo do promjene mreze.
+class FieldPlanner:
+    optimal = True
+
+    def __init__(self, exact=False, max_fields=8):
+        self.exact = exact
+        self.max_fields = max_fields
+        self.fields = OrderedDict()
+        self.field = None
+        # ukupno vrijeme i broj izracunatih polja
+        self.precompute_time = 0.0
+        self.fields_built = 0
+
+    def __call__(self, grid, start, end, heuristic, stats=None):
+        self.prepare(grid, end, heuristic)
+        return field_astar(grid, start, end, self.field, stats)
+
+    # Postavlja polje za cilj, racuna ga samo ako nije zapamceno
+    def prepare(self, grid, end, heuristic):
+        if self.exact:
+            key = (grid.origin, grid.version, grid.cols, grid.rows, end)
+        else:
+            # heuristika sa tablicama mijenja vrijednosti kad se tablice obnove
+            version = getattr(heuristic, "version", None)
+            key = (grid.cols, grid.rows, end, heuristic, version)
+
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+            self.field = field
+            return
+
+        begin = time.perf_counter()
+        if self.exact:
+            field = goal_distance_field(grid, end)
+        else:
+            field = heuristic_field(grid.cols, grid.rows, end, heuristic)
+        self.precompute_time += time.perf_counter() - begin
+        self.fields_built += 1
+
+        self.fields[key] = field
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        self.field = field
+
+
+# ALT heuristika (A*, orijentiri i nejednakost trokuta). Za svaki orijentir L
+# cuvaju se tocne udaljenosti d(L, v) i d(v, L) za sve celije. Za put od v do
+# t vrijedi d(v, t) >= d(L, t) - d(L, v) i d(v, t) >= d(v, L) - d(t, L), a
+# najveca od tih granica (i Manhattan udaljenosti) je dopustiva i konzistentna.
+# Poziva se kao obicna heuristika, a prije pretrazivanja treba pozvati
+# update(grid) (vidi update_heuristic). Tablice se racunaju ponovno tek kod
+# prvog koristenja nakon promjene mreze.
+class LandmarkHeuristic:
+    def __init__(self, landmarks=8):
+        self.count = landmarks
+        self.origin = None
+        self.grid_version = -1
+        self.cols = 0
+        self.rows = 0
+        # broj izgradnji tablica, po njemu planeri znaju da su se vrijednosti
+        # heuristike promijenile
+        self.version = 0
+        self.build_time = 0.0
+        self.landmarks = []
+        # tablice d(L, v) i d(v, L) za svaki orijentir
+        self.forward = []
+        self.backward = []
+        self.end = -1
+        self.last_end = -1
+        self.terms = []
+
+    def update(self, grid):
+        if (
+            grid.origin is self.origin
+            and grid.version == self.grid_version
+            and grid.cols == self.cols
+            and grid.rows == self.rows
+        ):
+            return
+        begin = time.perf_counter()
+        self.build(grid)
+        self.build_time = time.perf_counter() - begin
+        self.origin = grid.origin
+        self.grid_version = grid.version
+        self.cols = grid.cols
+        self.rows = grid.rows
+        self.version += 1
+        self.end = -1
+        self.last_end = -1
+
+    # Bira orijentire metodom najudaljenije tocke: svaki sljedeci je slobodna
+    # celija najudaljenija od vec odabranih. Prvi je najudaljeniji od prve
+    # slobodne celije mreze.
+    def build(self, grid):
+        self.landmarks = []
+        self.forward = []
+        self.backward = []
+
+        free = [index for index in range(grid.size) if not grid.obstacle[index]]
+        if not free:
+            return
+        nearest = distance_table(grid, free[0])
+        # celije nedostupne od pocetne celije (druge komponente) ne biramo
+        reachable = [index for index in free if nearest[index] != UNREACHABLE]
+
+        for _ in range(min(self.count, len(reachable))):
+            landmark = max(reachable, key=nearest.__getitem__)
+            if self.landmarks and nearest[landmark] == 0:
+                break
+            forward = distance_table(grid, landmark)
+            self.landmarks.append(landmark)
+            self.forward.append(forward)
+            self.backward.append(distance_table(grid, landmark, reverse=True))
+            if not self.landmarks[1:]:
+                nearest = forward
+            else:
+                nearest = array("I", map(min, nearest, forward))
+
+    # Granice koje ovise samo o cilju racunamo jednom po cilju
+    def set_end(self, end):
+        self.end = end
+        self.terms = []
+        for forward, backward in zip(self.forward, self.backward):
+            toEnd = forward[end]
+            fromEnd = backward[end]
+            # orijentir iz kojeg se ne dolazi do cilja (ili obrnuto) ne daje granicu
+            if toEnd != UNREACHABLE:
+                self.terms.append((forward, toEnd, 1))
+            if fromEnd != UNREACHABLE:
+                self.terms.append((backward, fromEnd, -1))
+
+    def __call__(self, start, end):
+        cols = self.cols
+        index = start[1] * cols + start[0]
+        endIndex = end[1] * cols + end[0]
+        best = abs(end[0] - start[0]) + abs(end[1] - start[1])
+
+        if endIndex != self.end:
+            # A* trazi procjene prema istom cilju, pa granice pripremamo tek
+            # kad se cilj ponovi. Dvosmjerna pretraga i D* Lite mijenjaju
+            # drugi kraj kod svakog poziva i racunaju se izravno.
+            if endIndex != self.last_end:
+                self.last_end = endIndex
+                return self.estimate(index, endIndex, best)
+            self.set_end(endIndex)
+
+        for table, value, sign in self.terms:
+            # d(L, t) - d(L, v) ili d(v, L) - d(t, L). Celija bez udaljenosti u
+            # tablici (npr. pocetak na prepreci) ne daje granicu.
+            distance = table[index]
+            if distance == UNREACHABLE:
+                continue
+            bound = (value - distance) * sign
+            if bound > best:
+                best = bound
+        return best
+
+    def estimate(self, index, endIndex, best):
+        for forward, backward in zip(self.forward, self.backward):
+            toEnd = forward[endIndex]
+            toStart = forward[index]
+            if toEnd != UNREACHABLE and toStart != UNREACHABLE:
+                if toEnd - toStart > best:
+                    best = toEnd - toStart
+            fromStart = backward[index]
+            fromEnd = backward[endIndex]
+            if fromStart != UNREACHABLE and fromEnd != UNREACHABLE:
+                if fromStart - fromEnd > best:
+                    best = fromStart - fromEnd
+        return best
@@ -0,0 +1,462 @@
+# Hijerarhijsko pretrazivanje (HPA*) za velike mape.
+#
+# Mreza se dijeli na kvadratne klastere. Na granici dva susjedna klastera svaki
+# niz slobodnih parova celija (jedna sa svake strane) je ulaz, a u svakom ulazu
+# biramo jedan ili dva prijelaza. Celije prijelaza su cvorovi apstraktnog
+# grafa: izmedju cvorova istog klastera brid ima duljinu najkraceg puta unutar
+# klastera, a par prijelaza je spojen bridom sa tezinom celije iz koje se
+# izlazi (kao u astar, korak iz celije u kosta cost[u]).
+#
+# Upit spaja start i cilj sa cvorovima njihovih klastera, trazi put A*-om po
+# apstraktnom grafu i zatim svaki segment pretvara u celije pretrazivanjem
+# unutar jednog klastera. Put je skoro najkraci jer prolazi samo kroz odabrane
+# prijelaze. Kad se promijeni celija, ponovno se racunaju samo njen klaster i
+# granice koje ona dodiruje.
+import heapq
+import sys
+import time
+
+from pathfinding import CLOSED, DIRECTIONS, OPEN
+
+# Ulaz dulji od ovoga dobiva dva prijelaza (na krajevima), kraci samo jedan
+LONG_ENTRANCE = 6
+
+# Granica klastera prema desnom i prema donjem susjedu
+RIGHT = 0
+DOWN = 1
+
+
+# Poziva se kao i astar: planner(grid, start, end, heuristic). Apstrakcija se
+# gradi kod prvog poziva, a kasnije se popravlja prema dnevniku promjena mreze.
+class HierarchicalPlanner:
+    def __init__(self, cluster_size=16):
+        self.cluster_size = cluster_size
+        self.grid = None
+        self.origin = None
+        self.version = -1
+        self.cols = 0
+        self.rows = 0
+        # brojaci zadnjeg upita
+        self.expanded = 0
+        self.pushed = 0
+        # trajanje i broj klastera zadnje izgradnje (cijele ili djelomicne)
+        self.build_time = 0.0
+        self.rebuilt_clusters = 0
+        self.full_build = False
+
+    def __call__(self, grid, start, end, heuristic, stats=None):
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        self.update(grid)
+
+        if stats is not None:
+            stats.begin()
+            heuristic = stats.timed_heuristic(heuristic)
+            heappush = stats.heappush
+            heappop = stats.heappop
+        self.expanded = 0
+        self.pushed = 0
+
+        path = self.find_path(start, end, heuristic, heappush, heappop)
+        if stats is None:
+            return path
+        return stats.end(path, self.expanded, self.pushed, 0)
+
+    # Gradi ili popravlja apstrakciju tako da odgovara trenutnoj mrezi
+    def update(self, grid):
+        changes = None
+        # kopija iste mreze (npr. u PathWorker-u) nastavlja sa istom apstrakcijom
+        if (
+            grid.origin is self.origin
+            and grid.cols == self.cols
+            and grid.rows == self.rows
+        ):
+            changes = grid.changes_since(self.version)
+        self.grid = grid
+
+        if changes is None:
+            begin = time.perf_counter()
+            self.build()
+            self.build_time = time.perf_counter() - begin
+            self.rebuilt_clusters = self.cluster_count
+            self.full_build = True
+        elif changes:
+            begin = time.perf_counter()
+            self.rebuilt_clusters = self.rebuild(set(changes))
+            self.build_time = time.perf_counter() - begin
+            self.full_build = False
+
+        self.origin = grid.origin
+        self.version = grid.version
+
+    def build(self):
+        grid = self.grid
+        size = self.cluster_size
+        self.cols = grid.cols
+        self.rows = grid.rows
+        self.cluster_cols = -(-grid.cols // size)
+        self.cluster_rows = -(-grid.rows // size)
+        self.cluster_count = self.cluster_cols * self.cluster_rows
+
+        # (klaster, RIGHT ili DOWN) -> lista prijelaza, svaki prijelaz je par
+        # (celija u klasteru, celija u susjednom klasteru)
+        self.transitions = {}
+        # celija prijelaza -> celije sa druge strane granice
+        self.links = {}
+        # klaster -> {cvor: {cvor: duljina puta unutar klastera}}
+        self.intra = {}
+
+        for cluster in range(self.cluster_count):
+            for side in (RIGHT, DOWN):
+                self.build_border(cluster, side)
+        for cluster in range(self.cluster_count):
+            self.build_intra(cluster)
+
+    # Popravlja samo klastere i granice na koje utjecu promijenjene celije.
+    # Vraca broj ponovno izracunatih klastera.
+    def rebuild(self, changes):
+        cols = self.cols
+        size = self.cluster_size
+        clusters = set()
+        borders = set()
+        for index in changes:
+            row, col = divmod(index, cols)
+            cluster = self.cluster_of(index)
+            clusters.add(cluster)
+            # celija na rubu klastera mijenja prijelaze prema susjednom klasteru
+            x = col % size
+            y = row % size
+            if x == size - 1 and col + 1 < cols:
+                borders.add((cluster, RIGHT))
+            if x == 0 and col > 0:
+                borders.add((cluster - 1, RIGHT))
+            if y == size - 1 and row + 1 < self.rows:
+                borders.add((cluster, DOWN))
+            if y == 0 and row > 0:
+                borders.add((cluster - self.cluster_cols, DOWN))
+
+        for cluster, side in borders:
+            self.build_border(cluster, side)
+            # promijenjeni prijelazi mijenjaju cvorove klastera sa obje strane
+            clusters.add(cluster)
+            clusters.add(self.neighbour_cluster(cluster, side))
+
+        for cluster in clusters:
+            self.build_intra(cluster)
+        return len(clusters)
+
+    def cluster_of(self, index):
+        row, col = divmod(index, self.cols)
+        size = self.cluster_size
+        return (row // size) * self.cluster_cols + col // size
+
+    def neighbour_cluster(self, cluster, side):
+        return cluster + 1 if side == RIGHT else cluster + self.cluster_cols
+
+    # Granice klastera u celijama: (x0, y0, x1, y1), x1 i y1 nisu ukljuceni
+    def bounds(self, cluster):
+        size = self.cluster_size
+        cy, cx = divmod(cluster, self.cluster_cols)
+        x0 = cx * size
+        y0 = cy * size
+        return (x0, y0, min(x0 + size, self.cols), min(y0 + size, self.rows))
+
+    # Racuna prijelaze na granici klastera prema desnom ili donjem susjedu
+    def build_border(self, cluster, side):
+        grid = self.grid
+        cols = self.cols
+        cost = grid.cost
+        obstacle = grid.obstacle
+        x0, y0, x1, y1 = self.bounds(cluster)
+
+        # parovi celija preko granice redom uz granicu
+        if side == RIGHT:
+            if x1 >= cols:
+                return
+            pairs = [(y * cols + x1 - 1, y * cols + x1) for y in range(y0, y1)]
+        else:
+            if y1 >= self.rows:
+                return
+            pairs = [((y1 - 1) * cols + x, y1 * cols + x) for x in range(x0, x1)]
+
+        # uklanjamo stare prijelaze iz veza
+        for a, b in self.transitions.pop((cluster, side), ()):
+            self.unlink(a, b)
+            self.unlink(b, a)
+
+        transitions = []
+        entrance = []
+        # zadnji par (None, None) zatvara zadnji ulaz
+        for a, b in pairs + [(None, None)]:
+            if a is not None and not obstacle[a] and not obstacle[b]:
+                entrance.append((a, b))
+                continue
+            if not entrance:
+                continue
+            if len(entrance) >= LONG_ENTRANCE:
+                transitions.append(entrance[0])
+                transitions.append(entrance[-1])
+            else:
+                # najjeftiniji prijelaz, kod jednakih onaj blize sredini
+                middle = (len(entrance) - 1) / 2
+                best = min(
+                    range(len(entrance)),
+                    key=lambda i: (
+                        cost[entrance[i][0]] + cost[entrance[i][1]],
+                        abs(i - middle),
+                    ),
+                )
+                transitions.append(entrance[best])
+            entrance = []
+
+        self.transitions[(cluster, side)] = transitions
+        for a, b in transitions:
+            self.links.setdefault(a, []).append(b)
+            self.links.setdefault(b, []).append(a)
+
+    def unlink(self, a, b):
+        partners = self.links[a]
+        partners.remove(b)
+        if not partners:
+            del self.links[a]
+
+    # Celije prijelaza koje leze u klasteru (sa sve cetiri granice)
+    def cluster_nodes(self, cluster):
+        nodes = set()
+        for a, _ in self.transitions.get((cluster, RIGHT), ()):
+            nodes.add(a)
+        for a, _ in self.transitions.get((cluster, DOWN), ()):
+            nodes.add(a)
+        cy, cx = divmod(cluster, self.cluster_cols)
+        if cx > 0:
+            for _, b in self.transitions.get((cluster - 1, RIGHT), ()):
+                nodes.add(b)
+        if cy > 0:
+            for _, b in self.transitions.get((cluster - self.cluster_cols, DOWN), ()):
+                nodes.add(b)
+        return nodes
+
+    # Duljine najkracih puteva unutar klastera izmedju svih njegovih cvorova
+    def build_intra(self, cluster):
+        grid = self.grid
+        nodes = self.cluster_nodes(cluster)
+        edges = {}
+        for node in nodes:
+            self.cluster_dijkstra(node, cluster, targets=nodes)
+            g = grid.g
+            stamp = grid.stamp
+            search = grid.search_id
+            edges[node] = {
+                other: g[other]
+                for other in nodes
+                if other != node and stamp[other] == search
+            }
+        self.intra[cluster] = edges
+
+    # Dijkstra ogranicen na jedan klaster, rezultat ostaje u pomocnim nizovima
+    # mreze. Unatrag (reverse) racuna udaljenosti do izvora umjesto od njega.
+    # Ako su zadane ciljne celije, staje cim su sve zatvorene.
+    # Vraca broj prosirenih cvorova.
+    def cluster_dijkstra(
+        self,
+        source,
+        cluster,
+        reverse=False,
+        targets=None,
+        heappush=heapq.heappush,
+        heappop=heapq.heappop,
+    ):
+        grid = self.grid
+        cols = self.cols
+        cost = grid.cost
+        obstacle = grid.obstacle
+        g = grid.g
+        parent = grid.parent
+        state = grid.state
+        stamp = grid.stamp
+        search = grid.new_search()
+        x0, y0, x1, y1 = self.bounds(cluster)
+
+        stamp[source] = search
+        g[source] = 0
+        parent[source] = -1
+        state[source] = OPEN
+        openList = [(0, source)]
+        expanded = 0
+        remaining = len(targets) if targets else -1
+
+        while openList:
+            currentG, current = heappop(openList)
+            if state[current] == CLOSED or currentG > g[current]:
+                continue
+            state[current] = CLOSED
+            expanded += 1
+            if remaining > 0 and current in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+
+            row, col = divmod(current, cols)
+            for dx, dy in DIRECTIONS:
+                x = col + dx
+                y = row + dy
+                if x < x0 or x >= x1 or y < y0 or y >= y1:
+                    continue
+                neighbour = y * cols + x
+                if obstacle[neighbour]:
+                    continue
+                # unatrag je korak iz susjeda u trenutni cvor
+                tentative_g = currentG + (cost[neighbour] if reverse else cost[current])
+                if stamp[neighbour] == search and tentative_g >= g[neighbour]:
+                    continue
+                stamp[neighbour] = search
+                g[neighbour] = tentative_g
+                parent[neighbour] = current
+                state[neighbour] = OPEN
+                heappush(openList, (tentative_g, neighbour))
+
+        self.expanded += expanded
+        return expanded
+
+    def find_path(self, start, end, heuristic, heappush, heappop):
+        grid = self.grid
+        if start == end:
+            return [start]
+        if grid.obstacle[end]:
+            return None
+
+        startCluster = self.cluster_of(start)
+        endCluster = self.cluster_of(end)
+
+        # bridovi od starta do cvorova njegovog klastera (i do cilja ako je tu)
+        startEdges = {start: self.entry_edges(start, end, heappush, heappop)}
+        # Start na rubu klastera moze i direktno preko granice. To je jedini
+        # izlaz kad je start prepreka jer prepreka nikad nije prijelaz.
+        for neighbour in grid.neighbours(start):
+            if self.cluster_of(neighbour) == startCluster or grid.obstacle[neighbour]:
+                continue
+            startEdges[start][neighbour] = grid.cost[start]
+            startEdges[neighbour] = self.entry_edges(neighbour, end, heappush, heappop)
+
+        # bridovi od cvorova klastera cilja do cilja
+        nodes = self.cluster_nodes(endCluster)
+        self.cluster_dijkstra(end, endCluster, True, nodes, heappush, heappop)
+        goalEdges = {}
+        for node in nodes:
+            if grid.stamp[node] == grid.search_id:
+                goalEdges[node] = grid.g[node]
+
+        abstractPath = self.abstract_search(
+            start, end, startEdges, goalEdges, heuristic, heappush, heappop
+        )
+        if abstractPath is None:
+            return None
+        return self.refine(abstractPath, heappush, heappop)
+
+    # Bridovi od celije do cvorova njenog klastera i do cilja ako je u klasteru
+    def entry_edges(self, index, end, heappush, heappop):
+        grid = self.grid
+        cluster = self.cluster_of(index)
+        targets = self.cluster_nodes(cluster)
+        if self.cluster_of(end) == cluster:
+            targets.add(end)
+        self.cluster_dijkstra(index, cluster, False, targets, heappush, heappop)
+        return {
+            node: grid.g[node]
+            for node in targets
+            if node != index and grid.stamp[node] == grid.search_id
+        }
+
+    # A* po apstraktnom grafu. Cvorovi su indeksi celija, pa se vrijednosti
+    # drze u rjecnicima umjesto u nizovima velicine mreze.
+    def abstract_search(
+        self, start, end, startEdges, goalEdges, heuristic, heappush, heappop
+    ):
+        grid = self.grid
+        cost = grid.cost
+        intra = self.intra
+        links = self.links
+        endPosition = grid.position(end)
+
+        g = {start: 0}
+        parent = {start: None}
+        closed = set()
+        h = heuristic(grid.position(start), endPosition)
+        openList = [(h, h, 0, 0, start)]
+        counter = 0
+
+        while openList:
+            _, _, _, currentG, current = heappop(openList)
+            if current in closed or currentG > g[current]:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            if current == end:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parent[current]
+                self.pushed += counter + 1
+                return path[::-1]
+
+            successors = []
+            if current in startEdges:
+                successors.extend(startEdges[current].items())
+            nodeEdges = intra[self.cluster_of(current)].get(current)
+            if nodeEdges:
+                successors.extend(nodeEdges.items())
+            for other in links.get(current, ()):
+                successors.append((other, cost[current]))
+            if current in goalEdges:
+                successors.append((end, goalEdges[current]))
+
+            for neighbour, length in successors:
+                tentative_g = currentG + length
+                if neighbour in closed:
+                    continue
+                if neighbour in g and tentative_g >= g[neighbour]:
+                    continue
+                g[neighbour] = tentative_g
+                parent[neighbour] = current
+                h = heuristic(grid.position(neighbour), endPosition)
+                counter += 1
+                heappush(
+                    openList, (tentative_g + h, h, counter, tentative_g, neighbour)
+                )
+
+        self.pushed += counter + 1
+        return None
+
+    # Pretvara apstraktni put u celije. Susjedni cvorovi iz razlicitih klastera
+    # su jedan korak, a segment unutar klastera se trazi samo u tom klasteru.
+    def refine(self, abstractPath, heappush, heappop):
+        grid = self.grid
+        path = [abstractPath[0]]
+        for current, following in zip(abstractPath, abstractPath[1:]):
+            cluster = self.cluster_of(current)
+            if self.cluster_of(following) != cluster:
+                path.append(following)
+                continue
+            self.cluster_dijkstra(
+                current, cluster, False, {following}, heappush, heappop
+            )
+            path.extend(grid.reconstruct_path(following)[1:])
+        return path
+
+    # Procjena memorije apstrakcije u bajtovima
+    def memory_bytes(self):
+        if self.grid is None:
+            return 0
+        total = sys.getsizeof(self.transitions) + sys.getsizeof(self.links)
+        total += sys.getsizeof(self.intra)
+        for transitions in self.transitions.values():
+            total += sys.getsizeof(transitions)
+            total += sum(sys.getsizeof(pair) for pair in transitions)
+        for partners in self.links.values():
+            total += sys.getsizeof(partners)
+        for edges in self.intra.values():
+            total += sys.getsizeof(edges)
+            for nodeEdges in edges.values():
+                total += sys.getsizeof(nodeEdges)
+        return total
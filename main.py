@@ -1,10 +1,35 @@
-import time
 import pygame
 import random
-import math
+from collections import OrderedDict
+
+from agents import AgentPool
+from anytime import AnytimeAStar, WeightedAStar
+from connectivity import ComponentIndex
+from distance_fields import FieldPlanner, LandmarkHeuristic
+from hierarchical import HierarchicalPlanner
+from map_file import MapFormatError, load_map, save_map
+from map_generator import place_solvable_obstacles
+from compact_path import CompactPath
+from movement import ThetaStar, astar8
+from path_cache import PathCache
+from pathfinding import (
+    DStarLite,
+    Grid,
+    SearchStats,
+    astar,
+    bidirectional_astar,
+    chebyshev_distance,
+    euclidian_distance,
+    jps,
+    manhattan_distance,
+    octile_distance,
+    random_cost,
+    weighted_jps,
+)
+from path_worker import PathWorker
 
 # Dimenzije prozora igre
-WINDOW_WIDTH = 1000
+WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 600
 
 # Dimenzije mape igre
@@ -24,136 +49,59 @@ COST_2_COLOR = (255, 255, 204)
 COST_3_COLOR = (255, 204, 153)
 EMPTY_CELL_COLOR = (174, 198, 255)
 OBSTACLE_COLOR = BLACK_COLOR
+END_CELL_COLOR = (0, 0, 255)
+COST_COLORS = {1: COST_1_COLOR, 2: COST_2_COLOR, 3: COST_3_COLOR}
 
-BUTTON_COLOR = (0, 0, 255)
-BUTTON_HOVER_COLOR = (0, 0, 150)
-
-# Smjerovi kretanja na mrezi (gore, desno, dolje, lijevo)
-DIRECTIONS = [
-    (0, -1),  # gore
-    (1, 0),  # desno
-    (0, 1),  # dolje
-    (-1, 0),  # lijevo
-]
-
-
-# Klasa koja predstavlja cvor u mrezi (celiju u igri)
-class Node:
-    def __init__(self, position=None, cost=1):
-        self.position = position
-        self.came_from = None
-        self.g = 0
-        self.h = 0
-        self.f = 0
-        self.cost = cost
-        self.is_obstacle = False
-
-    def __eq__(self, other):
-        return self.position == other.position
-
-
-def manhattan_distance(start_node, end_node):
-    return abs(end_node.position[0] - start_node.position[0]) + abs(
-        end_node.position[1] - start_node.position[1]
-    )
-
-
-def euclidian_distance(start_node, end_node):
-    return math.sqrt(
-        (end_node.position[0] - start_node.position[0]) ** 2
-        + (end_node.position[1] - start_node.position[1]) ** 2
-    )
-
-
-def chebyshev_distance(start_node, end_node):
-    return max(
-        abs(end_node.position[0] - start_node.position[0]),
-        abs(end_node.position[1] - start_node.position[1]),
-    )
-
-
-# A* algoritam za pronalazenje najkraceg puta
-def astar(grid, start, end, heuristic):
-    # postavimo trosak za sve cvorove na beskonacno
-    for col in grid:
-        for node in col:
-            node.g = float("inf")
-
-    # Napravimo start i end node
-    startNode = start
-    startNode.g = 0
-    startNode.h = heuristic(start, end)
-    startNode.f = startNode.g + startNode.h
-    startNode.came_from = None
-
-    endNode = end
-
-    # Inicijaliziramo praznu listu otvorenih i zatvorenih cvorova
-    openList = []
-
-    # Dodajemo start u otvorenu listu
-    openList.append(startNode)
-
-    # Ovdje trazimo najkraci put. Kad stignemo do cilja vracamo listu cvorova do cilja
-    while len(openList) > 0:
-        currentNode = openList[0]
-
-        # Trazimo cvor u openList koji ima najmanji ukupni f
-        for node in openList:
-            if node.f < currentNode.f:
-                currentNode = node
-
-        openList.remove(currentNode)
-
-        # Provjeravamo da li smo nasli kraj
-        # Ako jedmo vracamo listu cvorova od starta do kraja
-        if currentNode == endNode:
-            path = []
-            current = currentNode
-            while current is not None:
-                path.append(current)
-                current = current.came_from
-            return path[::-1]  # Return reversed path
-
-        # Generiraj susjedne cvorove oko trenutne pozicije
-        for newPosition in DIRECTIONS:
-            nodePosition = (
-                currentNode.position[0] + newPosition[0],
-                currentNode.position[1] + newPosition[1],
-            )
-
-            # Provijeri da li je nodePosition izvan mape, ako je prekoci
-            if (
-                nodePosition[0] < 0
-                or nodePosition[0] > COLS - 1
-                or nodePosition[1] < 0
-                or nodePosition[1] > ROWS - 1
-            ):
-                continue
-
-            # Ucitaj u newNode cvor iz pozicije iz grida
-            newNode = grid[nodePosition[0]][nodePosition[1]]
+AGENT_COLOR = (128, 0, 128)
+# Broj agenata u nacinu rada sa vise agenata
+AGENT_COUNT = 200
 
-            # Provijeri ako je new_node obstacle. ako je prekosci
-            if newNode.is_obstacle:
-                continue
+# Datoteka u koju se sprema mapa (F5) i iz koje se ucitava (F9)
+MAP_FILE = "mapa.apm"
 
-            # g vrijednost od novog cvora (ukupna tezina)
-            tentative_g = currentNode.g + currentNode.cost
+# Rok za ARA* u milisekundama i promjena epsilon tipkama + i -
+PATH_DEADLINE = 10
+EPSILON_STEP = 0.5
 
-            # Ovaj put do susjeda je bolji od bilo kojeg prethodnog. Zabilježi ga!
-            if tentative_g < newNode.g:
-                # ako new_node nije vec u listi otvorenih cvorova dodaj ga
-                if newNode not in openList:
-                    openList.append(newNode)
-
-                # postavimo came_from - tj. cvor sa kojeg smo dosli u taj cvor
-                newNode.came_from = currentNode
+BUTTON_COLOR = (0, 0, 255)
+BUTTON_HOVER_COLOR = (0, 0, 150)
 
-                # spremimo vrijednosti g, h i f
-                newNode.g = tentative_g
-                newNode.h = heuristic(newNode, end)
-                newNode.f = newNode.g + newNode.h
+# Pamti ucitane fontove i vec iscrtane tekstove izmedju ciklusa. SysFont svaki
+# put trazi font na sustavu, a render iscrtava tekst ispocetka pa ih ne zelimo
+# pozivati u svakom ciklusu. Broj zapamcenih tekstova je ogranicen (LRU).
+class TextCache:
+    def __init__(self, max_entries=256):
+        self.fonts = {}
+        self.surfaces = OrderedDict()
+        self.max_entries = max_entries
+
+    # Vraca font iz registra, SysFont ako je system True inace pygame.font.Font
+    def get_font(self, name=None, size=30, system=False):
+        key = (name, size, system)
+        font = self.fonts.get(key)
+        if font is None:
+            if system:
+                font = pygame.font.SysFont(name, size)
+            else:
+                font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, color, name=None, size=30, system=False):
+        key = (text, name, size, system, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = self.get_font(name, size, system).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+text_cache = TextCache()
 
 
 # Dodajemo funkcionalnost za odabir heuristike
@@ -165,14 +113,17 @@ class Dropdown:
         self.dropdown_open = False
         self.selected_option = None
         self.option_rects = []
+        # opcije koje se trenutno ne mogu odabrati (crtaju se sivo)
+        self.disabled = set()
 
     def draw(self, screen):
         pygame.draw.rect(screen, (200, 200, 200), self.rect)
-        font = pygame.font.SysFont("Arial", 24)
-        text = font.render(
+        text = text_cache.render(
             self.selected_option if self.selected_option else self.options[0],
-            True,
             (0, 0, 0),
+            "Arial",
+            24,
+            system=True,
         )
         screen.blit(text, (self.rect.x + 10, self.rect.y + 10))
        
@@ -196,7 +147,13 @@ class Dropdown:
                 self.option_rects.append(option_rect)
                 pygame.draw.rect(screen, (230, 230, 230), option_rect)
                 pygame.draw.rect(screen, BLACK_COLOR, option_rect, 1) 
-                option_text = font.render(option, True, (0, 0, 0))
+                option_text = text_cache.render(
+                    option,
+                    (150, 150, 150) if option in self.disabled else (0, 0, 0),
+                    "Arial",
+                    24,
+                    system=True,
+                )
                 screen.blit(option_text, (option_rect.x + 10, option_rect.y + 10))
 
     def handle_event(self, event):
@@ -208,6 +165,8 @@ class Dropdown:
             if self.dropdown_open:
                 for i, rect in enumerate(self.option_rects):
                     if rect.collidepoint(mouse_pos):
+                        if self.options[i] in self.disabled:
+                            break
                         self.selected_option = self.options[i]
                         self.dropdown_open = False
                         self.callback(self.selected_option)
@@ -231,22 +190,27 @@ class Dropdown:
 # Klasa za prikazivanje teksta na ekranu
 class TextDisplay:
     def __init__(self, position, color=BLACK_COLOR, font_size=30):
-        # Initialize Pygame
-        self.font = pygame.font.Font(None, font_size)  # Use default font
+        self.font_size = font_size
+        self.font = text_cache.get_font(None, font_size)  # Use default font
         self.color = color  # Text color
         self.position = position  # Position to display the text
-        self.text_surface = None
-        self.text = ""  # Default empty text
+        self.text = None
+        self.line_surfaces = []
 
     def set_text(self, text):
-        """Set the text as a list of lines."""
-        self.text_lines = text.split("\n")  # Split into multiple lines
+        """Set the text as a list of lines, rendered only when it changes."""
+        if text == self.text:
+            return
+        self.text = text
+        self.line_surfaces = [
+            text_cache.render(line, self.color, None, self.font_size)
+            for line in text.split("\n")  # Split into multiple lines
+        ]
 
     def draw(self, surface):
         """Draw each line of text with spacing."""
         y_offset = 0
-        for line in self.text_lines:
-            text_surface = self.font.render(line, True, self.color)
+        for text_surface in self.line_surfaces:
             surface.blit(text_surface, (self.position[0], self.position[1] + y_offset))
             y_offset += self.font.get_height() + 5  # Add spacing between lines
 
@@ -269,8 +233,10 @@ class Button:
         self.hover_color = hover_color  # Color when mouse hovers
         self.text = text  # Text to display on the button
         self.callback = callback
-        self.font = pygame.font.SysFont(None, font_size)  # Font for the button text
-        self.text_surf = self.font.render(text, True, EMPTY_CELL_COLOR)
+        self.font_size = font_size  # Font size for the button text
+        self.text_surf = text_cache.render(
+            text, EMPTY_CELL_COLOR, None, font_size, system=True
+        )
         self.text_rect = self.text_surf.get_rect(
             center=self.rect.center
         )  # Center the text inside the button
@@ -296,7 +262,9 @@ class Button:
 
     def set_text(self, text):
         self.text = text
-        self.text_surf = self.font.render(self.text, True, EMPTY_CELL_COLOR)
+        self.text_surf = text_cache.render(
+            self.text, EMPTY_CELL_COLOR, None, self.font_size, system=True
+        )
 
 
 # Klasa za igraca
@@ -322,15 +290,42 @@ class Game:
         self.elapsed_time = 0
         self.grid_updated = False
         self.player = Player()
-        self.grid = [
-            [Node((col, row), self.get_random_cost()) for row in range(ROWS)]
-            for col in range(COLS)
-        ]
+        self.grid = Grid(COLS, ROWS)
+        for index in range(self.grid.size):
+            self.grid.set_cost(index, self.get_random_cost())
         self.heuristic = manhattan_distance  # Default heuristic
+        self.search = astar  # Default search algorithm
+        self.incremental_planner = DStarLite()
+        self.hierarchical_planner = HierarchicalPlanner()
+        # A* sa heuristikom iz unaprijed izracunatog polja (procjena ili tocna)
+        self.field_planner = FieldPlanner()
+        self.exact_field_planner = FieldPlanner(exact=True)
+        # kretanje pod bilo kojim kutom, put su vrhovi (trosak po ravnim crtama),
+        # a igrac ide po celijama izmedju vrhova
+        self.theta_planner = ThetaStar()
+        self.lazy_theta_planner = ThetaStar(lazy=True)
+        # put ogranicene suboptimalnosti: tezinski A* i ARA* sa rokom
+        self.weighted_planner = WeightedAStar()
+        self.anytime_planner = AnytimeAStar(deadline=PATH_DEADLINE)
+        # ALT heuristika, tablice orijentira se racunaju kod prvog koristenja
+        self.landmark_heuristic = LandmarkHeuristic()
+        # agenti koji se krecu uz igraca (None dok nacin nije ukljucen)
+        self.agents = None
+        self.stats = SearchStats()
+        # zapamceni putevi, isti upit na istoj verziji mreze se ne ponavlja
+        self.path_cache = PathCache()
+        # komponente slobodnih celija, za nedostupan cilj se put ne trazi
+        self.components = ComponentIndex()
+        # put se racuna u pozadinskoj dretvi da petlja igre ne ceka
+        self.worker = PathWorker()
+        # greska zadnjeg pretrazivanja (None ako ga je algoritam zavrsio)
+        self.search_error = None
         self.buttons = []
 
-        self.start = self.grid[0][0]
-        self.end = self.grid[random.randint(0, COLS - 1)][random.randint(0, ROWS - 1)]
+        self.start = self.grid.index(0, 0)
+        self.end = self.grid.index(
+            random.randint(0, COLS - 1), random.randint(0, ROWS - 1)
+        )
 
         # za 60 fps
         self.clock = pygame.time.Clock()
@@ -344,12 +339,25 @@ class Game:
             self.size, pygame.HWSURFACE | pygame.DOUBLEBUF
         )
 
+        # Teren i linije mreze crtamo jednom na zaseban sloj i zatim samo
+        # precrtavamo celije koje su se promijenile (prema dnevniku promjena mreze)
+        self.map_rect = pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT)
+        self.panel_rect = pygame.Rect(
+            MAP_WIDTH, 0, WINDOW_WIDTH - MAP_WIDTH, WINDOW_HEIGHT
+        )
+        self.map_surface = pygame.Surface(self.map_rect.size)
+        self.map_version = -1
+        # put, cilj i igrac se crtaju preko sloja mape
+        self.overlay_rects = []
+        self.overlay_key = None
+        self.panel_key = None
+
         self.generate_random_obstacles()
 
         self.heuristic_dropdown = Dropdown(
             (810, 230),
             (180, 40),
-            ["Manhattan", "Euclidean", "Chebyshev"],
+            ["Manhattan", "Euclidean", "Chebyshev", "Octile", "ALT"],
             self.on_heuristic_selected,
         )
 
@@ -366,11 +374,43 @@ class Game:
         )
         self.buttons.append(self.start_stop_button)
 
+        self.agents_button = Button(
+            (1010, 540), (180, 50), "Agents", self.toggle_agents
+        )
+        self.buttons.append(self.agents_button)
+
         self.time_display = TextDisplay((810, MAP_HEIGHT - 50))
         self.length_display = TextDisplay((810, MAP_HEIGHT - 100))
 
         self.heuristic_text = TextDisplay((810, 210))
         self.heuristic_text.set_text("Heuristika:")
+
+        self.algorithm_dropdown = Dropdown(
+            (1010, 30),
+            (180, 40),
+            [
+                "A*",
+                "A* (h field)",
+                "A* (exact h)",
+                "Bidirectional A*",
+                "D* Lite",
+                "JPS",
+                "Weighted JPS",
+                "HPA*",
+                "A* (8-dir)",
+                "Theta*",
+                "Lazy Theta*",
+                "Weighted A*",
+                "ARA*",
+            ],
+            self.on_algorithm_selected,
+        )
+        self.algorithm_text = TextDisplay((1010, 10))
+        self.algorithm_text.set_text("Algoritam:")
+
+        self.stats_text = TextDisplay((1010, 230))
+        self.stats_text.set_text("Statistika:")
+        self.stats_display = TextDisplay((1015, 260), font_size=22)
         
         self.controls_text = TextDisplay((810, 290))
         self.controls_text.set_text(
@@ -384,7 +424,9 @@ class Game:
             "2: Set Cost 2\n"
             "3: Set Cost 3\n"
             "S: Set Start\n"
-            "E: Set End"
+            "E: Set End\n"
+            "F5 / F9: Save / Load Map\n"
+            "+ / -: Epsilon"
         )
       
         
@@ -403,6 +445,17 @@ class Game:
 
             # Handle the dropdown menu
             self.heuristic_dropdown.handle_event(event)
+            self.algorithm_dropdown.handle_event(event)
+
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_F5:
+                save_map(self.grid, MAP_FILE)
+            elif event.key == pygame.K_F9:
+                self.load_map()
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.change_epsilon(EPSILON_STEP)
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.change_epsilon(-EPSILON_STEP)
 
         x, y = pygame.mouse.get_pos()
         col = x // GRID_SIZE
@@ -411,77 +464,111 @@ class Game:
         if col >= COLS or row >= ROWS:
             return
 
+        index = self.grid.index(col, row)
         mouse_buttons = pygame.mouse.get_pressed()
 
         # sa ljevim klikom dodajemo prepreku
         if mouse_buttons[0] == 1:  # Left mouse button
-            if not self.grid[col][row].is_obstacle:
-                self.grid[col][row].is_obstacle = True
+            if not self.grid.is_obstacle(index):
+                self.grid.set_obstacle(index, True)
                 self.grid_updated = True
 
         # sa desnim klikom brisemo prepreke
         elif mouse_buttons[2] == 1:  # Right mouse button
-            if self.grid[col][row].is_obstacle:
-                self.grid[col][row].is_obstacle = False
+            if self.grid.is_obstacle(index):
+                self.grid.set_obstacle(index, False)
                 self.grid_updated = True
 
         keys = pygame.key.get_pressed()
         # sa tipkom 1 postavljamo polje sa tezinom 1
         if keys[pygame.K_1]:
-            self.grid[col][row].is_obstacle = False
-            self.grid[col][row].cost = 1
+            self.grid.set_obstacle(index, False)
+            self.grid.set_cost(index, 1)
             self.grid_updated = True
         # sa tipkom 2 postavljamo polje sa tezinom 1
         elif keys[pygame.K_2]:
-            self.grid[col][row].is_obstacle = False
-            self.grid[col][row].cost = 2
+            self.grid.set_obstacle(index, False)
+            self.grid.set_cost(index, 2)
             self.grid_updated = True
         # sa tipkom 3 postavljamo polje sa tezinom 3
         elif keys[pygame.K_3]:
-            self.grid[col][row].is_obstacle = False
-            self.grid[col][row].cost = 3
+            self.grid.set_obstacle(index, False)
+            self.grid.set_cost(index, 3)
             self.grid_updated = True
         # sa tipkom s postavljamo lokaciju igraca
         elif keys[pygame.K_s]:
-            self.grid[col][row].is_obstacle = False
-            self.start = self.grid[col][row]
+            self.grid.set_obstacle(index, False)
+            self.start = index
             self.grid_updated = True
         # sa tipkom e postavljamo cilj
         elif keys[pygame.K_e]:
-            self.grid[col][row].is_obstacle = False
-            self.end = self.grid[col][row]
+            self.grid.set_obstacle(index, False)
+            self.end = index
             self.grid_updated = True
 
     # Glavna logika igre koja se izvrsava u svakom ciklusu: upravljanje kretanjem igrača i ažuriranje puta.
     def on_loop(self):
         self.player.time += 1
         if self.grid_updated:
-            self.get_path()
+            self.request_path()
             self.grid_updated = False
 
+        # preuzimamo najnoviji put koji je izracunala pozadinska dretva
+        result = self.worker.poll()
+        if result is not None:
+            self.apply_path_result(result)
+
+        # agenti sami racunaju puteve, ali samo koliko stane u budzet ciklusa
+        if self.agents is not None:
+            self.agents.update()
+
         if self.path and self.player.is_moving:
-            if (self.player.time / self.path[0].cost) // self.player.speed >= 1:
+            # dijagonalni korak traje korijen iz 2 puta dulje
+            step_cost = self.path.step_cost()
+            if (self.player.time / step_cost) // self.player.speed >= 1:
                 self.player.time = 0
-                self.path.pop(0)
+                self.path.advance()
                 if self.path:
-                    self.start = self.path[0]
-
-        self.time_display.set_text(str(round(self.elapsed_time * 1000, 3)) + "ms")
-        self.length_display.set_text("Total cost: " + str(self.get_path_cost()))
+                    self.start = self.path.current
+
+        # tekstove panela slazemo samo kad se promijeni rezultat ili pomak po putu
+        panel_key = (
+            self.elapsed_time,
+            self.stats,
+            (self.path, self.path.steps) if self.path else None,
+            self.agents.replans if self.agents is not None else None,
+            self.path_cache.hits,
+        )
+        if panel_key != self.panel_key:
+            self.panel_key = panel_key
+            self.time_display.set_text(str(round(self.elapsed_time * 1000, 3)) + "ms")
+            self.length_display.set_text("Total cost: " + str(self.get_path_cost()))
+            self.stats_display.set_text(self.get_stats_text())
 
     # Iscrtava sve na ekranu: mrezu, putanju, igraca, dugmadi i tekst.
     def on_render(self):
-        # Popunjava ekran bijele boje kako bismo mogli crtati sve na prazan ekran
-        self._display_surf.fill(WHITE_COLOR)
-        self.draw_map()
-        self.draw_path()
-        self.player.draw(
-            self._display_surf,
-            (
-                self.start.position[0] * GRID_SIZE,
-                self.start.position[1] * GRID_SIZE,
-            ),
+        # pravokutnici ekrana koji su se promijenili u ovom ciklusu
+        dirty = self.update_map()
+
+        # put se mijenja samo pomakom po putu, pa je dovoljan objekt i broj koraka
+        overlay_key = (
+            (self.path, self.path.steps) if self.path else (),
+            self.start,
+            self.end,
+            self.agents.position.tobytes() if self.agents is not None else None,
         )
+        if dirty or overlay_key != self.overlay_key:
+            # stari put i igraca brisemo kopiranjem terena iz sloja mape
+            dirty.extend(self.overlay_rects)
+            for rect in dirty:
+                self._display_surf.blit(self.map_surface, rect, rect)
+            self.overlay_rects = self.draw_overlays()
+            self.overlay_key = overlay_key
+            dirty.extend(self.overlay_rects)
+
+        # Popunjava bocni panel bijelom bojom kako bismo mogli crtati na prazno
+        self._display_surf.fill(WHITE_COLOR, self.panel_rect)
+        dirty.append(self.panel_rect)
 
         for button in self.buttons:
             button.draw(self._display_surf)
@@ -495,12 +582,17 @@ class Game:
         self.heuristic_text.draw(self._display_surf)
         self.controls_text.draw(self._display_surf)
         self.controls_list_text.draw(self._display_surf)
+        self.stats_text.draw(self._display_surf)
+        self.stats_display.draw(self._display_surf)
+        self.algorithm_text.draw(self._display_surf)
+        self.algorithm_dropdown.draw(self._display_surf)
         self.heuristic_dropdown.draw(self._display_surf)  # Draw the heuristic dropdown
-        # Azurira ekran
-        pygame.display.flip()
+        # Azurira samo promijenjene dijelove ekrana
+        pygame.display.update(dirty)
 
     # Zatvara Pygame kada aplikacija zavrsi.
     def on_cleanup(self):
+        self.worker.close()
         pygame.quit()
 
     # Pokrece aplikaciju, pokrece glavnu petlju događaja.
@@ -516,109 +608,273 @@ class Game:
 
         self.on_cleanup()
 
-    # Izračunava najkraći put koristeći A* algoritam
-    def get_path(self):
-        start_time = time.time()
-        self.path = astar(self.grid, self.start, self.end, self.heuristic)
-        end_time = time.time()
-        self.elapsed_time = end_time - start_time
+    # Izračunava najkraći put odabranim algoritmom i ceka rezultat
+    # (koristi se kad put treba odmah, npr. kod generiranja mape)
+    # deadline je rok u milisekundama za ARA* (inace PATH_DEADLINE), ostali
+    # algoritmi ga ne koriste
+    def get_path(self, deadline=None):
+        if self.skip_unreachable() or self.use_cached_path():
+            return
+        if not isinstance(self.search, AnytimeAStar):
+            deadline = None
+        result = self.worker.compute(
+            self.search, self.grid, self.start, self.end, self.heuristic, deadline
+        )
+        self.apply_path_result(result)
 
-    def clear_obstacles(self):
-        self.path = []
+    # Salje zahtjev za novi put pozadinskoj dretvi, rezultat se preuzima u on_loop
+    def request_path(self):
+        if self.skip_unreachable() or self.use_cached_path():
+            return
+        self.worker.submit(self.search, self.grid, self.start, self.end, self.heuristic)
+
+    # Ako cilj nije u komponenti starta, put ne postoji i pretrazivanje koje bi
+    # proslo cijelu komponentu se preskace
+    def skip_unreachable(self):
+        self.components.update(self.grid)
+        if self.components.reachable(self.grid, self.start, self.end):
+            return False
+        self.worker.cancel()
+        self.path = None
+        self.elapsed_time = 0
+        self.stats = SearchStats()
+        return True
+
+    # Uzima put iz cache-a ako je isti upit vec izracunat na ovoj verziji mreze
+    # (ili ako igrac stoji na vec izracunatom putu prema istom cilju)
+    def use_cached_path(self):
+        cached = self.path_cache.get(
+            self.grid.version, self.start, self.end, self.search, self.heuristic
+        )
+        if cached is None:
+            return False
+        # rezultat zahtjeva koji je jos u tijeku bi zamijenio ovaj put
+        self.worker.cancel()
+        path, entry = cached
+        self.path = self.make_path(self.search, path) if path else path
+        self.elapsed_time = entry.elapsed_time
+        self.stats = entry.stats
+        return True
+
+    # Put za igraca. Any-angle planeri vracaju vrhove puta.
+    def make_path(self, search, path):
+        waypoints = isinstance(search, ThetaStar) and not search.cells
+        return CompactPath(self.grid, path, waypoints=waypoints)
+
+    def apply_path_result(self, result):
+        self.search_error = result.error
+        if result.error is not None:
+            # neuspjelo pretrazivanje se ne sprema u cache
+            self.path = None
+            self.elapsed_time = result.elapsed_time
+            self.stats = result.stats
+            return
+        path = result.path
+        self.path_cache.put(
+            result.version,
+            result.start,
+            result.end,
+            result.search,
+            result.heuristic,
+            path,
+            result.elapsed_time,
+            result.stats,
+        )
+        # igrac se pomaknuo dok se put racunao - nastavljamo od njegove pozicije
+        if path:
+            path = self.make_path(result.search, path)
+            if result.start != self.start and not path.seek(self.start):
+                self.grid_updated = True
+                return
 
-        for y in range(ROWS):
-            for x in range(COLS):
-                self.grid[x][y].is_obstacle = False
+        self.path = path
+        self.elapsed_time = result.elapsed_time
+        self.stats = result.stats
 
+    def clear_obstacles(self):
+        self.path = []
+        self.grid.clear()
         self.grid_updated = True
 
     # Brise sve prepreke i postavlja mrezu na pocetne vrijednosti.
     def clear_all(self):
         self.path = []
-
-        for y in range(ROWS):
-            for x in range(COLS):
-                self.grid[x][y].is_obstacle = False
-                self.grid[x][y].cost = 1
-
+        self.grid.clear(cost=1)
         self.grid_updated = True
 
     # Generira nasumicne prepreke na mrezi.
     def generate_random_obstacles(self, obstacles=250):
         self.path = []
-        self.start = self.grid[0][0]
-        self.end = self.grid[random.randint(0, COLS - 1)][random.randint(0, ROWS - 1)]
+        self.start = self.grid.index(0, 0)
+        self.end = self.grid.index(
+            random.randint(0, COLS - 1), random.randint(0, ROWS - 1)
+        )
 
         self.clear_obstacles()
-        # generate random obstacles
+        # prepreke koje bi odvojile cilj od starta se uklanjaju, pa put
+        # uvijek postoji i mapa se ne mora generirati ponovno
+        place_solvable_obstacles(self.grid, obstacles, self.start, self.end)
+        self.get_path()
 
-        for i in range(obstacles):
-            x = random.randint(0, COLS - 1)
-            y = random.randint(0, ROWS - 1)
-            if self.grid[x][y] == self.start or self.grid[x][y] == self.end:
-                continue
-            self.grid[x][y].is_obstacle = True
+    # Ucitava spremljenu mapu iste velicine, start i cilj ostaju isti
+    def load_map(self):
+        try:
+            load_map(self.grid, MAP_FILE)
+        except (OSError, MapFormatError):
+            return
+        self.grid.set_obstacle(self.start, False)
+        self.grid.set_obstacle(self.end, False)
+        self.path = []
+        self.grid_updated = True
 
-        # Provjerava ako postoji put
-        self.get_path()
-        while not self.path:
-            self.generate_random_obstacles()
+    # Ukljucuje ili iskljucuje agente. Svaki agent krece sa nasumicne slobodne
+    # celije i nakon dolaska na cilj dobiva novi nasumicni cilj.
+    def toggle_agents(self):
+        if self.agents is not None:
+            self.agents = None
+            return
+        self.agents = AgentPool(
+            self.grid,
+            self.get_agent_search(),
+            self.get_agent_heuristic(),
+            speed=self.player.speed,
+            rng=random.Random(),
+        )
+        for _ in range(AGENT_COUNT):
+            self.agents.add(
+                self.agents.random_free_cell(), self.agents.random_free_cell()
+            )
+
+    # D* Lite, HPA* i polja heuristike cuvaju stanje izmedju poziva, a glavne
+    # instance koristi pozadinska dretva, pa agenti dobivaju svoje. Rok ARA*
+    # agenti skracuju na ostatak svog budzeta.
+    def get_agent_search(self):
+        if self.search is self.incremental_planner:
+            return DStarLite()
+        if self.search is self.hierarchical_planner:
+            return HierarchicalPlanner()
+        if isinstance(self.search, FieldPlanner):
+            return FieldPlanner(exact=self.search.exact)
+        if isinstance(self.search, ThetaStar):
+            return ThetaStar(lazy=self.search.lazy, cells=True)
+        if isinstance(self.search, AnytimeAStar):
+            return AnytimeAStar(
+                self.search.epsilon, self.search.step, self.search.deadline
+            )
+        return self.search
+
+    # Tablice ALT heuristike obnavlja pozadinska dretva iz svoje kopije mreze
+    def get_agent_heuristic(self):
+        if self.heuristic is self.landmark_heuristic:
+            return LandmarkHeuristic()
+        return self.heuristic
 
     # Pokrece ili zaustavlja kretanje igraca.
     def start_stop_moving(self):
         self.player.is_moving = not self.player.is_moving
         self.start_stop_button.set_text("Stop" if self.player.is_moving else "Start")
 
-    # Vraća ukupni trosak puta
+    # Vraca tekst sa statistikom zadnjeg pretrazivanja za bocni panel
+    def get_stats_text(self):
+        stats = self.stats
+        return (
+            f"Expanded: {stats.nodes_expanded}\n"
+            f"Pushed: {stats.nodes_pushed}\n"
+            f"Reopened: {stats.nodes_reopened}\n"
+            f"Peak open: {stats.peak_open_size}\n"
+            f"h calls: {stats.heuristic_calls}\n"
+            f"h time: {stats.heuristic_ns / 1e6:.3f} ms\n"
+            f"Open set: {stats.open_set_ns / 1e6:.3f} ms\n"
+            f"Expansion: {stats.expansion_ns / 1e6:.3f} ms\n"
+            f"Path: {stats.reconstruction_ns / 1e6:.3f} ms"
+        ) + (
+            self.get_landmark_text()
+            + self.get_bound_text()
+            + self.get_hierarchy_text()
+            + self.get_agents_text()
+            + self.get_cache_text()
+            + self.get_error_text()
+        )
+
+    def get_error_text(self):
+        if self.search_error is None:
+            return ""
+        return f"\nSearch failed: {type(self.search_error).__name__}"
+
+    def get_landmark_text(self):
+        heuristic = self.landmark_heuristic
+        if self.heuristic is not heuristic or heuristic.origin is None:
+            return ""
+        return (
+            f"\nALT build: {heuristic.build_time * 1000:.3f} ms "
+            f"({len(heuristic.landmarks)} landmarks)"
+        )
+
+    # Granica suboptimalnosti (put je najvise toliko puta skuplji od
+    # najkraceg) za tezinski A* i ARA*, uz broj koraka ARA*
+    def get_bound_text(self):
+        stats = self.stats
+        if stats.bound is None:
+            return ""
+        text = f"\nBound: {stats.bound:.2f}"
+        if stats.improvements:
+            text += f" ({len(stats.improvements)} steps)"
+        return text
+
+    # Trosak izgradnje hijerarhije se prikazuje odvojeno od trajanja upita
+    def get_hierarchy_text(self):
+        planner = self.hierarchical_planner
+        if self.search is not planner or planner.grid is None:
+            return ""
+        kind = "build" if planner.full_build else "rebuild"
+        return (
+            f"\nHPA {kind}: {planner.build_time * 1000:.3f} ms\n"
+            f"Clusters: {planner.rebuilt_clusters}/{planner.cluster_count}"
+        )
+
+    def get_cache_text(self):
+        cache = self.path_cache
+        return (
+            f"\nCache hits: {cache.hits}/{cache.hits + cache.misses} "
+            f"({cache.hit_rate:.0%})\n"
+            f"Saved: {cache.saved_time * 1000:.1f} ms"
+        )
+
+    def get_agents_text(self):
+        agents = self.agents
+        if agents is None:
+            return ""
+        return (
+            f"\nAgents: {len(agents)}, queue: {len(agents.queue)}\n"
+            f"Replans: {agents.replans} ({agents.replan_time * 1000:.0f} ms)"
+        )
+
+    # Vraća ukupni trosak puta (dijagonalni koraci su duljine korijen iz 2)
     def get_path_cost(self):
-        path_cost = 0
-        if self.path:
-            for node in self.path:
-                path_cost += node.cost
-        return path_cost
+        if not self.path:
+            return 0
+        return round(self.path.cost, 2)
 
-    # Iscrtava mrezu i razlicite vrste celija (prepreke, pocetnu tocku, cilj, itd.).
+    # Vraca boju celije na sloju mape
+    def get_cell_color(self, index):
+        if self.grid.is_obstacle(index):
+            return OBSTACLE_COLOR
+        return COST_COLORS.get(self.grid.cost[index], WHITE_COLOR)
+
+    # Iscrtava mrezu i razlicite vrste celija (prepreke, tezine) na sloj mape.
     def draw_map(self):
+        self.map_surface.fill(WHITE_COLOR)
         for row in range(ROWS):
             for col in range(COLS):
                 rect = pygame.Rect(
                     col * GRID_SIZE, row * GRID_SIZE, GRID_SIZE, GRID_SIZE
                 )
-
-                if self.grid[col][row] == self.end:
-                    pygame.draw.rect(
-                        self._display_surf,
-                        (0, 0, 255),
-                        rect,
-                    )
-                elif self.grid[col][row].is_obstacle:
-                    pygame.draw.rect(
-                        self._display_surf,
-                        OBSTACLE_COLOR,
-                        rect,
-                    )
-                elif self.grid[col][row].cost == 1:
-                    pygame.draw.rect(
-                        self._display_surf,
-                        COST_1_COLOR,
-                        rect,
-                    )
-                elif self.grid[col][row].cost == 2:
-                    pygame.draw.rect(
-                        self._display_surf,
-                        COST_2_COLOR,
-                        rect,
-                    )
-                elif self.grid[col][row].cost == 3:
-                    pygame.draw.rect(
-                        self._display_surf,
-                        COST_3_COLOR,
-                        rect,
-                    )
+                index = self.grid.index(col, row)
+                pygame.draw.rect(self.map_surface, self.get_cell_color(index), rect)
 
         for row in range(ROWS):
             pygame.draw.line(
-                self._display_surf,
+                self.map_surface,
                 BLACK_COLOR,
                 (0, row * GRID_SIZE),
                 (MAP_WIDTH, row * GRID_SIZE),
@@ -626,49 +882,190 @@ class Game:
 
         for col in range(COLS):
             pygame.draw.line(
-                self._display_surf,
+                self.map_surface,
                 BLACK_COLOR,
                 (col * GRID_SIZE, 0),
                 (col * GRID_SIZE, MAP_HEIGHT),
             )
 
+    # Ponovno iscrtava jednu celiju na sloju mape, zajedno sa gornjim i lijevim rubom
+    def draw_cell(self, index):
+        col, row = self.grid.position(index)
+        rect = pygame.Rect(col * GRID_SIZE, row * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        pygame.draw.rect(self.map_surface, self.get_cell_color(index), rect)
+        pygame.draw.line(
+            self.map_surface, BLACK_COLOR, rect.topleft, (rect.right - 1, rect.top)
+        )
+        pygame.draw.line(
+            self.map_surface, BLACK_COLOR, rect.topleft, (rect.left, rect.bottom - 1)
+        )
+        return rect
+
+    # Azurira sloj mape prema promjenama mreze od zadnjeg iscrtavanja.
+    # Vraca listu pravokutnika koji su se promijenili.
+    def update_map(self):
+        changes = self.grid.changes_since(self.map_version)
+        self.map_version = self.grid.version
+        if changes is None:
+            self.draw_map()
+            return [self.map_rect.copy()]
+        return [self.draw_cell(index) for index in set(changes)]
+
+    # Iscrtava cilj, put i igraca preko mape i vraca pravokutnike koje zauzimaju
+    def draw_overlays(self):
+        end_col, end_row = self.grid.position(self.end)
+        end_rect = pygame.Rect(
+            end_col * GRID_SIZE, end_row * GRID_SIZE, GRID_SIZE, GRID_SIZE
+        )
+        pygame.draw.rect(self._display_surf, END_CELL_COLOR, end_rect)
+        pygame.draw.line(
+            self._display_surf,
+            BLACK_COLOR,
+            end_rect.topleft,
+            (end_rect.right - 1, end_rect.top),
+        )
+        pygame.draw.line(
+            self._display_surf,
+            BLACK_COLOR,
+            end_rect.topleft,
+            (end_rect.left, end_rect.bottom - 1),
+        )
+        rects = [end_rect]
+
+        rects.extend(self.draw_path())
+        rects.extend(self.draw_agents())
+
+        start_col, start_row = self.grid.position(self.start)
+        position = (start_col * GRID_SIZE, start_row * GRID_SIZE)
+        self.player.draw(self._display_surf, position)
+        rects.append(pygame.Rect(position, (GRID_SIZE, GRID_SIZE)))
+        return rects
+
+    # Iscrtava agente kao krugove na njihovim celijama
+    def draw_agents(self):
+        rects = []
+        if self.agents is None:
+            return rects
+        cols = self.grid.cols
+        for index in self.agents.position:
+            row, col = divmod(index, cols)
+            rect = pygame.draw.circle(
+                self._display_surf,
+                AGENT_COLOR,
+                (col * GRID_SIZE + GRID_SIZE // 2, row * GRID_SIZE + GRID_SIZE // 2),
+                GRID_SIZE // 3,
+            )
+            rects.append(rect)
+        return rects
+
     # Iscrtava put kroz mapu koristeci crvene krugove.
     def draw_path(self):
+        rects = []
         # draw path
         if self.path:
-            for cell in self.path:
-                if cell == self.path[0]:
-                    continue
-                pygame.draw.circle(
+            for cell in self.path.ahead():
+                col, row = self.grid.position(cell)
+                rect = pygame.draw.circle(
                     self._display_surf,
                     (255, 0, 0, 100),
                     (
-                        cell.position[0] * GRID_SIZE + GRID_SIZE // 2,
-                        cell.position[1] * GRID_SIZE + GRID_SIZE // 2,
+                        col * GRID_SIZE + GRID_SIZE // 2,
+                        row * GRID_SIZE + GRID_SIZE // 2,
                     ),
                     GRID_SIZE // 4,
                 )
+                rects.append(rect)
+        return rects
 
     def get_random_cost(self):
-        rand = random.randint(1, 10)
-        if rand < 9:
-            return 1
-        elif rand == 9:
-            return 2
-        elif rand == 10:
-            return 3
+        return random_cost()
 
     # Dodajemo funkciju koja se poziva kad se odabere opcija heuristike
 
     def on_heuristic_selected(self, option):
+        self.set_heuristic(option)
+        self.request_path()
+
+    def set_heuristic(self, option):
         if option == "Manhattan":
             self.heuristic = manhattan_distance
         elif option == "Euclidean":
             self.heuristic = euclidian_distance
         elif option == "Chebyshev":
             self.heuristic = chebyshev_distance
+        elif option == "Octile":
+            self.heuristic = octile_distance
+        elif option == "ALT":
+            self.heuristic = self.landmark_heuristic
+
+        if self.agents is not None:
+            self.agents.heuristic = self.get_agent_heuristic()
+
+    # Poziva se kad se odabere algoritam pretrazivanja
+    def on_algorithm_selected(self, option):
+        if option == "A*":
+            self.search = astar
+        elif option == "A* (h field)":
+            self.search = self.field_planner
+        elif option == "A* (exact h)":
+            self.search = self.exact_field_planner
+        elif option == "Bidirectional A*":
+            self.search = bidirectional_astar
+        elif option == "D* Lite":
+            self.search = self.incremental_planner
+        elif option == "JPS":
+            self.search = jps
+        elif option == "Weighted JPS":
+            self.search = weighted_jps
+        elif option == "HPA*":
+            self.search = self.hierarchical_planner
+        elif option == "A* (8-dir)":
+            self.search = astar8
+        elif option == "Theta*":
+            self.search = self.theta_planner
+        elif option == "Lazy Theta*":
+            self.search = self.lazy_theta_planner
+        elif option == "Weighted A*":
+            self.search = self.weighted_planner
+        elif option == "ARA*":
+            self.search = self.anytime_planner
+
+        self.restrict_heuristics()
+        if self.agents is not None:
+            self.agents.search = self.get_agent_search()
+        self.request_path()
+
+    # Mijenja epsilon tezinskog A* i pocetni epsilon ARA* (najmanje 1)
+    def change_epsilon(self, delta):
+        for planner in (self.weighted_planner, self.anytime_planner):
+            planner.epsilon = max(1.0, planner.epsilon + delta)
+        # zapamceni putevi su izracunati sa starim epsilon
+        self.path_cache.clear()
+        if self.agents is not None:
+            self.agents.search = self.get_agent_search()
+        self.request_path()
+
+    # Kretanje u 8 smjerova i pod kutom ima svoju heuristiku, pa se odabire
+    # zajedno sa algoritmom. Heuristike koje bi precijenile put se ne mogu
+    # odabrati: Manhattan i ALT (udaljenosti u 4 smjera) za dijagonalni korak,
+    # a uz njih i Octile za put pod kutom.
+    def restrict_heuristics(self):
+        dropdown = self.heuristic_dropdown
+        if self.search is astar8:
+            dropdown.disabled = {"Manhattan", "ALT"}
+            preferred = "Octile"
+        elif isinstance(self.search, ThetaStar):
+            dropdown.disabled = {"Manhattan", "ALT", "Octile"}
+            preferred = "Euclidean"
+        else:
+            dropdown.disabled = set()
+            return
+        if dropdown.selected_option != preferred:
+            self.select_heuristic(preferred)
 
-        self.get_path()
+    def select_heuristic(self, option):
+        self.heuristic_dropdown.selected_option = option
+        self.set_heuristic(option)
 
 
 # Provjerava ako se izvodi ovaj file
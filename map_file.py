@@ -0,0 +1,240 @@
+# Binarni format mape koji se ucitava preko mmap bez kopiranja.
+#
+# Datoteka ima zaglavlje (HEADER) i zatim dva niza bajtova velicine
+# cols * rows: tezine svih celija pa oznake prepreka (0 ili 1), red po red
+# kao u Grid. open_map mapira datoteku u memoriju i predaje te nizove mrezi,
+# pa ucitavanje ne ovisi o velicini mape: operacijski sustav cita stranice
+# datoteke tek kad ih pretrazivanje dotakne. Promjene mreze ostaju samo u
+# memoriji (ACCESS_COPY), datoteka se mijenja samo sa save_map.
+#
+# import_text i export_text pretvaraju mapu iz/u tekstni format Moving AI
+# benchmarka (zaglavlje type/height/width/map pa jedan red teksta po retku
+# mape) red po red, bez ucitavanja cijele mape.
+#
+# Primjer:
+#   python map_file.py generate velika.apm 40000x40000 --density 0.2
+#   python map_file.py import mapa.map mapa.apm
+#   python map_file.py export mapa.apm mapa.map
+import argparse
+import mmap
+import os
+import random
+import struct
+
+from pathfinding import Grid
+
+MAGIC = b"APFM"
+FORMAT_VERSION = 1
+# oznaka, verzija formata, velicina zaglavlja, cols, rows
+HEADER = struct.Struct("<4sHHII")
+
+# Znakovi tekstnog formata: prohodni teren ima tezinu 1, mocvara 3, a drvece,
+# voda i rub mape su prepreke. Znamenke 1-9 su tezine (prosirenje formata).
+TEXT_COSTS = {b".": 1, b"G": 1, b"S": 3}
+TEXT_OBSTACLES = b"@OTW"
+
+
+def make_tables():
+    cost = bytearray(256)
+    obstacle = bytearray(256)
+    for char, value in TEXT_COSTS.items():
+        cost[char[0]] = value
+    for digit in range(1, 10):
+        cost[ord(str(digit))] = digit
+    for char in TEXT_OBSTACLES:
+        cost[char] = 1
+        obstacle[char] = 1
+    return bytes(cost), bytes(obstacle)
+
+
+# Tablice za bytes.translate: znak teksta u tezinu i u oznaku prepreke
+COST_TABLE, OBSTACLE_TABLE = make_tables()
+TEXT_CHARS = bytes(char for char in range(256) if COST_TABLE[char])
+# Tezina u znak teksta (tezina 1 je ".")
+EXPORT_TABLE = bytes(
+    ord(".") if value == 1 else ord(str(value)) if value < 10 else ord("9")
+    for value in range(256)
+)
+
+
+# Neispravna ili skracena datoteka mape (ValueError, kao i ostale greske
+# neispravnih podataka)
+class MapFormatError(ValueError):
+    pass
+
+
+def read_header(file):
+    data = file.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise MapFormatError("datoteka je prekratka za zaglavlje")
+    magic, version, headerSize, cols, rows = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise MapFormatError("nije datoteka mape")
+    if version != FORMAT_VERSION:
+        raise MapFormatError(f"nepoznata verzija formata: {version}")
+    if headerSize < HEADER.size:
+        raise MapFormatError(f"neispravna velicina zaglavlja: {headerSize}")
+    return headerSize, cols, rows
+
+
+def write_header(file, cols, rows):
+    file.write(HEADER.pack(MAGIC, FORMAT_VERSION, HEADER.size, cols, rows))
+
+
+# Sprema tezine i prepreke mreze (bez dnevnika promjena i pomocnih nizova)
+def save_map(grid, path):
+    with open(path, "wb") as file:
+        write_header(file, grid.cols, grid.rows)
+        file.write(grid.cost)
+        file.write(grid.obstacle)
+
+
+# Vraca mrezu cije tezine i prepreke citaju mapiranu datoteku
+def open_map(path):
+    with open(path, "rb") as file:
+        headerSize, cols, rows = read_header(file)
+        size = cols * rows
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapped) < headerSize + 2 * size:
+        raise MapFormatError("datoteka je kraca od velicine iz zaglavlja")
+    view = memoryview(mapped)
+    cost = view[headerSize : headerSize + size]
+    obstacle = view[headerSize + size : headerSize + 2 * size]
+    return Grid(cols, rows, storage=(cost, obstacle))
+
+
+# Cita mapu u postojecu mrezu iste velicine (kopira bajtove). Velicina
+# datoteke se provjerava prije citanja, pa skracena datoteka ne mijenja mrezu.
+def load_map(grid, path):
+    with open(path, "rb") as file:
+        headerSize, cols, rows = read_header(file)
+        if (cols, rows) != (grid.cols, grid.rows):
+            raise MapFormatError(
+                f"mapa je {cols}x{rows}, a mreza {grid.cols}x{grid.rows}"
+            )
+        if os.fstat(file.fileno()).st_size < headerSize + 2 * grid.size:
+            raise MapFormatError("datoteka je kraca od velicine iz zaglavlja")
+        file.seek(headerSize)
+        for values in (grid.cost, grid.obstacle):
+            if file.readinto(values) != len(values):
+                grid.mark_all_changed()
+                raise MapFormatError("datoteka je kraca od velicine iz zaglavlja")
+    grid.mark_all_changed()
+
+
+# Zapisuje mapu red po red. rows_of daje (tezine, prepreke) za svaki red kao
+# bajtove duljine cols.
+def write_rows(path, cols, rows, rows_of):
+    size = cols * rows
+    with open(path, "wb") as file:
+        write_header(file, cols, rows)
+        # prepreke pocinju iza svih tezina, pa datoteku odmah postavimo na
+        # punu velicinu i pisemo oba dijela na svoje mjesto
+        file.truncate(HEADER.size + 2 * size)
+        for row, (cost, obstacle) in enumerate(rows_of):
+            if len(cost) != cols or len(obstacle) != cols:
+                raise MapFormatError(f"red {row} nema {cols} celija")
+            file.seek(HEADER.size + row * cols)
+            file.write(cost)
+            file.seek(HEADER.size + size + row * cols)
+            file.write(obstacle)
+
+
+# Uvozi tekstnu mapu (Moving AI format) u binarnu datoteku
+def import_text(text_path, path):
+    with open(text_path, "rb") as text:
+        header = {}
+        for line in text:
+            line = line.strip()
+            if line == b"map":
+                break
+            key, _, value = line.partition(b" ")
+            header[key] = value
+        try:
+            cols = int(header[b"width"])
+            rows = int(header[b"height"])
+        except (KeyError, ValueError):
+            raise MapFormatError("tekstna mapa nema width i height") from None
+
+        def rows_of():
+            for row in range(rows):
+                line = text.readline().rstrip(b"\r\n")
+                if line.translate(None, TEXT_CHARS):
+                    raise MapFormatError(f"nepoznat znak u redu {row}")
+                yield line.translate(COST_TABLE), line.translate(OBSTACLE_TABLE)
+
+        write_rows(path, cols, rows, rows_of())
+    return cols, rows
+
+
+# Izvozi binarnu mapu u tekstni format, red po red iz mapirane datoteke
+def export_text(path, text_path):
+    grid = open_map(path)
+    cols = grid.cols
+    with open(text_path, "wb") as text:
+        text.write(b"type octile\n")
+        text.write(b"height %d\nwidth %d\nmap\n" % (grid.rows, cols))
+        for row in range(grid.rows):
+            begin = row * cols
+            costs = grid.cost[begin : begin + cols].tobytes()
+            line = bytearray(costs.translate(EXPORT_TABLE))
+            obstacles = grid.obstacle[begin : begin + cols].tobytes()
+            col = obstacles.find(1)
+            while col != -1:
+                line[col] = ord("@")
+                col = obstacles.find(1, col + 1)
+            text.write(line)
+            text.write(b"\n")
+
+
+# Nasumicna mapa zadane velicine zapisana red po red (za testiranje velikih
+# mapa). Nasumicni bajtovi se pretvaraju u tezine i prepreke sa translate.
+def generate_file(path, cols, rows, density, seed=0):
+    rng = random.Random(seed)
+    # tezine priblizno kao random_cost: 80% 1, 10% 2, 10% 3
+    costs = bytes(1 if value < 205 else 2 if value < 230 else 3 for value in range(256))
+    threshold = int(density * 256)
+    obstacles = bytes(1 if value < threshold else 0 for value in range(256))
+
+    def rows_of():
+        for _ in range(rows):
+            yield (
+                rng.randbytes(cols).translate(costs),
+                rng.randbytes(cols).translate(obstacles),
+            )
+
+    write_rows(path, cols, rows, rows_of())
+
+
+def parse_size(text):
+    cols, rows = text.lower().split("x")
+    return int(cols), int(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uvoz, izvoz i generiranje mapa")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="nasumicna binarna mapa")
+    generate.add_argument("path")
+    generate.add_argument("size", type=parse_size, help="COLSxROWS")
+    generate.add_argument("--density", type=float, default=0.2)
+    generate.add_argument("--seed", type=int, default=0)
+    importer = commands.add_parser("import", help="tekstna mapa u binarnu")
+    importer.add_argument("text_path")
+    importer.add_argument("path")
+    exporter = commands.add_parser("export", help="binarna mapa u tekstnu")
+    exporter.add_argument("path")
+    exporter.add_argument("text_path")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        cols, rows = args.size
+        generate_file(args.path, cols, rows, args.density, args.seed)
+    elif args.command == "import":
+        import_text(args.text_path, args.path)
+    else:
+        export_text(args.path, args.text_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Generiranje mapa na kojima uvijek postoji put od starta do cilja.
+#
+# Prepreke se postavljaju nasumicno kao u place_random_obstacles, a zatim se
+# jednim 0-1 BFS prolazom od starta (prijelaz na prepreku kosta 1, na slobodnu
+# celiju 0) nalazi put do cilja preko najmanjeg broja prepreka. Ako je cilj
+# vec dostupan, to je obicni flood fill koji staje kod cilja. Inace se
+# prepreke na nadjenom putu uklanjaju. Nema ponavljanja generiranja ni
+# pretrazivanja sa A*, a promjena rasporeda prepreka je najmanja moguca.
+import random
+import time
+from array import array
+from collections import deque
+
+from pathfinding import DIRECTIONS, Grid
+
+UNVISITED = 0xFFFFFFFF
+
+# Tezine i kumulativne vjerojatnosti kao u random_cost (80% / 10% / 10%)
+COSTS = (1, 2, 3)
+COST_WEIGHTS = (8, 9, 10)
+
+
+# Povezuje start i cilj uklanjanjem najmanjeg broja prepreka. Vraca broj
+# uklonjenih prepreka (0 ako je put vec postojao). Igrac moze izaci sa
+# prepreke na kojoj stoji, pa se prepreka na startu ne broji.
+def connect(grid, start, end):
+    cols = grid.cols
+    rows = grid.rows
+    obstacle = grid.obstacle
+    if obstacle[end]:
+        grid.set_obstacle(end, False)
+        removed = 1
+    else:
+        removed = 0
+
+    distance = array("I", [UNVISITED]) * grid.size
+    parent = array("i", [-1]) * grid.size
+    distance[start] = 0
+    queue = deque([start])
+
+    while queue:
+        current = queue.popleft()
+        if current == end:
+            break
+        currentDistance = distance[current]
+        row, col = divmod(current, cols)
+
+        for dx, dy in DIRECTIONS:
+            x = col + dx
+            y = row + dy
+
+            if x < 0 or x >= cols or y < 0 or y >= rows:
+                continue
+
+            neighbour = y * cols + x
+            step = obstacle[neighbour]
+            if currentDistance + step >= distance[neighbour]:
+                continue
+            distance[neighbour] = currentDistance + step
+            parent[neighbour] = current
+            # slobodne celije idu na pocetak reda, prepreke na kraj
+            if step:
+                queue.append(neighbour)
+            else:
+                queue.appendleft(neighbour)
+
+    index = parent[end]
+    while index != -1 and index != start:
+        if obstacle[index]:
+            grid.set_obstacle(index, False)
+            removed += 1
+        index = parent[index]
+    return removed
+
+
+# Kao place_random_obstacles, ali nakon postavljanja prepreka put od starta
+# do cilja sigurno postoji. Vraca broj prepreka uklonjenih radi povezivanja.
+def place_solvable_obstacles(grid, obstacles, start, end, rng=random):
+    for _ in range(obstacles):
+        index = rng.randrange(grid.size)
+        if index == start or index == end:
+            continue
+        grid.set_obstacle(index, True)
+    return connect(grid, start, end)
+
+
+# Nova mapa sa nasumicnim tezinama i gustocom prepreka density. Vraca
+# (mreza, start, cilj, broj uklonjenih prepreka).
+def generate_map(cols, rows, density, rng=random):
+    grid = Grid(cols, rows)
+    size = grid.size
+    # tezine sa istom raspodjelom kao random_cost, ali jednim pozivom
+    grid.cost[:] = array("B", rng.choices(COSTS, cum_weights=COST_WEIGHTS, k=size))
+    start = rng.randrange(size)
+    end = rng.randrange(size)
+    # prepreke pisemo izravno u niz, dnevnik promjena se postavlja na kraju
+    obstacle = grid.obstacle
+    for index in rng.choices(range(size), k=int(size * density)):
+        obstacle[index] = 1
+    obstacle[start] = 0
+    obstacle[end] = 0
+    removed = connect(grid, start, end)
+    grid.mark_all_changed()
+    return grid, start, end, removed
+
+
+# Generira count mapa iz jednog seeda. Mapa n je uvijek ista za isti seed,
+# bez obzira na count. Vraca (mreza, start, cilj, uklonjeno, sekunde).
+def generate_maps(count, cols, rows, density, seed=0):
+    for number in range(count):
+        rng = random.Random(f"{seed}-{cols}x{rows}-{density}-{number}")
+        begin = time.perf_counter()
+        grid, start, end, removed = generate_map(cols, rows, density, rng)
+        yield grid, start, end, removed, time.perf_counter() - begin
@@ -0,0 +1,458 @@
+# Kretanje u 8 smjerova i kretanje pod bilo kojim kutom (any-angle).
+#
+# astar8 je A* sa dijagonalnim koracima. Korak iz celije u kosta cost[u] puta
+# duljina koraka (1 ili korijen iz 2), a dijagonalni korak nije dozvoljen ako
+# je jedna od dvije celije pored njega prepreka (ne rezu se uglovi). Pripadna
+# heuristika je octile_distance.
+#
+# ThetaStar (Theta* i Lazy Theta*) pri sirenju cvora provjerava vidi li
+# roditelj trenutnog cvora susjeda. Ako vidi, susjed se spaja izravno sa
+# roditeljem pa put ide ravnim crtama izmedju vrhova. Linija vidljivosti
+# (LineOfSight) prolazi samo kroz slobodne celije iste tezine kao pocetak
+# linije, pa je trosak dijela puta tezina puta duljina. Pripadna heuristika
+# je euclidian_distance (octile bi precijenio put pod kutom).
+import heapq
+import math
+
+from pathfinding import CLOSED, OPEN
+
+SQRT2 = math.sqrt(2)
+
+# Pomaci u 8 smjerova: (dx, dy, duljina koraka)
+MOVES = [
+    (0, -1, 1.0),
+    (1, 0, 1.0),
+    (0, 1, 1.0),
+    (-1, 0, 1.0),
+    (1, -1, SQRT2),
+    (1, 1, SQRT2),
+    (-1, 1, SQRT2),
+    (-1, -1, SQRT2),
+]
+
+
+# Trosak puta za bilo koji nacin kretanja: svaki dio puta (korak ili ravna
+# crta izmedju vrhova) kosta tezinu pocetne celije puta duljina
+def path_cost(grid, path):
+    total = 0
+    for current, following in zip(path, path[1:]):
+        total += segment_cost(grid, current, following)
+    return total
+
+
+def segment_cost(grid, current, following):
+    row, col = divmod(current, grid.cols)
+    nextRow, nextCol = divmod(following, grid.cols)
+    dx = nextCol - col
+    dy = nextRow - row
+    if dx == 0 or dy == 0:
+        return grid.cost[current] * (abs(dx) + abs(dy))
+    return grid.cost[current] * math.hypot(dx, dy)
+
+
+# Susjedi celije u 8 smjerova kao (susjed, duljina koraka), bez prepreka i bez
+# dijagonala koje bi rezale ugao prepreke
+def neighbours8(grid, index):
+    cols = grid.cols
+    rows = grid.rows
+    obstacle = grid.obstacle
+    row, col = divmod(index, cols)
+    result = []
+    for dx, dy, length in MOVES:
+        x = col + dx
+        y = row + dy
+        if x < 0 or x >= cols or y < 0 or y >= rows:
+            continue
+        if obstacle[y * cols + x]:
+            continue
+        if dx and dy and (obstacle[row * cols + x] or obstacle[y * cols + col]):
+            continue
+        result.append((y * cols + x, length))
+    return result
+
+
+# A* sa koracima u 8 smjerova. Ulazi i izlaz su isti kao kod astar.
+def astar8(grid, start, end, heuristic, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heuristic = stats.timed_heuristic(heuristic)
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    search = grid.new_search()
+
+    cols = grid.cols
+    rows = grid.rows
+    cost = grid.cost
+    obstacle = grid.obstacle
+    g = grid.g
+    parent = grid.parent
+    state = grid.state
+    stamp = grid.stamp
+    endPosition = grid.position(end)
+
+    stamp[start] = search
+    g[start] = 0
+    parent[start] = -1
+    h = heuristic(grid.position(start), endPosition)
+
+    openList = []
+    counter = 0
+    expanded = 0
+    reopened = 0
+
+    heappush(openList, (h, h, counter, 0, start))
+    state[start] = OPEN
+
+    while openList:
+        _, _, _, currentG, current = heappop(openList)
+
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+
+        state[current] = CLOSED
+        expanded += 1
+
+        if current == end:
+            if stats is None:
+                return grid.reconstruct_path(current)
+            path = stats.reconstruct(grid.reconstruct_path, current)
+            return stats.end(path, expanded, counter + 1, reopened)
+
+        stepCost = cost[current]
+        row, col = divmod(current, cols)
+
+        for dx, dy, length in MOVES:
+            x = col + dx
+            y = row + dy
+
+            if x < 0 or x >= cols or y < 0 or y >= rows:
+                continue
+
+            neighbour = y * cols + x
+
+            if obstacle[neighbour]:
+                continue
+            # dijagonala ne smije rezati ugao prepreke
+            if dx and dy and (obstacle[row * cols + x] or obstacle[y * cols + col]):
+                continue
+
+            tentative_g = currentG + stepCost * length
+            if stamp[neighbour] == search:
+                if tentative_g >= g[neighbour]:
+                    continue
+                if state[neighbour] == CLOSED:
+                    reopened += 1
+
+            stamp[neighbour] = search
+            parent[neighbour] = current
+            g[neighbour] = tentative_g
+            h = heuristic((x, y), endPosition)
+
+            state[neighbour] = OPEN
+            counter += 1
+            heappush(openList, (tentative_g + h, h, counter, tentative_g, neighbour))
+
+    if stats is not None:
+        stats.end(None, expanded, counter + 1, reopened)
+    return None
+
+
+astar8.optimal = True
+
+
+# Provjera linije vidljivosti preko bitmapa. Za svaku tezinu koja se pojavi
+# kao pocetak linije cuva se po jedan cijeli broj za svaki red mape, u kojem
+# je bit col postavljen ako celija (col, red) blokira liniju te tezine
+# (prepreka ili druga tezina). Linija se provjerava po redovima: za svaki red
+# kroz koji prolazi racuna se raspon stupaca koje dotice, pa je provjera
+# jedna operacija nad bitovima po redu. Bitmape se uskladjuju sa mrezom
+# preko dnevnika promjena.
+class LineOfSight:
+    def __init__(self):
+        self.origin = None
+        self.version = -1
+        self.cols = 0
+        self.rows = 0
+        # tezina -> lista bitmapa redova
+        self.masks = {}
+        self.checks = 0
+
+    def update(self, grid):
+        if (
+            grid.origin is self.origin
+            and grid.cols == self.cols
+            and grid.rows == self.rows
+        ):
+            if grid.version == self.version:
+                return
+            changes = grid.changes_since(self.version)
+            if changes is not None:
+                self.apply(grid, changes)
+                self.version = grid.version
+                return
+        self.origin = grid.origin
+        self.version = grid.version
+        self.cols = grid.cols
+        self.rows = grid.rows
+        self.masks = {}
+
+    # Bitmape redova za liniju koja krece sa celije tezine value
+    def row_masks(self, grid, value):
+        masks = self.masks.get(value)
+        if masks is not None:
+            return masks
+        cols = self.cols
+        # bajt tezine u znak "0" (prolazno) ili "1", prepreka je uvijek "1"
+        costTable = bytes(48 if char == value else 49 for char in range(256))
+        obstacleTable = bytes(49 if char else 48 for char in range(256))
+        masks = []
+        for row in range(self.rows):
+            begin = row * cols
+            costs = bytes(grid.cost[begin : begin + cols]).translate(costTable)
+            obstacles = bytes(grid.obstacle[begin : begin + cols]).translate(
+                obstacleTable
+            )
+            # najnizi bit je stupac 0, pa niz znakova okrecemo
+            masks.append(int(costs[::-1], 2) | int(obstacles[::-1], 2))
+        self.masks[value] = masks
+        return masks
+
+    def apply(self, grid, changes):
+        cols = self.cols
+        for index in set(changes):
+            row, col = divmod(index, cols)
+            bit = 1 << col
+            for value, masks in self.masks.items():
+                if grid.obstacle[index] or grid.cost[index] != value:
+                    masks[row] |= bit
+                else:
+                    masks[row] &= ~bit
+
+    # Vidi li se celija target iz celije source (ravna crta izmedju sredista
+    # celija ne dotice celiju koja blokira). Celija na samom uglu dviju celija
+    # se racuna u obje, kao i kod dijagonalnih koraka. Racuna se u cijelim
+    # brojevima: polozaj crte na rubovima reda je u jedinicama 1 / (2 * dy).
+    def visible(self, grid, source, target):
+        self.checks += 1
+        value = grid.cost[source]
+        masks = self.masks.get(value)
+        if masks is None:
+            masks = self.row_masks(grid, value)
+        cols = self.cols
+        y0, x0 = divmod(source, cols)
+        y1, x1 = divmod(target, cols)
+        if y0 == y1:
+            low = min(x0, x1)
+            span = abs(x1 - x0) + 1
+            return not (masks[y0] >> low) & ((1 << span) - 1)
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        dx = x1 - x0
+        dy = y1 - y0
+        scale = 2 * dy
+        # crta u prvom i zadnjem redu prelazi pola reda, u ostalima cijeli red
+        top = 0
+        bottom = dx
+        for y in range(y0, y1 + 1):
+            if dx >= 0:
+                low = x0 - (dy - top) // scale
+                high = x0 + (bottom + dy) // scale
+            else:
+                low = x0 - (dy - bottom) // scale
+                high = x0 + (top + dy) // scale
+            if (masks[y] >> low) & ((1 << (high - low + 1)) - 1):
+                return False
+            top = bottom
+            bottom += dx if y + 1 == y1 else 2 * dx
+        return True
+
+
+# Celije kroz koje prolazi ravna crta od celije source do celije target (bez
+# source). Koraci su u 8 smjerova, dijagonalni kad crta prolazi kroz ugao.
+def line_cells(grid, source, target):
+    cols = grid.cols
+    y, x = divmod(source, cols)
+    y1, x1 = divmod(target, cols)
+    dx = abs(x1 - x)
+    dy = abs(y1 - y)
+    stepX = 1 if x1 > x else -1
+    stepY = 1 if y1 > y else -1
+    cells = []
+    ix = iy = 0
+    while ix < dx or iy < dy:
+        # koju granicu celije crta prva prelazi: okomitu, vodoravnu ili ugao
+        side = (1 + 2 * ix) * dy - (1 + 2 * iy) * dx
+        if side == 0:
+            x += stepX
+            y += stepY
+            ix += 1
+            iy += 1
+        elif side < 0:
+            x += stepX
+            ix += 1
+        else:
+            y += stepY
+            iy += 1
+        cells.append(y * cols + x)
+    return cells
+
+
+# Pretvara vrhove any-angle puta u niz celija (za crtanje i kretanje igraca)
+def expand_waypoints(grid, waypoints):
+    path = [waypoints[0]]
+    for target in waypoints[1:]:
+        path.extend(line_cells(grid, path[-1], target))
+    return path
+
+
+# Theta* (lazy False) i Lazy Theta* (lazy True). Poziva se kao astar, a vraca
+# vrhove puta (susjedni vrhovi nisu nuzno susjedne celije), ili sa cells True
+# niz celija kroz koje put prolazi. Theta* provjerava vidljivost za svakog
+# susjeda, a Lazy Theta* pretpostavi da je susjed vidljiv i provjeri tek kad
+# ga siri, pa provjera ima puno manje.
+class ThetaStar:
+    def __init__(self, lazy=False, cells=False):
+        self.lazy = lazy
+        self.cells = cells
+        self.sight = LineOfSight()
+
+    def __call__(self, grid, start, end, heuristic, stats=None):
+        self.sight.update(grid)
+        path = self.search(grid, start, end, heuristic, stats)
+        if path and self.cells:
+            return expand_waypoints(grid, path)
+        return path
+
+    def search(self, grid, start, end, heuristic, stats):
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        if stats is not None:
+            stats.begin()
+            heuristic = stats.timed_heuristic(heuristic)
+            heappush = stats.heappush
+            heappop = stats.heappop
+
+        search = grid.new_search()
+
+        cols = grid.cols
+        cost = grid.cost
+        obstacle = grid.obstacle
+        g = grid.g
+        parent = grid.parent
+        state = grid.state
+        stamp = grid.stamp
+        visible = self.sight.visible
+        lazy = self.lazy
+        endPosition = grid.position(end)
+
+        stamp[start] = search
+        g[start] = 0
+        parent[start] = -1
+        h = heuristic(grid.position(start), endPosition)
+
+        openList = []
+        counter = 0
+        expanded = 0
+
+        heappush(openList, (h, h, counter, 0, start))
+        state[start] = OPEN
+
+        while openList:
+            _, _, _, currentG, current = heappop(openList)
+
+            # g se kod Lazy Theta* moze i povecati, pa je zastario svaki zapis
+            # sa drugim g
+            if state[current] == CLOSED or currentG != g[current]:
+                continue
+
+            state[current] = CLOSED
+            expanded += 1
+
+            # Lazy Theta*: roditelj je pretpostavljen, ako ga cvor ne vidi
+            # uzimamo najboljeg zatvorenog susjeda i cvor vracamo u otvorenu
+            # listu sa ispravljenim g (zatvoren sa losijim g bi odbio bolje
+            # puteve). Za susjednog roditelja je dovoljno da korak ne reze
+            # ugao (start moze biti prepreka).
+            source = parent[current]
+            if lazy and source != -1:
+                row, col = divmod(current, cols)
+                sourceRow, sourceCol = divmod(source, cols)
+                if abs(row - sourceRow) <= 1 and abs(col - sourceCol) <= 1:
+                    valid = (
+                        row == sourceRow
+                        or col == sourceCol
+                        or not (
+                            obstacle[row * cols + sourceCol]
+                            or obstacle[sourceRow * cols + col]
+                        )
+                    )
+                else:
+                    valid = visible(grid, source, current)
+                if not valid:
+                    best = None
+                    for neighbour, length in neighbours8(grid, current):
+                        if stamp[neighbour] != search or state[neighbour] != CLOSED:
+                            continue
+                        candidate = g[neighbour] + cost[neighbour] * length
+                        if best is None or candidate < best:
+                            best = candidate
+                            parent[current] = neighbour
+                    g[current] = best
+                    state[current] = OPEN
+                    h = heuristic(grid.position(current), endPosition)
+                    counter += 1
+                    heappush(openList, (best + h, h, counter, best, current))
+                    continue
+
+            if current == end:
+                if stats is None:
+                    return grid.reconstruct_path(current)
+                path = stats.reconstruct(grid.reconstruct_path, current)
+                return stats.end(path, expanded, counter + 1, 0)
+
+            source = parent[current]
+            row, col = divmod(current, cols)
+            if source != -1:
+                sourceRow, sourceCol = divmod(source, cols)
+
+            for neighbour, length in neighbours8(grid, current):
+                if stamp[neighbour] == search and state[neighbour] == CLOSED:
+                    continue
+
+                # put preko roditelja (ravna crta) ili obicni korak, koji je
+                # jeftiniji. Crta ne moze biti vidljiva ako krajevi nemaju istu
+                # tezinu, a korak je jeftiniji ako trenutna celija ima manju
+                # tezinu od roditelja.
+                tentative_g = currentG + cost[current] * length
+                newParent = current
+                if source != -1 and cost[neighbour] == cost[source]:
+                    y, x = divmod(neighbour, cols)
+                    lineG = g[source] + cost[source] * math.hypot(
+                        x - sourceCol, y - sourceRow
+                    )
+                    if lineG < tentative_g and (
+                        lazy or visible(grid, source, neighbour)
+                    ):
+                        tentative_g = lineG
+                        newParent = source
+
+                if stamp[neighbour] == search and tentative_g >= g[neighbour]:
+                    continue
+
+                stamp[neighbour] = search
+                parent[neighbour] = newParent
+                g[neighbour] = tentative_g
+                h = heuristic(grid.position(neighbour), endPosition)
+
+                state[neighbour] = OPEN
+                counter += 1
+                heappush(
+                    openList, (tentative_g + h, h, counter, tentative_g, neighbour)
+                )
+
+        if stats is not None:
+            stats.end(None, expanded, counter + 1, 0)
+        return None
@@ -0,0 +1,166 @@
+# Pretrazivanje velikog broja neovisnih upita u vise procesa.
+#
+# Mapa se ne salje procesima kao pickle, nego se tezine i prepreke kopiraju u
+# dijeljenu memoriju (multiprocessing.shared_memory), a svaki radni proces
+# napravi Grid nad tim bajtovima (Grid storage, kao kod map_file.open_map).
+# Upiti se salju u komadima od chunk_size parova, a rezultati se vracaju cim
+# je pojedini komad gotov (imap_unordered), pa se obradjuju dok se ostali
+# jos racunaju. Pomocni nizovi za pretrazivanje su u svakom procesu posebni.
+import multiprocessing
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+from movement import path_cost
+from pathfinding import Grid, astar, manhattan_distance, update_heuristic
+
+# Broj parova u jednom komadu posla
+CHUNK_SIZE = 64
+
+
+# Stanje radnog procesa: algoritam, heuristika i mreza nad dijeljenom memorijom
+class WorkerState:
+    def __init__(self, search, heuristic):
+        self.search = search
+        self.heuristic = heuristic
+        self.memory = None
+        self.grid = None
+        self.token = None
+
+    # Spaja se na blok dijeljene memorije (ako je novi) i oznacava promjenu
+    # mape kad se promijeni oznaka sadrzaja
+    def attach(self, name, cols, rows, token):
+        if (
+            self.memory is None
+            or self.memory.name != name
+            or (self.grid.cols, self.grid.rows) != (cols, rows)
+        ):
+            self.detach()
+            self.memory = shared_memory.SharedMemory(name=name)
+            size = cols * rows
+            buffer = self.memory.buf
+            self.grid = Grid(
+                cols, rows, storage=(buffer[:size], buffer[size : 2 * size])
+            )
+            self.token = token
+        elif self.token != token:
+            # isti blok, ali nova mapa: planeri sa stanjem moraju krenuti ispocetka
+            self.grid.mark_all_changed()
+            self.token = token
+        return self.grid
+
+    def detach(self):
+        if self.memory is None:
+            return
+        # pogledi na blok moraju biti oslobodjeni prije zatvaranja
+        self.grid.cost.release()
+        self.grid.obstacle.release()
+        self.grid = None
+        self.memory.close()
+        self.memory = None
+
+
+worker_state = None
+
+
+def init_worker(search, heuristic):
+    global worker_state
+    worker_state = WorkerState(search, heuristic)
+
+
+# Rjesava komad upita i vraca listu (broj upita, trosak, put kao array("i"))
+def solve_chunk(task):
+    name, cols, rows, token, chunk = task
+    grid = worker_state.attach(name, cols, rows, token)
+    search = worker_state.search
+    heuristic = worker_state.heuristic
+    update_heuristic(heuristic, grid)
+    results = []
+    for number, start, end in chunk:
+        path = search(grid, start, end, heuristic)
+        if path:
+            # trosak za bilo koji nacin kretanja (i dijagonalni korak ili crtu)
+            results.append((number, path_cost(grid, path), array("i", path)))
+        else:
+            results.append((number, None, None))
+    return results
+
+
+class ParallelSolver:
+    def __init__(
+        self,
+        workers=None,
+        search=astar,
+        heuristic=manhattan_distance,
+        chunk_size=CHUNK_SIZE,
+    ):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        # radni procesi moraju koristiti isti resource_tracker kao glavni
+        # proces. Inace svaki pokrene svoj, koji kod izlaska procesa obrise
+        # blok dijeljene memorije koji jos koristimo.
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(
+            self.workers, initializer=init_worker, initargs=(search, heuristic)
+        )
+        self.memory = None
+        self.token = 0
+        # brojaci za mjerenje
+        self.queries = 0
+        self.solve_time = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Kopira mapu u dijeljenu memoriju. Blok se koristi ponovno dok je
+    # velicina mape ista.
+    def share(self, grid):
+        size = grid.size
+        if self.memory is None or self.memory.size < 2 * size:
+            self.release()
+            self.memory = shared_memory.SharedMemory(create=True, size=2 * size)
+        self.memory.buf[:size] = grid.cost
+        self.memory.buf[size : 2 * size] = grid.obstacle
+        self.token += 1
+
+    # Vraca rezultate (broj para, trosak, put) redom kojim su gotovi. Mapa se
+    # ne smije mijenjati dok se rezultati ne preuzmu.
+    def solve(self, grid, pairs):
+        begin = time.perf_counter()
+        self.share(grid)
+        tasks = []
+        for first in range(0, len(pairs), self.chunk_size):
+            chunk = [
+                (number, start, end)
+                for number, (start, end) in enumerate(
+                    pairs[first : first + self.chunk_size], first
+                )
+            ]
+            tasks.append(
+                (self.memory.name, grid.cols, grid.rows, self.token, chunk)
+            )
+        for results in self.pool.imap_unordered(solve_chunk, tasks):
+            yield from results
+        self.queries += len(pairs)
+        self.solve_time += time.perf_counter() - begin
+
+    # Kao solve, ali vraca listu (trosak, put) istim redom kao pairs
+    def solve_all(self, grid, pairs):
+        results = [None] * len(pairs)
+        for number, cost, path in self.solve(grid, pairs):
+            results[number] = (cost, path)
+        return results
+
+    def release(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.release()
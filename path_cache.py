@@ -0,0 +1,83 @@
+# Zapamceni rezultati pretrazivanja.
+#
+# Kljuc je verzija mreze, start, cilj, algoritam i heuristika. Svaka promjena
+# celije povecava verziju mreze pa stari rezultati vise ne odgovaraju nijednom
+# kljucu i s vremenom ispadnu iz cache-a (LRU). Kad se igrac pomakne po putu
+# koji je vec izracunat, vraca se ostatak tog puta od njegove pozicije, jer je
+# i ostatak najkraceg puta najkraci put. To vrijedi samo za algoritme koji
+# daju najkraci put (optimal True), ostali (HPA*, tezinski A*, ARA*, Theta*,
+# JPS) koriste samo isti upit.
+import time
+from collections import OrderedDict
+
+# Broj zapamcenih puteva
+MAX_CACHED_PATHS = 32
+
+
+class CachedPath:
+    def __init__(self, path, elapsed_time, stats):
+        # put kao tuple da ga igrac ne moze skratiti
+        self.path = tuple(path) if path else None
+        self.elapsed_time = elapsed_time
+        self.stats = stats
+
+
+class PathCache:
+    def __init__(self, max_entries=MAX_CACHED_PATHS):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # brojaci za prikaz: pogoci (od toga ostaci puta), promasaji i ukupno
+        # vrijeme pretrazivanja koje nije trebalo ponoviti
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.saved_time = 0.0
+        self.lookup_time = 0.0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    # Vraca (put, zapis) ili None. Put je nova lista koju pozivatelj smije mijenjati.
+    def get(self, version, start, end, search, heuristic):
+        begin = time.perf_counter()
+        key = (version, start, end, search, heuristic)
+        entry = self.entries.get(key)
+        path = None
+        if entry is not None:
+            self.entries.move_to_end(key)
+            path = list(entry.path) if entry.path else entry.path
+        elif getattr(search, "optimal", False):
+            entry, path = self.find_suffix(version, start, end, search, heuristic)
+        self.lookup_time += time.perf_counter() - begin
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.saved_time += entry.elapsed_time
+        return path, entry
+
+    # Trazi zapamceni put prema istom cilju na istoj mrezi koji prolazi kroz
+    # start i vraca njegov ostatak (najnoviji zapisi prvi)
+    def find_suffix(self, version, start, end, search, heuristic):
+        for key in reversed(self.entries):
+            entry = self.entries[key]
+            if key[0] != version or key[2:] != (end, search, heuristic):
+                continue
+            if entry.path and start in entry.path:
+                self.entries.move_to_end(key)
+                self.suffix_hits += 1
+                return entry, list(entry.path[entry.path.index(start) :])
+        return None, None
+
+    def put(self, version, start, end, search, heuristic, path, elapsed_time, stats):
+        key = (version, start, end, search, heuristic)
+        self.entries[key] = CachedPath(path, elapsed_time, stats)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
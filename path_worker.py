@@ -0,0 +1,187 @@
+# Racunanje puta u pozadinskoj dretvi da glavna petlja igre ne ceka na A*.
+#
+# Svaki zahtjev dobiva snapshot mreze pa daljnje promjene mape ne utjecu na
+# pretrazivanje koje je u tijeku. Novi zahtjev zamjenjuje zahtjev koji jos
+# nije zapoceo i prekida onaj koji se trenutno izvodi. Glavna petlja preuzima
+# najnoviji gotov rezultat sa poll(). Iznimka u algoritmu ne zaustavlja
+# dretvu, nego se vraca kao rezultat bez puta (PathResult.error).
+import threading
+import time
+
+from pathfinding import Grid, SearchStats, update_heuristic
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+# Statistika koja prekida pretrazivanje kad stigne noviji zahtjev. Svi algoritmi
+# koriste stats.heappop pa se zastavica provjerava prije svakog sirenja cvora.
+class CancellableStats(SearchStats):
+    def __init__(self, cancelled):
+        self.cancelled = cancelled
+        super().__init__()
+
+    def heappop(self, heap):
+        if self.cancelled.is_set():
+            raise SearchCancelled()
+        return super().heappop(heap)
+
+
+class PathRequest:
+    def __init__(
+        self, request_id, search, snapshot, start, end, heuristic, deadline=None
+    ):
+        self.request_id = request_id
+        self.search = search
+        self.snapshot = snapshot
+        self.start = start
+        self.end = end
+        self.heuristic = heuristic
+        # rok u milisekundama za anytime algoritme (anytime.AnytimeAStar)
+        self.deadline = deadline
+        self.cancelled = threading.Event()
+
+
+class PathResult:
+    def __init__(self, request, path, elapsed_time, stats, error=None):
+        self.request_id = request.request_id
+        self.start = request.start
+        self.end = request.end
+        # algoritam, heuristika i verzija mreze za koje vrijedi put (za cache)
+        self.search = request.search
+        self.heuristic = request.heuristic
+        self.version = request.snapshot.version
+        self.path = path
+        self.elapsed_time = elapsed_time
+        self.stats = stats
+        # iznimka ako pretrazivanje nije uspjelo (put je tada None)
+        self.error = error
+
+
+class PathWorker:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None
+        self._running = None
+        self._result = None
+        self._last_request_id = 0
+        self._finished_id = 0
+        self._closed = False
+        # mreza u koju dretva kopira snapshot, pomocni nizovi se ponovno koriste
+        self._grid = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Salje novi zahtjev i vraca njegov broj. Stariji zahtjevi se otkazuju.
+    def submit(self, search, grid, start, end, heuristic, deadline=None):
+        snapshot = grid.snapshot()
+        with self._condition:
+            self._last_request_id += 1
+            self._pending = PathRequest(
+                self._last_request_id,
+                search,
+                snapshot,
+                start,
+                end,
+                heuristic,
+                deadline,
+            )
+            if self._running is not None:
+                self._running.cancelled.set()
+            # gotov rezultat koji nije preuzet vrijedi za staru mapu
+            self._result = None
+            self._condition.notify_all()
+            return self._last_request_id
+
+    # Vraca najnoviji gotov rezultat koji jos nije preuzet ili None
+    def poll(self):
+        with self._condition:
+            result = self._result
+            self._result = None
+            return result
+
+    # Salje zahtjev i ceka njegov rezultat (za mjesta kojima put treba odmah)
+    def compute(self, search, grid, start, end, heuristic, deadline=None):
+        request_id = self.submit(search, grid, start, end, heuristic, deadline)
+        with self._condition:
+            while self._finished_id < request_id:
+                self._condition.wait()
+            result = self._result
+            self._result = None
+            return result
+
+    # Otkazuje zahtjeve koji nisu gotovi i odbacuje rezultat koji nije preuzet
+    # (npr. kad se put uzme iz cache-a)
+    def cancel(self):
+        with self._condition:
+            self._pending = None
+            if self._running is not None:
+                self._running.cancelled.set()
+            self._result = None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            if self._running is not None:
+                self._running.cancelled.set()
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                request = self._pending
+                self._pending = None
+                self._running = request
+
+            try:
+                result = self._search(request)
+            except Exception as error:
+                # bez rezultata bi compute cekao zauvijek
+                result = PathResult(request, None, 0, SearchStats(), error)
+
+            with self._condition:
+                self._running = None
+                # zahtjev otkazan nakon zadnje provjere ne daje rezultat
+                if result is not None and not request.cancelled.is_set():
+                    self._result = result
+                    self._finished_id = result.request_id
+                self._condition.notify_all()
+
+    def _search(self, request):
+        snapshot = request.snapshot
+        if (
+            self._grid is None
+            or self._grid.cols != snapshot.cols
+            or self._grid.rows != snapshot.rows
+        ):
+            self._grid = Grid(snapshot.cols, snapshot.rows)
+        self._grid.restore(snapshot)
+        # tablice heuristike (npr. ALT) racunamo iz kopije mreze u ovoj dretvi
+        update_heuristic(request.heuristic, self._grid)
+
+        stats = CancellableStats(request.cancelled)
+        # rok se predaje samo ako je zadan, ostali algoritmi ga ne primaju
+        options = {}
+        if request.deadline is not None:
+            options["deadline"] = request.deadline
+        begin = time.perf_counter()
+        try:
+            path = request.search(
+                self._grid,
+                request.start,
+                request.end,
+                request.heuristic,
+                stats=stats,
+                **options,
+            )
+        except SearchCancelled:
+            return None
+        elapsed_time = time.perf_counter() - begin
+
+        return PathResult(request, path, elapsed_time, stats)
@@ -0,0 +1,1223 @@
+# Jezgra pretrazivanja puta: mreza, heuristike i algoritmi.
+# Ne ovisi o pygame-u pa se moze koristiti i bez prozora igre (npr. u benchmark.py).
+import heapq
+import math
+import mmap
+import random
+import sys
+import time
+from array import array
+
+# Smjerovi kretanja na mrezi (gore, desno, dolje, lijevo)
+DIRECTIONS = [
+    (0, -1),  # gore
+    (1, 0),  # desno
+    (0, 1),  # dolje
+    (-1, 0),  # lijevo
+]
+
+# Bit svakog smjera iz DIRECTIONS u maski prohodnih smjerova celije. Maska
+# ima i bit MOVES_READY, pa maska 0 znaci da jos nije izracunata.
+DIRECTION_BITS = [1, 2, 4, 8]
+MOVES_READY = 16
+
+# Koliko zadnjih promjena mreze pamtimo za inkrementalne algoritme
+MAX_GRID_CHANGES = 4096
+
+# Bez rezervacije memorije unaprijed (Linux), inace jezgra odbije mapiranje
+# vece od dostupne memorije iako ce se dotaknuti samo mali dio
+MAP_NORESERVE = getattr(mmap, "MAP_NORESERVE", 0x4000 if sys.platform == "linux" else 0)
+
+# Stanja cvora tijekom pretrazivanja
+UNVISITED = 0
+OPEN = 1
+CLOSED = 2
+
+
+# Niz nula zadanog tipa u anonimnoj mmap memoriji. Operacijski sustav dodjeljuje
+# stranice tek kad se prvi put upisu, pa velika mreza zauzima memoriju samo za
+# celije koje je pretrazivanje stvarno posjetilo.
+def sparse_array(typecode, size):
+    length = max(1, size * array(typecode).itemsize)
+    if hasattr(mmap, "MAP_ANONYMOUS"):
+        flags = mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | MAP_NORESERVE
+        memory = mmap.mmap(-1, length, flags=flags)
+    else:
+        memory = mmap.mmap(-1, length)
+    return memoryview(memory).cast(typecode)
+
+
+# Za svaku masku prohodnih smjerova lista susjeda kao (pomak indeksa, dx, dy),
+# redom kao u DIRECTIONS
+def make_move_table(cols):
+    table = []
+    for mask in range(2 * MOVES_READY):
+        table.append(
+            tuple(
+                (dy * cols + dx, dx, dy)
+                for bit, (dx, dy) in zip(DIRECTION_BITS, DIRECTIONS)
+                if mask & bit
+            )
+        )
+    return table
+
+
+# Pomocni nizovi za pretrazivanje, koriste se ponovno u svakom pretrazivanju.
+# Vrijednosti g, parent i state vrijede samo za celije ciji je stamp jednak
+# broju trenutnog pretrazivanja, ostale celije su neposjecene. Zato nizovi
+# mogu biti i sparse (sve nule), sto koriste mreze ucitane iz datoteke.
+class SearchScratch:
+    def __init__(self, size, sparse=False):
+        self.size = size
+        self.sparse = sparse
+        if sparse:
+            self.g = sparse_array("d", size)
+            self.parent = sparse_array("i", size)
+            self.state = sparse_array("B", size)
+            self.stamp = sparse_array("I", size)
+        else:
+            self.g = array("d", [float("inf")]) * size
+            self.parent = array("i", [-1]) * size
+            self.state = array("B", [UNVISITED]) * size
+            self.stamp = array("I", [0]) * size
+        self.search_id = 0
+
+    # Zapocinje novo pretrazivanje i vraca njegov broj. Time sve celije postaju
+    # neposjecene bez prolaska kroz cijelu mrezu.
+    def new_search(self):
+        self.search_id += 1
+        # kad se brojac prelije, jednom ocistimo sve oznake
+        if self.search_id > 0xFFFFFFFF:
+            self.stamp[:] = array("I", [0]) * self.size
+            self.search_id = 1
+        return self.search_id
+
+    # Vraca g celije u zadnjem pretrazivanju (beskonacno ako nije posjecena)
+    def search_g(self, index):
+        if self.stamp[index] != self.search_id:
+            return float("inf")
+        return self.g[index]
+
+    # Vraca listu indeksa od starta do zadane celije prateci parent niz
+    def reconstruct_path(self, index):
+        path = []
+        parent = self.parent
+        while index != -1:
+            path.append(index)
+            index = parent[index]
+        return path[::-1]
+
+
+# Mreza igre spremljena u ravne nizove. Celija (col, row) ima indeks row * cols + col.
+# Mreza je ujedno i skup pomocnih nizova za pretrazivanje od starta.
+# Sa storage=(cost, obstacle) mreza koristi zadane nizove bajtova (npr. iz
+# mapirane datoteke, vidi map_file.py) umjesto da ih stvara.
+class Grid(SearchScratch):
+    def __init__(self, cols, rows, cost=1, storage=None):
+        super().__init__(cols * rows, sparse=storage is not None)
+        self.cols = cols
+        self.rows = rows
+        # tezina i prepreka za svaku celiju
+        if storage is not None:
+            self.cost, self.obstacle = storage
+        else:
+            self.cost = array("B", [cost]) * self.size
+            self.obstacle = array("B", [0]) * self.size
+        # drugi skup pomocnih nizova za pretrazivanje od cilja, stvara se po potrebi
+        self.backward = None
+        # Svaka promjena celije povecava verziju i zapisuje indeks celije u
+        # dnevnik promjena. Dnevnik pocinje od verzije changes_base.
+        self.version = 0
+        self.changes = []
+        self.changes_base = 0
+        # mreza od koje potjece stanje (kod kopije iz snapshota to je izvorna mreza)
+        self.origin = self
+        # Maska prohodnih smjerova svake celije (susjed unutar mape koji nije
+        # prepreka), pa astar ne provjerava granice ni prepreke susjeda. Maska
+        # se racuna kod prvog koristenja (compute_moves), a promjena prepreke
+        # ponistava maske susjednih celija.
+        self.move_table = make_move_table(cols)
+        self.reset_moves()
+
+    def index(self, col, row):
+        return row * self.cols + col
+
+    def position(self, index):
+        row, col = divmod(index, self.cols)
+        return (col, row)
+
+    def is_obstacle(self, index):
+        return self.obstacle[index] == 1
+
+    def set_obstacle(self, index, is_obstacle=True):
+        value = 1 if is_obstacle else 0
+        if self.obstacle[index] != value:
+            self.obstacle[index] = value
+            self.invalidate_moves(index)
+            self.record_change(index)
+
+    def set_cost(self, index, cost):
+        if self.cost[index] != cost:
+            self.cost[index] = cost
+            self.record_change(index)
+
+    # Brise sve prepreke, a ako je zadan cost postavlja ga na sve celije
+    def clear(self, cost=None):
+        self.obstacle[:] = array("B", [0]) * self.size
+        if cost is not None:
+            self.cost[:] = array("B", [cost]) * self.size
+        self.mark_all_changed()
+
+    # Vraca indekse susjednih celija unutar mape (bez obzira na prepreke)
+    def neighbours(self, index):
+        row, col = divmod(index, self.cols)
+        result = []
+        for dx, dy in DIRECTIONS:
+            x = col + dx
+            y = row + dy
+            if 0 <= x < self.cols and 0 <= y < self.rows:
+                result.append(y * self.cols + x)
+        return result
+
+    # Racuna i sprema masku prohodnih smjerova celije
+    def compute_moves(self, index):
+        cols = self.cols
+        obstacle = self.obstacle
+        row, col = divmod(index, cols)
+        mask = MOVES_READY
+        if row > 0 and not obstacle[index - cols]:
+            mask |= 1
+        if col < cols - 1 and not obstacle[index + 1]:
+            mask |= 2
+        if row < self.rows - 1 and not obstacle[index + cols]:
+            mask |= 4
+        if col > 0 and not obstacle[index - 1]:
+            mask |= 8
+        self.moves[index] = mask
+        return mask
+
+    # Ponistava maske susjeda celije kojoj se promijenila prepreka
+    def invalidate_moves(self, index):
+        moves = self.moves
+        for neighbour in self.neighbours(index):
+            moves[neighbour] = 0
+
+    # Ponistava sve maske (nova sparse mapa ne zauzima memoriju)
+    def reset_moves(self):
+        if self.sparse:
+            self.moves = sparse_array("B", self.size)
+        else:
+            self.moves = array("B", bytes(self.size))
+
+    def record_change(self, index):
+        self.version += 1
+        self.changes.append(index)
+        # stari dio dnevnika odbacujemo, tko ga treba napravit ce sve ispocetka
+        if len(self.changes) > MAX_GRID_CHANGES:
+            dropped = len(self.changes) // 2
+            del self.changes[:dropped]
+            self.changes_base += dropped
+
+    # Oznacava da se promijenila cijela mreza (npr. nova nasumicna mapa)
+    def mark_all_changed(self):
+        self.reset_moves()
+        self.version += 1
+        self.changes = []
+        self.changes_base = self.version
+
+    # Vraca listu celija promijenjenih nakon zadane verzije ili None ako
+    # te promjene vise nisu u dnevniku
+    def changes_since(self, version):
+        if version < self.changes_base:
+            return None
+        return self.changes[version - self.changes_base :]
+
+    # Kopija tezina, prepreka i dnevnika promjena koja se moze predati drugoj
+    # dretvi. Pomocni nizovi za pretrazivanje se ne kopiraju.
+    def snapshot(self):
+        return GridSnapshot(self)
+
+    # Preuzima stanje iz snapshota iste velicine, pomocni nizovi ostaju isti.
+    # Ako je snapshot novija verzija iste mreze, ponistavaju se samo maske oko
+    # promijenjenih celija.
+    def restore(self, snapshot):
+        changes = None
+        if (
+            snapshot.origin is self.origin
+            and snapshot.changes_base <= self.version <= snapshot.version
+        ):
+            changes = snapshot.changes[self.version - snapshot.changes_base :]
+        self.cost[:] = snapshot.cost
+        self.obstacle[:] = snapshot.obstacle
+        if changes is None:
+            self.reset_moves()
+        else:
+            for index in set(changes):
+                self.invalidate_moves(index)
+        self.version = snapshot.version
+        self.changes = list(snapshot.changes)
+        self.changes_base = snapshot.changes_base
+        self.origin = snapshot.origin
+
+    # Pomocni nizovi za pretrazivanje unatrag (dvosmjerni A*)
+    def backward_scratch(self):
+        if self.backward is None:
+            self.backward = SearchScratch(self.size, self.sparse)
+        return self.backward
+
+
+# Statistika jednog pretrazivanja. Algoritmi je popunjavaju samo ako im se
+# preda kao stats argument. Mjerenje vremena se ukljucuje zamjenom heuristike
+# i funkcija gomile omotacima, pa bez stats-a petlja pretrazivanja ostaje ista.
+class SearchStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes_expanded = 0
+        self.nodes_pushed = 0
+        self.nodes_reopened = 0
+        self.peak_open_size = 0
+        self.heuristic_calls = 0
+        self.path_length = 0
+        # vremena pojedinih faza u nanosekundama (perf_counter_ns)
+        self.total_ns = 0
+        self.heuristic_ns = 0
+        self.open_set_ns = 0
+        self.reconstruction_ns = 0
+        self._begin_ns = 0
+        # granica suboptimalnosti puta (None za algoritme koji daju najkraci
+        # put) i koraci anytime pretrazivanja, vidi anytime.py
+        self.bound = None
+        self.improvements = []
+
+    # Vrijeme sirenja cvorova (susjedi, provjere) je ostatak ukupnog vremena
+    @property
+    def expansion_ns(self):
+        other = self.heuristic_ns + self.open_set_ns + self.reconstruction_ns
+        return max(0, self.total_ns - other)
+
+    def begin(self):
+        self.reset()
+        self._begin_ns = time.perf_counter_ns()
+
+    def end(self, path, expanded, pushed, reopened):
+        self.total_ns = time.perf_counter_ns() - self._begin_ns
+        self.nodes_expanded = expanded
+        self.nodes_pushed = pushed
+        self.nodes_reopened = reopened
+        self.path_length = len(path) if path else 0
+        return path
+
+    def timed_heuristic(self, heuristic):
+        def timed(start, end):
+            begin = time.perf_counter_ns()
+            result = heuristic(start, end)
+            self.heuristic_ns += time.perf_counter_ns() - begin
+            self.heuristic_calls += 1
+            return result
+
+        return timed
+
+    def heappush(self, heap, item):
+        begin = time.perf_counter_ns()
+        heapq.heappush(heap, item)
+        self.open_set_ns += time.perf_counter_ns() - begin
+        if len(heap) > self.peak_open_size:
+            self.peak_open_size = len(heap)
+
+    def heappop(self, heap):
+        begin = time.perf_counter_ns()
+        item = heapq.heappop(heap)
+        self.open_set_ns += time.perf_counter_ns() - begin
+        return item
+
+    def reconstruct(self, function, *args):
+        begin = time.perf_counter_ns()
+        path = function(*args)
+        self.reconstruction_ns += time.perf_counter_ns() - begin
+        return path
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "nodes_pushed": self.nodes_pushed,
+            "nodes_reopened": self.nodes_reopened,
+            "peak_open_size": self.peak_open_size,
+            "heuristic_calls": self.heuristic_calls,
+            "path_length": self.path_length,
+            "total_ns": self.total_ns,
+            "heuristic_ns": self.heuristic_ns,
+            "open_set_ns": self.open_set_ns,
+            "expansion_ns": self.expansion_ns,
+            "reconstruction_ns": self.reconstruction_ns,
+            "bound": self.bound,
+        }
+
+
+# Nasumicna tezina celije: 80% celija ima tezinu 1, 10% tezinu 2 i 10% tezinu 3
+def random_cost(rng=random):
+    rand = rng.randint(1, 10)
+    if rand < 9:
+        return 1
+    elif rand == 9:
+        return 2
+    elif rand == 10:
+        return 3
+
+
+# Postavlja zadani broj nasumicnih prepreka, start i cilj ostaju slobodni
+def place_random_obstacles(grid, obstacles, start, end, rng=random):
+    for i in range(obstacles):
+        x = rng.randint(0, grid.cols - 1)
+        y = rng.randint(0, grid.rows - 1)
+        index = grid.index(x, y)
+        if index == start or index == end:
+            continue
+        grid.set_obstacle(index, True)
+
+
+# Nepromjenjiva kopija stanja mreze u jednom trenutku
+class GridSnapshot:
+    def __init__(self, grid):
+        self.cols = grid.cols
+        self.rows = grid.rows
+        # array() kopira i nizove iz mapirane datoteke (gdje bi [:] bio pogled)
+        self.cost = array("B", grid.cost)
+        self.obstacle = array("B", grid.obstacle)
+        self.version = grid.version
+        self.changes = grid.changes[:]
+        self.changes_base = grid.changes_base
+        self.origin = grid.origin
+
+    # Nova mreza sa stanjem iz snapshota
+    def to_grid(self):
+        grid = Grid(self.cols, self.rows)
+        grid.restore(self)
+        return grid
+
+
+def manhattan_distance(start, end):
+    return abs(end[0] - start[0]) + abs(end[1] - start[1])
+
+
+def euclidian_distance(start, end):
+    return math.sqrt((end[0] - start[0]) ** 2 + (end[1] - start[1]) ** 2)
+
+
+def chebyshev_distance(start, end):
+    return max(abs(end[0] - start[0]), abs(end[1] - start[1]))
+
+
+# Za kretanje u 8 smjerova, dijagonalni korak je duljine korijen iz 2
+def octile_distance(start, end):
+    dx = abs(end[0] - start[0])
+    dy = abs(end[1] - start[1])
+    return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+
+# Heuristike sa tablicama izracunatim iz mreze (npr. LandmarkHeuristic) imaju
+# metodu update(grid) koja ih uskladjuje sa mrezom. Poziva se prije
+# pretrazivanja, a tablice se racunaju samo ako se mreza promijenila.
+def update_heuristic(heuristic, grid):
+    update = getattr(heuristic, "update", None)
+    if update is not None:
+        update(grid)
+
+
+# A* algoritam za pronalazenje najkraceg puta.
+# start i end su indeksi celija, a vraca se lista indeksa od starta do cilja
+# ili None ako put ne postoji.
+def astar(grid, start, end, heuristic, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heuristic = stats.timed_heuristic(heuristic)
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    # novo pretrazivanje - celije iz prethodnih pretrazivanja su neposjecene
+    search = grid.new_search()
+
+    cols = grid.cols
+    cost = grid.cost
+    moves = grid.moves
+    moveTable = grid.move_table
+    computeMoves = grid.compute_moves
+    g = grid.g
+    parent = grid.parent
+    state = grid.state
+    stamp = grid.stamp
+    endPosition = grid.position(end)
+
+    # Napravimo start node
+    stamp[start] = search
+    g[start] = 0
+    parent[start] = -1
+    h = heuristic(grid.position(start), endPosition)
+
+    # Otvorena lista je binarna gomila (heap) sa zapisima (f, h, redni broj, g, cvor).
+    # Redni broj razbija izjednacenja pa se usporedba nikad ne spusta dalje.
+    # Kad cvor dobije bolji g samo dodamo novi zapis, a stari zapis
+    # preskacemo kad ga izvadimo iz gomile (lijeno brisanje).
+    openList = []
+    counter = 0
+    expanded = 0
+    reopened = 0
+
+    # Dodajemo start u otvorenu listu
+    heappush(openList, (h, h, counter, 0, start))
+    state[start] = OPEN
+
+    # Ovdje trazimo najkraci put. Kad stignemo do cilja vracamo listu cvorova do cilja
+    while openList:
+        # Uzimamo cvor sa najmanjim f (kod jednakih f onaj sa manjim h)
+        _, _, _, currentG, current = heappop(openList)
+
+        # Zastarjeli zapis - cvor je vec zatvoren ili je u medjuvremenu dobio bolji g
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+
+        state[current] = CLOSED
+        expanded += 1
+
+        # Provjeravamo da li smo nasli kraj
+        # Ako jesmo vracamo listu cvorova od starta do kraja
+        if current == end:
+            if stats is None:
+                return grid.reconstruct_path(current)
+            path = stats.reconstruct(grid.reconstruct_path, current)
+            return stats.end(path, expanded, counter + 1, reopened)
+
+        # g vrijednost susjeda (ukupna tezina) - ista je za sve susjede
+        tentative_g = currentG + cost[current]
+        row, col = divmod(current, cols)
+
+        # Susjedi unutar mape koji nisu prepreke, iz maske prohodnih smjerova
+        mask = moves[current]
+        if not mask:
+            mask = computeMoves(current)
+        for offset, dx, dy in moveTable[mask]:
+            neighbour = current + offset
+
+            # Ako je susjed vec posjecen u ovom pretrazivanju, a novi put
+            # nije bolji, preskacemo ga
+            if stamp[neighbour] == search:
+                if tentative_g >= g[neighbour]:
+                    continue
+                # zatvoreni cvor se ponovno otvara
+                if state[neighbour] == CLOSED:
+                    reopened += 1
+
+            # Ovaj put do susjeda je bolji od bilo kojeg prethodnog. Zabilježi ga!
+            stamp[neighbour] = search
+            # postavimo parent - tj. cvor sa kojeg smo dosli u taj cvor
+            parent[neighbour] = current
+            g[neighbour] = tentative_g
+            h = heuristic((col + dx, row + dy), endPosition)
+
+            # dodajemo cvor u otvorenu listu
+            state[neighbour] = OPEN
+            counter += 1
+            heappush(openList, (tentative_g + h, h, counter, tentative_g, neighbour))
+
+    if stats is not None:
+        stats.end(None, expanded, counter + 1, reopened)
+    return None
+
+
+# Algoritmi koji uvijek daju najkraci put imaju optimal True, pa path_cache
+# smije vratiti ostatak njihovog puta kao put od celije na njemu
+astar.optimal = True
+
+
+# Dvosmjerni A* - jedna granica raste od starta prema cilju, druga od cilja
+# prema startu. Unatrag se prelazi preko ulaznih bridova: korak iz celije u u
+# susjeda v kosta cost[u], pa pretrazivanje od cilja za prethodnika u dodaje
+# cost[u]. Svaki put kad celiju dosegnu obje strane, g naprijed + g unatrag je
+# duljina jednog puta kroz nju; najbolji takav je mu.
+# Obje strane koriste prosjecni potencijal p(v) = (h(v, cilj) - h(start, v)) / 2,
+# naprijed sa f = g + p, a unatrag sa f = g - p. Uz konzistentnu heuristiku je
+# i potencijal konzistentan, pa je zbroj najmanjih f obje otvorene liste donja
+# granica za svaki put koji jos nije pronadjen. Kad taj zbroj dosegne mu,
+# najbolji pronadjeni put je najkraci. Ulazi i izlaz su isti kao kod astar.
+def bidirectional_astar(grid, start, end, heuristic, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heuristic = stats.timed_heuristic(heuristic)
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    if start == end:
+        path = [start]
+        return stats.end(path, 1, 1, 0) if stats is not None else path
+    # u cilj koji je prepreka se ne moze uci
+    if grid.obstacle[end]:
+        if stats is not None:
+            stats.end(None, 0, 0, 0)
+        return None
+
+    backward = grid.backward_scratch()
+    forwardSearch = grid.new_search()
+    backwardSearch = backward.new_search()
+
+    cols = grid.cols
+    rows = grid.rows
+    cost = grid.cost
+    obstacle = grid.obstacle
+    startPosition = grid.position(start)
+    endPosition = grid.position(end)
+
+    # (g, parent, state, stamp, broj pretrazivanja) za svaku stranu
+    forward = (grid.g, grid.parent, grid.state, grid.stamp, forwardSearch)
+    reverse = (
+        backward.g,
+        backward.parent,
+        backward.state,
+        backward.stamp,
+        backwardSearch,
+    )
+
+    for side, index in ((forward, start), (reverse, end)):
+        g, parent, state, stamp, search = side
+        stamp[index] = search
+        g[index] = 0
+        parent[index] = -1
+        state[index] = OPEN
+
+    # zapisi u gomilama su kao kod astar: (f, potencijal, redni broj, g, cvor)
+    p = heuristic(startPosition, endPosition) / 2
+    forwardOpen = [(p, p, 0, 0, start)]
+    backwardOpen = [(p, p, 1, 0, end)]
+    counter = 1
+    expanded = 0
+    reopened = 0
+
+    best = float("inf")
+    meeting = -1
+
+    while forwardOpen and backwardOpen:
+        if forwardOpen[0][0] + backwardOpen[0][0] >= best:
+            break
+
+        # sirimo stranu sa manjom otvorenom listom
+        isForward = len(forwardOpen) <= len(backwardOpen)
+        if isForward:
+            openList = forwardOpen
+            g, parent, state, stamp, search = forward
+            otherG, _, _, otherStamp, otherSearch = reverse
+            sign = 1
+        else:
+            openList = backwardOpen
+            g, parent, state, stamp, search = reverse
+            otherG, _, _, otherStamp, otherSearch = forward
+            # unatrag je potencijal suprotnog predznaka
+            sign = -1
+
+        _, _, _, currentG, current = heappop(openList)
+
+        # zastarjeli zapis (lijeno brisanje kao kod astar)
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+
+        state[current] = CLOSED
+        expanded += 1
+
+        row, col = divmod(current, cols)
+        # naprijed je tezina koraka ista za sve susjede
+        stepCost = cost[current]
+
+        for dx, dy in DIRECTIONS:
+            x = col + dx
+            y = row + dy
+
+            if x < 0 or x >= cols or y < 0 or y >= rows:
+                continue
+
+            neighbour = y * cols + x
+
+            if isForward:
+                if obstacle[neighbour]:
+                    continue
+                tentative_g = currentG + stepCost
+            else:
+                # iz prepreke se moze izaci samo ako je to start
+                if obstacle[neighbour] and neighbour != start:
+                    continue
+                tentative_g = currentG + cost[neighbour]
+
+            if stamp[neighbour] == search:
+                if tentative_g >= g[neighbour]:
+                    continue
+                if state[neighbour] == CLOSED:
+                    reopened += 1
+
+            stamp[neighbour] = search
+            parent[neighbour] = current
+            g[neighbour] = tentative_g
+
+            # druga strana je vec dosegla susjeda - imamo cijeli put kroz njega
+            if otherStamp[neighbour] == otherSearch:
+                length = tentative_g + otherG[neighbour]
+                if length < best:
+                    best = length
+                    meeting = neighbour
+
+            position = (x, y)
+            # heuristika procjenjuje put u smjeru bridova (od prvog do drugog
+            # argumenta), sto je bitno kad nije simetricna
+            p = heuristic(position, endPosition) - heuristic(startPosition, position)
+            p *= sign / 2
+            state[neighbour] = OPEN
+            counter += 1
+            heappush(openList, (tentative_g + p, p, counter, tentative_g, neighbour))
+
+    if meeting == -1:
+        if stats is not None:
+            stats.end(None, expanded, counter + 1, reopened)
+        return None
+
+    if stats is None:
+        return join_bidirectional_path(grid, backward, meeting)
+    path = stats.reconstruct(join_bidirectional_path, grid, backward, meeting)
+    return stats.end(path, expanded, counter + 1, reopened)
+
+
+bidirectional_astar.optimal = True
+
+
+# Spaja put od starta do celije susreta i put od nje do cilja
+def join_bidirectional_path(grid, backward, meeting):
+    path = grid.reconstruct_path(meeting)
+    parent = backward.parent
+    index = parent[meeting]
+    while index != -1:
+        path.append(index)
+        index = parent[index]
+    return path
+
+
+# Jump Point Search - A* koji na podrucjima jednake tezine preskace simetricne
+# puteve i u otvorenu listu dodaje samo tocke skoka (4-povezana mreza).
+# Obicni JPS pretpostavlja da sve celije imaju istu tezinu. Ako je weighted
+# True, granica izmedju celija razlicite tezine takodjer zaustavlja skok pa
+# se kroz nizove jednakih tezina skace, a put ostaje najkraci.
+def jump_point_search(grid, start, end, heuristic, weighted=False, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heuristic = stats.timed_heuristic(heuristic)
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    search = grid.new_search()
+
+    cols = grid.cols
+    rows = grid.rows
+    cost = grid.cost
+    obstacle = grid.obstacle
+    g = grid.g
+    parent = grid.parent
+    state = grid.state
+    stamp = grid.stamp
+    endPosition = grid.position(end)
+
+    # da li je celija unutar mape i nije prepreka
+    def free(x, y):
+        return 0 <= x < cols and 0 <= y < rows and not obstacle[y * cols + x]
+
+    # kod weighted varijante se celija druge tezine od c gleda kao prepreka
+    def open_cell(x, y, c):
+        return free(x, y) and (not weighted or cost[y * cols + x] == c)
+
+    # da li celija granici sa slobodnom celijom druge tezine
+    def on_boundary(x, y):
+        c = cost[y * cols + x]
+        for dx, dy in DIRECTIONS:
+            if free(x + dx, y + dy) and cost[(y + dy) * cols + x + dx] != c:
+                return True
+        return False
+
+    # Skace od (x, y) u smjeru (dx, dy) dok ne nadje tocku skoka.
+    # Vraca (indeks, tezina puta do nje) ili None ako tocke skoka nema.
+    def jump(x, y, dx, dy):
+        travelled = cost[y * cols + x]
+        x += dx
+        y += dy
+        if not free(x, y):
+            return None
+        c = cost[y * cols + x]
+
+        while free(x, y):
+            index = y * cols + x
+            if index == end:
+                return index, travelled
+            if weighted and on_boundary(x, y):
+                return index, travelled
+
+            if dx != 0:
+                # prisilni susjed - celiju iznad ili ispod ne mozemo doci ranije
+                if (open_cell(x, y - 1, c) and not open_cell(x - dx, y - 1, c)) or (
+                    open_cell(x, y + 1, c) and not open_cell(x - dx, y + 1, c)
+                ):
+                    return index, travelled
+            else:
+                if (open_cell(x - 1, y, c) and not open_cell(x - 1, y - dy, c)) or (
+                    open_cell(x + 1, y, c) and not open_cell(x + 1, y - dy, c)
+                ):
+                    return index, travelled
+                # kod vertikalnog kretanja provjeravamo ima li vodoravnih tocaka skoka
+                if jump(x, y, 1, 0) is not None or jump(x, y, -1, 0) is not None:
+                    return index, travelled
+
+            travelled += cost[index]
+            x += dx
+            y += dy
+        return None
+
+    stamp[start] = search
+    g[start] = 0
+    parent[start] = -1
+    h = heuristic(grid.position(start), endPosition)
+
+    openList = []
+    counter = 0
+    expanded = 0
+    reopened = 0
+    heappush(openList, (h, h, counter, 0, start))
+    state[start] = OPEN
+
+    while openList:
+        _, _, _, currentG, current = heappop(openList)
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+        state[current] = CLOSED
+        expanded += 1
+
+        if current == end:
+            if stats is None:
+                return expand_jump_path(grid, grid.reconstruct_path(current))
+            path = stats.reconstruct(
+                lambda: expand_jump_path(grid, grid.reconstruct_path(current))
+            )
+            return stats.end(path, expanded, counter + 1, reopened)
+
+        row, col = divmod(current, cols)
+
+        # Odabir smjerova: start i celije na granici tezina siru se u svim
+        # smjerovima, a ostale samo naprijed i bocno u odnosu na smjer dolaska.
+        if parent[current] == -1 or (weighted and on_boundary(col, row)):
+            directions = DIRECTIONS
+        else:
+            parentRow, parentCol = divmod(parent[current], cols)
+            dx = (col > parentCol) - (col < parentCol)
+            dy = (row > parentRow) - (row < parentRow)
+            if dx != 0:
+                directions = ((dx, 0), (0, -1), (0, 1))
+            else:
+                directions = ((0, dy), (-1, 0), (1, 0))
+
+        for dx, dy in directions:
+            jumpPoint = jump(col, row, dx, dy)
+            if jumpPoint is None:
+                continue
+            neighbour, travelled = jumpPoint
+
+            tentative_g = currentG + travelled
+            if stamp[neighbour] == search:
+                if tentative_g >= g[neighbour]:
+                    continue
+                if state[neighbour] == CLOSED:
+                    reopened += 1
+
+            stamp[neighbour] = search
+            parent[neighbour] = current
+            g[neighbour] = tentative_g
+            h = heuristic(grid.position(neighbour), endPosition)
+
+            state[neighbour] = OPEN
+            counter += 1
+            heappush(openList, (tentative_g + h, h, counter, tentative_g, neighbour))
+
+    if stats is not None:
+        stats.end(None, expanded, counter + 1, reopened)
+    return None
+
+
+def jps(grid, start, end, heuristic, stats=None):
+    return jump_point_search(grid, start, end, heuristic, stats=stats)
+
+
+def weighted_jps(grid, start, end, heuristic, stats=None):
+    return jump_point_search(grid, start, end, heuristic, weighted=True, stats=stats)
+
+
+# Popunjava celije izmedju uzastopnih tocaka skoka (leze u istom redu ili stupcu)
+def expand_jump_path(grid, jumpPoints):
+    path = jumpPoints[:1]
+    for index in jumpPoints[1:]:
+        row, col = divmod(path[-1], grid.cols)
+        targetRow, targetCol = divmod(index, grid.cols)
+        step = (targetCol > col) - (targetCol < col)
+        step += grid.cols * ((targetRow > row) - (targetRow < row))
+        current = path[-1]
+        while current != index:
+            current += step
+            path.append(current)
+    return path
+
+
+# D* Lite - inkrementalni algoritam koji pretrazuje od cilja prema startu i
+# izmedju poziva cuva svoje stablo pretrazivanja. Kad se promijene celije ili
+# se pomakne start, popravljaju se samo cvorovi na koje promjena utjece.
+# Poziva se kao i astar: planner(grid, start, end, heuristic).
+class DStarLite:
+    optimal = True
+
+    def __init__(self):
+        self.grid = None
+        self.origin = None
+        self.start = None
+        self.end = None
+        self.heuristic = None
+        self.heuristic_version = None
+        self.version = -1
+
+    def __call__(self, grid, start, end, heuristic, stats=None):
+        # brojaci i funkcije za mjerenje vrijede samo za ovaj poziv
+        self.expanded = 0
+        self.pushed = 0
+        self.reopened = 0
+        self.estimate = heuristic
+        self.heappush = heapq.heappush
+        self.heappop = heapq.heappop
+        if stats is not None:
+            stats.begin()
+            self.estimate = stats.timed_heuristic(heuristic)
+            self.heappush = stats.heappush
+            self.heappop = stats.heappop
+
+        changes = None
+        # kopija iste mreze (npr. u PathWorker-u) nastavlja sa istim stablom
+        if (
+            grid.origin is self.origin
+            and end == self.end
+            and heuristic is self.heuristic
+            # heuristika sa tablicama se promijenila pa stari kljucevi ne vrijede
+            and getattr(heuristic, "version", None) == self.heuristic_version
+            and grid.size == len(self.g)
+        ):
+            changes = grid.changes_since(self.version)
+
+        if changes is None:
+            # prvi poziv, novi cilj ili previse promjena - krecemo ispocetka
+            self.initialize(grid, start, end, heuristic)
+        else:
+            self.grid = grid
+            if start != self.start:
+                # pomaknuti start samo povecava km umjesto da mijenjamo sve kljuceve
+                self.km += self.distance(self.last, start)
+                self.last = start
+                self.start = start
+
+            # promjena celije mijenja bridove iz nje (cost) i u nju (prepreka)
+            for index in set(changes):
+                self.update_vertex(index)
+                for neighbour in grid.neighbours(index):
+                    self.update_vertex(neighbour)
+
+        self.version = grid.version
+        self.compute_shortest_path()
+        if stats is None:
+            return self.extract_path()
+        path = stats.reconstruct(self.extract_path)
+        return stats.end(path, self.expanded, self.pushed, self.reopened)
+
+    def initialize(self, grid, start, end, heuristic):
+        self.grid = grid
+        self.origin = grid.origin
+        self.start = start
+        self.last = start
+        self.end = end
+        self.heuristic = heuristic
+        self.heuristic_version = getattr(heuristic, "version", None)
+        self.endPosition = grid.position(end)
+        self.km = 0
+
+        # g je udaljenost do cilja, rhs je procjena iz susjeda (one-step lookahead)
+        self.g = array("d", [float("inf")]) * grid.size
+        self.rhs = array("d", [float("inf")]) * grid.size
+        # trenutni kljuc cvora u redu, zapisi u gomili sa drugim kljucem su zastarjeli
+        self.key1 = array("d", [0]) * grid.size
+        self.key2 = array("d", [0]) * grid.size
+        self.in_queue = array("B", [0]) * grid.size
+        self.queue = []
+        self.counter = 0
+
+        self.rhs[end] = 0
+        self.push(end)
+
+    # Heuristika izmedju dvije celije
+    def distance(self, a, b):
+        return self.estimate(self.grid.position(a), self.grid.position(b))
+
+    def push(self, index):
+        k2 = min(self.g[index], self.rhs[index])
+        k1 = k2 + self.distance(self.start, index) + self.km
+        self.key1[index] = k1
+        self.key2[index] = k2
+        self.in_queue[index] = 1
+        self.counter += 1
+        self.pushed += 1
+        self.heappush(self.queue, (k1, k2, self.counter, index))
+
+    # Ponovno racuna rhs cvora iz susjeda i vraca ga u red ako je nekonzistentan
+    def update_vertex(self, index):
+        grid = self.grid
+        if index != self.end:
+            best = float("inf")
+            for neighbour in grid.neighbours(index):
+                if not grid.obstacle[neighbour] and self.g[neighbour] < best:
+                    best = self.g[neighbour]
+            self.rhs[index] = grid.cost[index] + best
+
+        # stari zapis u gomili postaje zastario (lijeno brisanje)
+        self.in_queue[index] = 0
+        if self.g[index] != self.rhs[index]:
+            self.push(index)
+
+    # Izbacuje zastarjele zapise sa vrha gomile
+    def clean_top(self):
+        queue = self.queue
+        while queue:
+            k1, k2, _, index = queue[0]
+            if (
+                self.in_queue[index]
+                and self.key1[index] == k1
+                and self.key2[index] == k2
+            ):
+                return
+            self.heappop(queue)
+
+    def compute_shortest_path(self):
+        grid = self.grid
+        start = self.start
+        g = self.g
+        rhs = self.rhs
+
+        # gomila se zbog lijenog brisanja moze napuniti, tada je slozimo ispocetka
+        if len(self.queue) > 2 * grid.size + MAX_GRID_CHANGES:
+            self.queue = [
+                (self.key1[i], self.key2[i], i, i)
+                for i in range(grid.size)
+                if self.in_queue[i]
+            ]
+            heapq.heapify(self.queue)
+
+        while True:
+            self.clean_top()
+            if not self.queue:
+                break
+
+            k1, k2, _, index = self.queue[0]
+            start_k2 = min(g[start], rhs[start])
+            start_k1 = start_k2 + self.km
+            if (k1, k2) >= (start_k1, start_k2) and rhs[start] == g[start]:
+                break
+
+            self.heappop(self.queue)
+            self.in_queue[index] = 0
+            self.expanded += 1
+
+            k2_new = min(g[index], rhs[index])
+            k1_new = k2_new + self.distance(start, index) + self.km
+            if (k1, k2) < (k1_new, k2_new):
+                # kljuc je zastario zbog pomaka starta
+                self.push(index)
+            elif g[index] > rhs[index]:
+                # cvor je postao konzistentan, azuriramo njegove prethodnike
+                g[index] = rhs[index]
+                for neighbour in grid.neighbours(index):
+                    self.update_vertex(neighbour)
+            else:
+                # cvor je postao podkonzistentan (npr. nova prepreka), ponovno se otvara
+                g[index] = float("inf")
+                self.reopened += 1
+                self.update_vertex(index)
+                for neighbour in grid.neighbours(index):
+                    self.update_vertex(neighbour)
+
+    # Slijedi najmanji g od starta do cilja i vraca listu indeksa
+    def extract_path(self):
+        grid = self.grid
+        g = self.g
+        current = self.start
+        if g[current] == float("inf"):
+            return None
+
+        path = [current]
+        while current != self.end:
+            best = None
+            for neighbour in grid.neighbours(current):
+                if not grid.obstacle[neighbour] and (
+                    best is None or g[neighbour] < g[best]
+                ):
+                    best = neighbour
+            if best is None or g[best] == float("inf") or len(path) > grid.size:
+                return None
+            current = best
+            path.append(current)
+        return path
+
+
+# Stablo najkracih puteva (Dijkstra) iz jednog korijena. Unaprijed (reverse
+# False) g je trosak od korijena do celije, a parent vodi natrag prema korijenu.
+# Unatrag g je trosak od celije do korijena i parent je sljedeci korak prema
+# korijenu. Pretrazivanje staje kad su zatvorene sve celije iz goals.
+# Vraca broj prosirenih i dodanih cvorova.
+def shortest_path_tree(
+    grid, root, goals, reverse=False, heappush=heapq.heappush, heappop=heapq.heappop
+):
+    search = grid.new_search()
+    cols = grid.cols
+    rows = grid.rows
+    cost = grid.cost
+    obstacle = grid.obstacle
+    g = grid.g
+    parent = grid.parent
+    state = grid.state
+    stamp = grid.stamp
+
+    stamp[root] = search
+    g[root] = 0
+    parent[root] = -1
+    state[root] = OPEN
+    openList = [(0, root)]
+    pushed = 1
+    expanded = 0
+    remaining = len(goals)
+
+    while openList:
+        currentG, current = heappop(openList)
+        if state[current] == CLOSED or currentG > g[current]:
+            continue
+        state[current] = CLOSED
+        expanded += 1
+        if current in goals:
+            remaining -= 1
+            if remaining == 0:
+                break
+
+        # unatrag se u prepreku ne moze uci pa iz nje nema ulaznih bridova
+        # (dosegnemo je samo ako je netko u njoj zapoceo)
+        if reverse and obstacle[current]:
+            continue
+
+        row, col = divmod(current, cols)
+        for dx, dy in DIRECTIONS:
+            x = col + dx
+            y = row + dy
+            if x < 0 or x >= cols or y < 0 or y >= rows:
+                continue
+            neighbour = y * cols + x
+            if reverse:
+                # korak iz susjeda u trenutnu celiju kosta tezinu susjeda
+                if obstacle[neighbour] and neighbour not in goals:
+                    continue
+                tentative_g = currentG + cost[neighbour]
+            else:
+                if obstacle[neighbour]:
+                    continue
+                tentative_g = currentG + cost[current]
+            if stamp[neighbour] == search and tentative_g >= g[neighbour]:
+                continue
+            stamp[neighbour] = search
+            g[neighbour] = tentative_g
+            parent[neighbour] = current
+            state[neighbour] = OPEN
+            pushed += 1
+            heappush(openList, (tentative_g, neighbour))
+
+    return expanded, pushed
+
+
+# Najkraci putevi za sve parove (izvor, cilj). Umjesto len(sources) *
+# len(targets) poziva astar gradi se jedno stablo za svaki razliciti izvor,
+# ili jedno obrnuto stablo za svaki razliciti cilj ako je ciljeva manje.
+# Vraca (costs, paths) gdje su costs[i][j] i paths[i][j] trosak i put od
+# sources[i] do targets[j] (None ako puta nema), isto kao kod astar.
+def many_to_many(grid, sources, targets, stats=None):
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    if stats is not None:
+        stats.begin()
+        heappush = stats.heappush
+        heappop = stats.heappop
+
+    costs = [[None] * len(targets) for _ in sources]
+    paths = [[None] * len(targets) for _ in sources]
+    sourceRows = {}
+    for i, source in enumerate(sources):
+        sourceRows.setdefault(source, []).append(i)
+    targetColumns = {}
+    for j, target in enumerate(targets):
+        targetColumns.setdefault(target, []).append(j)
+
+    g = grid.g
+    stamp = grid.stamp
+    parent = grid.parent
+    expanded = 0
+    pushed = 0
+    # stabla rastu sa strane koja ima manje razlicitih celija
+    reverse = len(targetColumns) < len(sourceRows)
+    if reverse:
+        roots, leaves = targetColumns, sourceRows
+    else:
+        roots, leaves = sourceRows, targetColumns
+
+    for root in roots:
+        goals = set(leaves)
+        if not reverse:
+            # u cilj koji je prepreka se ne moze uci (osim ako je to sam izvor)
+            goals = {leaf for leaf in goals if leaf == root or not grid.obstacle[leaf]}
+        elif grid.obstacle[root]:
+            goals = {root} if root in goals else set()
+        if not goals:
+            continue
+
+        treeExpanded, treePushed = shortest_path_tree(
+            grid, root, goals, reverse, heappush, heappop
+        )
+        expanded += treeExpanded
+        pushed += treePushed
+        search = grid.search_id
+
+        for leaf in goals:
+            if stamp[leaf] != search:
+                continue
+            if reverse:
+                # parent vodi od izvora prema cilju
+                path = []
+                index = leaf
+                while index != -1:
+                    path.append(index)
+                    index = parent[index]
+                source, target = leaf, root
+            else:
+                path = grid.reconstruct_path(leaf)
+                source, target = root, leaf
+            # ponovljeni parovi dobivaju svoju kopiju puta
+            copy = False
+            for i in sourceRows[source]:
+                for j in targetColumns[target]:
+                    costs[i][j] = g[leaf]
+                    paths[i][j] = list(path) if copy else path
+                    copy = True
+
+    if stats is not None:
+        stats.end(None, expanded, pushed, 0)
+    return costs, paths
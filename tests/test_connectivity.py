@@ -0,0 +1,49 @@
+# ComponentIndex usporedjen sa astar: nakon nasumicnih promjena mreze (nove i
+# uklonjene prepreke, tezine, mark_all_changed) reachable mora odgovarati
+# tome da astar nadje put. Pogresan "nedostupno" bi u igri sakrio postojeci
+# put.
+import random
+import unittest
+
+from connectivity import ComponentIndex
+from pathfinding import Grid, astar, manhattan_distance
+
+
+class ComponentIndexTest(unittest.TestCase):
+    def replay(self, seed):
+        rng = random.Random(seed)
+        grid = Grid(rng.randint(1, 25), rng.randint(1, 20))
+        density = rng.choice((0.2, 0.35, 0.5))
+        for index in range(grid.size):
+            grid.set_obstacle(index, rng.random() < density)
+        index = ComponentIndex()
+        for step in range(60):
+            # vise promjena izmedju dva update() ide kroz isti dnevnik
+            for _ in range(rng.choice((1, 1, 3, 10))):
+                grid.set_obstacle(rng.randrange(grid.size), rng.random() < 0.5)
+            if step % 7 == 0:
+                grid.set_cost(rng.randrange(grid.size), rng.randint(1, 4))
+            if step % 23 == 22:
+                grid.mark_all_changed()
+            index.update(grid)
+            for _ in range(10):
+                start = rng.randrange(grid.size)
+                end = rng.randrange(grid.size)
+                expected = astar(grid, start, end, manhattan_distance) is not None
+                self.assertEqual(
+                    index.reachable(grid, start, end),
+                    expected,
+                    (seed, step, grid.cols, grid.rows, start, end),
+                )
+        return index
+
+    def test_random_edits_match_astar(self):
+        relabeled = 0
+        for seed in range(40):
+            relabeled += self.replay(seed).relabeled
+        # replay mora proci i kroz razdvajanje komponenti, ne samo kroz build
+        self.assertGreater(relabeled, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+# Theta* i Lazy Theta* na nasumicnim mapama: put nikad nije skuplji od puta
+# kretanja u 8 smjerova (astar8), jer Theta* uz korake u 8 smjerova dodaje
+# samo ravne crte koje nisu skuplje od koraka.
+import random
+import unittest
+
+from movement import ThetaStar, astar8, path_cost
+from pathfinding import Grid, euclidian_distance, octile_distance
+
+
+def random_grid(rng, weighted):
+    grid = Grid(rng.randint(4, 30), rng.randint(4, 20))
+    density = rng.choice((0.0, 0.1, 0.25, 0.35))
+    for index in range(grid.size):
+        if rng.random() < density:
+            grid.set_obstacle(index, True)
+        elif weighted:
+            grid.set_cost(index, rng.randint(1, 4))
+    return grid
+
+
+class ThetaStarTest(unittest.TestCase):
+    def check_not_worse_than_astar8(self, weighted, seed):
+        rng = random.Random(seed)
+        for _ in range(150):
+            grid = random_grid(rng, weighted)
+            planners = (ThetaStar(), ThetaStar(lazy=True))
+            for _ in range(4):
+                start = rng.randrange(grid.size)
+                end = rng.randrange(grid.size)
+                grid.set_obstacle(end, False)
+                expected = astar8(grid, start, end, octile_distance)
+                for planner in planners:
+                    path = planner(grid, start, end, euclidian_distance)
+                    if expected is None:
+                        self.assertIsNone(path)
+                        continue
+                    self.assertEqual((path[0], path[-1]), (start, end))
+                    self.assertLessEqual(
+                        path_cost(grid, path),
+                        path_cost(grid, expected) + 1e-9,
+                        (planner.lazy, grid.cols, grid.rows, start, end),
+                    )
+
+    def test_uniform_not_worse_than_astar8(self):
+        self.check_not_worse_than_astar8(False, 1)
+
+    def test_weighted_not_worse_than_astar8(self):
+        self.check_not_worse_than_astar8(True, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+# Algoritmi iz pathfinding.py usporedjeni sa jednostavnim Dijkstrom preko
+# Grid.neighbours na nasumicnim mapama i nasumicnim promjenama mape.
+import heapq
+import os
+import random
+import tempfile
+import unittest
+
+from map_file import open_map, save_map
+from pathfinding import (
+    DStarLite,
+    Grid,
+    astar,
+    chebyshev_distance,
+    euclidian_distance,
+    jps,
+    manhattan_distance,
+    weighted_jps,
+)
+
+HEURISTICS = (manhattan_distance, euclidian_distance, chebyshev_distance)
+
+
+# Trosak najkraceg puta (korak iz celije u kosta cost[u]) ili None
+def dijkstra_cost(grid, start, end):
+    distance = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        current, index = heapq.heappop(heap)
+        if index == end:
+            return current
+        if current > distance[index]:
+            continue
+        for neighbour in grid.neighbours(index):
+            if grid.obstacle[neighbour]:
+                continue
+            candidate = current + grid.cost[index]
+            if candidate < distance.get(neighbour, candidate + 1):
+                distance[neighbour] = candidate
+                heapq.heappush(heap, (candidate, neighbour))
+    return None
+
+
+def random_grid(rng, costs=(1,) * 8 + (2, 3)):
+    grid = Grid(rng.randint(3, 30), rng.randint(3, 25))
+    density = rng.choice((0.05, 0.2, 0.35))
+    for index in range(grid.size):
+        grid.set_cost(index, rng.choice(costs))
+        grid.set_obstacle(index, rng.random() < density)
+    return grid
+
+
+class PathTestCase(unittest.TestCase):
+    # Put ide od starta do cilja kroz susjedne slobodne celije; vraca trosak
+    def assertValidPath(self, grid, path, start, end, message=None):
+        self.assertTrue(path, message)
+        self.assertEqual((path[0], path[-1]), (start, end), message)
+        for current, following in zip(path, path[1:]):
+            self.assertIn(following, grid.neighbours(current), message)
+            self.assertFalse(grid.obstacle[following], message)
+        return sum(grid.cost[index] for index in path[:-1])
+
+    # Put ima trosak najkraceg puta (ili ga nema ako ga nema ni Dijkstra)
+    def assertShortest(self, grid, path, start, end, message=None):
+        expected = dijkstra_cost(grid, start, end)
+        if expected is None:
+            self.assertFalse(path, message)
+            return
+        self.assertEqual(
+            self.assertValidPath(grid, path, start, end, message), expected, message
+        )
+
+
+class DStarLiteTest(PathTestCase):
+    # Promjene prepreka i tezina, pomaci starta (km), novi cilj i clear se
+    # izmjenjuju sa upitima, pa planner popravlja isto stablo kroz dnevnik
+    # promjena mreze
+    def test_random_replay(self):
+        for seed in range(40):
+            rng = random.Random(seed)
+            grid = random_grid(rng)
+            heuristic = rng.choice(HEURISTICS)
+            planner = DStarLite()
+            start = rng.randrange(grid.size)
+            end = rng.randrange(grid.size)
+            for step in range(60):
+                action = rng.random()
+                if action < 0.4:
+                    index = rng.randrange(grid.size)
+                    grid.set_obstacle(index, not grid.obstacle[index])
+                elif action < 0.6:
+                    grid.set_cost(rng.randrange(grid.size), rng.randint(1, 3))
+                elif action < 0.85:
+                    start = rng.choice(grid.neighbours(start))
+                elif action < 0.9:
+                    end = rng.randrange(grid.size)
+                elif action < 0.93:
+                    grid.clear(1)
+                path = planner(grid, start, end, heuristic)
+                self.assertShortest(grid, path, start, end, (seed, step))
+
+
+class JumpPointSearchTest(PathTestCase):
+    def check_queries(self, uniform):
+        for seed in range(150):
+            rng = random.Random(seed)
+            grid = random_grid(rng, (2,) if uniform else (1,) * 8 + (2, 3))
+            for query in range(10):
+                start = rng.randrange(grid.size)
+                end = rng.randrange(grid.size)
+                heuristic = rng.choice(HEURISTICS)
+                message = (seed, query, start, end)
+                self.assertShortest(
+                    grid, weighted_jps(grid, start, end, heuristic), start, end, message
+                )
+                path = jps(grid, start, end, heuristic)
+                if uniform:
+                    self.assertShortest(grid, path, start, end, message)
+                    continue
+                # jps preskace tezine, pa na tezinskoj mapi put postoji kad i
+                # najkraci, ali moze biti skuplji
+                expected = dijkstra_cost(grid, start, end)
+                if expected is None:
+                    self.assertFalse(path, message)
+                else:
+                    self.assertGreaterEqual(
+                        self.assertValidPath(grid, path, start, end, message),
+                        expected,
+                        message,
+                    )
+
+    def test_uniform_matches_dijkstra(self):
+        self.check_queries(True)
+
+    def test_weighted_jps_matches_dijkstra(self):
+        self.check_queries(False)
+
+
+class MoveMaskTest(PathTestCase):
+    # Svaka izracunata maska mora biti ista kao nova (ponovno racunanje
+    # zapisuje istu vrijednost)
+    def assertMasksCurrent(self, grid, message=None):
+        moves = grid.moves
+        for index in range(grid.size):
+            stored = moves[index]
+            if stored:
+                self.assertEqual(stored, grid.compute_moves(index), (message, index))
+
+    def check_queries(self, rng, grid, message):
+        for _ in range(5):
+            start = rng.randrange(grid.size)
+            end = rng.randrange(grid.size)
+            path = astar(grid, start, end, manhattan_distance)
+            self.assertShortest(grid, path, start, end, (message, start, end))
+        self.assertMasksCurrent(grid, message)
+
+    def edit(self, rng, grid):
+        for _ in range(rng.choice((1, 1, 4, 20))):
+            grid.set_obstacle(rng.randrange(grid.size), rng.random() < 0.4)
+        if rng.random() < 0.3:
+            grid.set_cost(rng.randrange(grid.size), rng.randint(1, 3))
+
+    # Radna mreza (kao u PathWorker) preuzima snapshotove glavne mreze, pa
+    # maske ponistava samo oko celija iz dnevnika; snapshot druge mreze ili
+    # clear ponistava sve maske
+    def test_snapshot_replay(self):
+        for seed in range(30):
+            rng = random.Random(seed)
+            grid = random_grid(rng)
+            other = Grid(grid.cols, grid.rows)
+            worker = Grid(grid.cols, grid.rows)
+            for step in range(40):
+                self.edit(rng, grid)
+                if step % 17 == 16:
+                    grid.clear(rng.randint(1, 2))
+                self.check_queries(rng, grid, (seed, step, "grid"))
+                action = rng.random()
+                if action < 0.1:
+                    self.edit(rng, other)
+                    worker.restore(other.snapshot())
+                    self.check_queries(rng, worker, (seed, step, "other"))
+                elif action < 0.8:
+                    # ostale promjene dolaze u worker u jednom restore
+                    worker.restore(grid.snapshot())
+                    self.check_queries(rng, worker, (seed, step, "worker"))
+
+    # Mreza iz mapirane datoteke (sparse maske) nakon promjena prepreka
+    def test_open_map_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for seed in range(10):
+                rng = random.Random(seed)
+                path = os.path.join(directory, f"mapa{seed}.apm")
+                save_map(random_grid(rng), path)
+                grid = open_map(path)
+                for step in range(30):
+                    self.edit(rng, grid)
+                    self.check_queries(rng, grid, (seed, step))
+
+
+if __name__ == "__main__":
+    unittest.main()